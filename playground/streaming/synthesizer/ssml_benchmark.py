@@ -0,0 +1,51 @@
+import argparse
+import timeit
+
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.synthesizer.ssml_builder import SSMLBuilder
+
+MESSAGES = [
+    "Sure, I can help you with that.",
+    "Dr. Smith is available on Tuesday at 3 PM, does that work for you?",
+    "Great, I'll send the confirmation to jane.doe@example.com right away.",
+    "Welcome to the chiro clinic! How can I help you today?",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measures the per-call cost of rendering Azure SSML"
+    )
+    parser.add_argument("--number", type=int, default=2000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    ssml_builder = SSMLBuilder(
+        voice_name="en-US-SteffanNeural", language_code="en-US", pitch=0, rate=15
+    )
+    bot_sentiment = BotSentiment(emotion="friendly", degree=0.5)
+    for message in MESSAGES:
+        uncached_seconds = min(
+            timeit.repeat(
+                lambda: ssml_builder.render_uncached(
+                    message, bot_sentiment.emotion, bot_sentiment.degree
+                ),
+                number=args.number,
+                repeat=args.repeat,
+            )
+        )
+        cached_seconds = min(
+            timeit.repeat(
+                lambda: ssml_builder.build(message, bot_sentiment),
+                number=args.number,
+                repeat=args.repeat,
+            )
+        )
+        print(
+            f"{message[:40]:<42} uncached: {uncached_seconds / args.number * 1e6:7.1f}us/call  "
+            f"cached: {cached_seconds / args.number * 1e6:6.2f}us/call"
+        )
+
+
+if __name__ == "__main__":
+    main()
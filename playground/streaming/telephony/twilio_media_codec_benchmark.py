@@ -0,0 +1,103 @@
+import argparse
+import base64
+import json
+import os
+import time
+
+from vocode.streaming.telephony.twilio_media_codec import (
+    TwilioMediaEncoder,
+    decode_message,
+)
+
+FRAMES_PER_SECOND = 50
+FRAME_SIZE = 160
+
+
+def create_inbound_messages(num_streams: int):
+    return [
+        json.dumps(
+            {
+                "event": "media",
+                "sequenceNumber": str(i),
+                "media": {
+                    "track": "inbound",
+                    "chunk": str(i),
+                    "timestamp": str(i * 20),
+                    "payload": base64.b64encode(os.urandom(FRAME_SIZE)).decode(),
+                },
+                "streamSid": f"MZ{stream}",
+            },
+            separators=(",", ":"),
+        )
+        for stream in range(num_streams)
+        for i in range(FRAMES_PER_SECOND)
+    ]
+
+
+def decode_with_json(message: str):
+    data = json.loads(message)
+    if data["event"] == "media":
+        return int(data["media"]["timestamp"]), base64.b64decode(
+            data["media"]["payload"]
+        )
+
+
+def encode_with_json(stream_sid: str, chunk: bytes) -> str:
+    return json.dumps(
+        {
+            "event": "media",
+            "streamSid": stream_sid,
+            "media": {"payload": base64.b64encode(chunk).decode("utf-8")},
+        }
+    )
+
+
+def measure(fn, items, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name: str, json_seconds: float, codec_seconds: float, num_frames: int):
+    # a second of audio for every stream, so the time is also the share of a core they need
+    print(
+        f"{name:<8} json: {json_seconds / num_frames * 1e6:6.2f}us/frame "
+        f"({json_seconds * 100:5.1f}% of a core)  "
+        f"codec: {codec_seconds / num_frames * 1e6:6.2f}us/frame "
+        f"({codec_seconds * 100:5.1f}% of a core)  "
+        f"speedup: {json_seconds / codec_seconds:5.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Per-frame cost of Twilio media messages, for a second of audio on every stream"
+    )
+    parser.add_argument("--streams", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inbound_messages = create_inbound_messages(args.streams)
+    report(
+        "inbound",
+        measure(decode_with_json, inbound_messages, args.repeat),
+        measure(decode_message, inbound_messages, args.repeat),
+        len(inbound_messages),
+    )
+
+    chunks = [os.urandom(FRAME_SIZE) for _ in range(len(inbound_messages))]
+    encoder = TwilioMediaEncoder("MZ0")
+    report(
+        "outbound",
+        measure(lambda chunk: encode_with_json("MZ0", chunk), chunks, args.repeat),
+        measure(encoder.encode_media, chunks, args.repeat),
+        len(chunks),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import audioop
+import timeit
+
+import numpy as np
+
+from vocode.streaming.utils.audio_codec import (
+    StreamingResampler,
+    linear16_to_mulaw,
+    mulaw_to_linear16,
+)
+
+# (input sampling rate, output sampling rate) pairs seen on the streaming path
+RESAMPLING_RATES = [(16000, 8000), (24000, 8000), (44100, 16000), (48000, 16000)]
+
+
+def create_chunks(sampling_rate: int, chunk_seconds: float, seconds: float):
+    num_samples = int(sampling_rate * seconds)
+    audio = np.random.default_rng(0).normal(0, 3000, num_samples).astype(np.int16)
+    chunk_size = int(sampling_rate * chunk_seconds)
+    return [
+        audio[i : i + chunk_size].tobytes() for i in range(0, num_samples, chunk_size)
+    ]
+
+
+def report(name: str, audioop_seconds: float, numpy_seconds: float, seconds: float):
+    print(
+        f"{name:<24} audioop: {audioop_seconds / seconds * 1000:8.3f}ms/s of audio  "
+        f"numpy: {numpy_seconds / seconds * 1000:8.3f}ms/s of audio  "
+        f"speedup: {audioop_seconds / numpy_seconds:5.2f}x"
+    )
+
+
+def benchmark_mulaw(args):
+    chunks = create_chunks(8000, args.chunk_seconds, args.seconds)
+    mulaw_chunks = [audioop.lin2ulaw(chunk, 2) for chunk in chunks]
+    for name, audioop_fn, numpy_fn, inputs in [
+        ("mulaw encode", lambda c: audioop.lin2ulaw(c, 2), linear16_to_mulaw, chunks),
+        (
+            "mulaw decode",
+            lambda c: audioop.ulaw2lin(c, 2),
+            mulaw_to_linear16,
+            mulaw_chunks,
+        ),
+    ]:
+        audioop_seconds = min(
+            timeit.repeat(
+                lambda: [audioop_fn(c) for c in inputs],
+                number=args.iterations,
+                repeat=args.repeat,
+            )
+        )
+        numpy_seconds = min(
+            timeit.repeat(
+                lambda: [numpy_fn(c) for c in inputs],
+                number=args.iterations,
+                repeat=args.repeat,
+            )
+        )
+        report(name, audioop_seconds, numpy_seconds, args.seconds * args.iterations)
+
+
+def benchmark_resampling(args):
+    for input_sampling_rate, output_sampling_rate in RESAMPLING_RATES:
+        chunks = create_chunks(input_sampling_rate, args.chunk_seconds, args.seconds)
+
+        def run_audioop():
+            state = None
+            for chunk in chunks:
+                _, state = audioop.ratecv(
+                    chunk, 2, 1, input_sampling_rate, output_sampling_rate, state
+                )
+
+        def run_numpy():
+            resampler = StreamingResampler(input_sampling_rate, output_sampling_rate)
+            for chunk in chunks:
+                resampler.resample(chunk)
+
+        audioop_seconds = min(
+            timeit.repeat(run_audioop, number=args.iterations, repeat=args.repeat)
+        )
+        numpy_seconds = min(
+            timeit.repeat(run_numpy, number=args.iterations, repeat=args.repeat)
+        )
+        report(
+            f"resample {input_sampling_rate}->{output_sampling_rate}",
+            audioop_seconds,
+            numpy_seconds,
+            args.seconds * args.iterations,
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmarks vocode.streaming.utils.audio_codec against audioop"
+    )
+    parser.add_argument(
+        "--seconds", type=float, default=10, help="Seconds of audio per iteration"
+    )
+    parser.add_argument(
+        "--chunk_seconds",
+        type=float,
+        default=0.02,
+        help="Chunk size in seconds, 0.02 is a telephony media frame",
+    )
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    benchmark_mulaw(args)
+    benchmark_resampling(args)
@@ -0,0 +1,129 @@
+import asyncio
+from typing import AsyncGenerator, List, Tuple
+
+import pytest
+import pytest_asyncio
+
+from vocode.streaming.agent.base_agent import (
+    AgentResponseMessage,
+    TranscriptionAgentInput,
+)
+from vocode.streaming.agent.echo_agent import EchoAgent
+from vocode.streaming.models.agent import EchoAgentConfig, SpeculativeGenerationConfig
+from vocode.streaming.models.transcript import Message, Transcript
+from vocode.streaming.transcriber.base_transcriber import Transcription
+from vocode.streaming.utils.worker import InterruptibleEvent
+
+RESPONSE_SECONDS = 0.05
+
+
+class SlowEchoAgent(EchoAgent):
+    async def generate_response(
+        self,
+        human_input,
+        conversation_id: str,
+        is_interrupt: bool = False,
+    ) -> AsyncGenerator[Tuple[str, bool], None]:
+        await asyncio.sleep(RESPONSE_SECONDS)
+        yield human_input, True
+
+
+@pytest_asyncio.fixture
+async def agent():
+    agent = SlowEchoAgent(
+        EchoAgentConfig(speculative_generation_config=SpeculativeGenerationConfig())
+    )
+    agent.attach_transcript(Transcript())
+    agent.start()
+    yield agent
+    agent.terminate()
+
+
+def create_event(
+    agent: SlowEchoAgent, message: str
+) -> InterruptibleEvent[TranscriptionAgentInput]:
+    return agent.interruptible_event_factory.create_interruptible_event(
+        TranscriptionAgentInput(
+            transcription=Transcription(
+                message=message, confidence=1.0, is_final=False
+            ),
+            conversation_id="test",
+            vonage_uuid=None,
+            twilio_sid=None,
+        )
+    )
+
+
+def get_responses(agent: SlowEchoAgent) -> List[str]:
+    responses = []
+    while not agent.output_queue.empty():
+        agent_response = agent.output_queue.get_nowait().payload
+        assert isinstance(agent_response, AgentResponseMessage)
+        responses.append(agent_response.message.text)
+    return responses
+
+
+def get_human_messages(agent: SlowEchoAgent) -> List[str]:
+    assert agent.transcript is not None
+    return [
+        event_log.text
+        for event_log in agent.transcript.event_logs
+        if isinstance(event_log, Message) and event_log.sender == "human"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_matching_final_commits_speculation(agent: SlowEchoAgent):
+    await agent.speculate(create_event(agent, "what time is it"))
+    await asyncio.sleep(RESPONSE_SECONDS * 2)
+    # the response is ready, but held back until the final transcription
+    assert get_responses(agent) == []
+    assert agent.commit_speculation(
+        Transcription(message="What time is it?", confidence=1.0, is_final=True)
+    )
+    assert get_responses(agent) == ["what time is it"]
+    assert get_human_messages(agent) == ["What time is it? (conf: HIGH)"]
+
+
+@pytest.mark.asyncio
+async def test_mismatching_final_cancels_speculation(agent: SlowEchoAgent):
+    await agent.speculate(create_event(agent, "what time is it"))
+    await asyncio.sleep(RESPONSE_SECONDS / 2)
+    assert not agent.commit_speculation(
+        Transcription(
+            message="What time is it in Paris?", confidence=1.0, is_final=True
+        )
+    )
+    assert agent.cancel_speculation()
+    await asyncio.sleep(RESPONSE_SECONDS * 2)
+    assert get_responses(agent) == []
+    assert get_human_messages(agent) == []
+
+
+@pytest.mark.asyncio
+async def test_interrupt_cancels_speculation(agent: SlowEchoAgent):
+    await agent.speculate(create_event(agent, "what time is it"))
+    await asyncio.sleep(RESPONSE_SECONDS / 2)
+    assert agent.cancel_current_task()
+    assert not agent.commit_speculation(
+        Transcription(message="what time is it", confidence=1.0, is_final=True)
+    )
+    await asyncio.sleep(RESPONSE_SECONDS * 2)
+    assert get_responses(agent) == []
+    assert get_human_messages(agent) == []
+
+
+@pytest.mark.asyncio
+async def test_speculation_waits_behind_inputs_in_flight(agent: SlowEchoAgent):
+    agent.consume_nonblocking(create_event(agent, "hello"))
+    await asyncio.sleep(0)
+    await agent.speculate(create_event(agent, "what time is it"))
+    await asyncio.sleep(RESPONSE_SECONDS / 2)
+    # the worker processes one input at a time, so the speculation hasn't started yet
+    assert get_human_messages(agent) == ["hello (conf: HIGH)"]
+    await asyncio.sleep(RESPONSE_SECONDS * 3)
+    assert get_responses(agent) == ["hello"]
+    assert agent.commit_speculation(
+        Transcription(message="what time is it", confidence=1.0, is_final=True)
+    )
+    assert get_responses(agent) == ["what time is it"]
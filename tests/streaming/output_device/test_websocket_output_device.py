@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.queue import OverflowPolicy, QueueConfig
+from vocode.streaming.models.websocket import AudioMessage
+from vocode.streaming.output_device.websocket_output_device import (
+    WebsocketOutputDevice,
+)
+
+
+class StalledWebSocket:
+    """send_text() doesn't return until the client is unstalled, like a peer that stopped reading"""
+
+    def __init__(self):
+        self.unstalled = asyncio.Event()
+        self.sent = []
+
+    async def send_text(self, message: str):
+        await self.unstalled.wait()
+        self.sent.append(message)
+
+
+async def send_to_stalled_client(queue_config: QueueConfig):
+    ws = StalledWebSocket()
+    output_device = WebsocketOutputDevice(
+        ws, 16000, AudioEncoding.LINEAR16, queue_config=queue_config  # type: ignore
+    )
+    output_device.start()
+    # the first chunk is taken by the stalled send
+    output_device.consume_nonblocking(b"a")
+    await asyncio.sleep(0)
+    for chunk in [b"b", b"c", b"d", b"e"]:
+        output_device.consume_nonblocking(chunk)
+    assert output_device.queue.qsize() == 2
+    ws.unstalled.set()
+    while output_device.queue.qsize():
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+    output_device.terminate()
+    return [AudioMessage.parse_raw(message).get_bytes() for message in ws.sent]
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_drops_oldest_audio():
+    assert await send_to_stalled_client(
+        QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    ) == [b"a", b"d", b"e"]
+
+
+@pytest.mark.asyncio
+async def test_stalled_client_coalesces_audio():
+    assert await send_to_stalled_client(
+        QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.COALESCE)
+    ) == [b"a", b"b", b"cde"]
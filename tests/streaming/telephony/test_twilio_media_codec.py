@@ -0,0 +1,58 @@
+import base64
+import json
+
+from vocode.streaming.telephony.twilio_media_codec import (
+    TwilioMediaEncoder,
+    decode_message,
+)
+
+AUDIO = bytes(range(256)) * 2
+
+
+def create_media_message(**kwargs) -> str:
+    return json.dumps(
+        {
+            "event": "media",
+            "sequenceNumber": "4",
+            "media": {
+                "track": "inbound",
+                "chunk": "3",
+                "timestamp": "60",
+                "payload": base64.b64encode(AUDIO).decode(),
+            },
+            "streamSid": "MZ123",
+        },
+        **kwargs,
+    )
+
+
+def test_media_messages_are_decoded_with_and_without_the_fast_path():
+    # Twilio's compact JSON takes the fast path, anything else is parsed as JSON
+    for message in (
+        create_media_message(separators=(",", ":")),
+        create_media_message(),
+    ):
+        twilio_message = decode_message(message)
+        assert twilio_message.event == "media"
+        assert twilio_message.timestamp == 60
+        assert twilio_message.payload == AUDIO
+
+    twilio_message = decode_message('{"event":"stop","streamSid":"MZ123"}')
+    assert twilio_message.event == "stop"
+    assert twilio_message.data == {"event": "stop", "streamSid": "MZ123"}
+
+
+def test_encoded_messages_match_their_json():
+    encoder = TwilioMediaEncoder("MZ123")
+    assert encoder.encode_media(AUDIO) == json.dumps(
+        {
+            "event": "media",
+            "streamSid": "MZ123",
+            "media": {"payload": base64.b64encode(AUDIO).decode("utf-8")},
+        }
+    )
+    assert json.loads(encoder.encode_mark("Sent hi")) == {
+        "event": "mark",
+        "streamSid": "MZ123",
+        "mark": {"name": "Sent hi"},
+    }
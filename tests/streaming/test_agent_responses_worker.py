@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from typing import List, Optional
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.agent.base_agent import (
+    AgentResponseMessage,
+    AgentResponseStop,
+)
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.streaming_conversation import StreamingConversation
+from vocode.streaming.synthesizer.base_synthesizer import (
+    BaseSynthesizer,
+    SynthesisResult,
+)
+from vocode.streaming.utils.worker import InterruptibleEventFactory
+
+# seconds each message takes to synthesize
+SYNTHESIS_SECONDS = {"first": 0.3, "second": 0.1, "third": 0.2}
+
+
+class DelayedSynthesizer(BaseSynthesizer):
+    def __init__(self, synthesizer_config):
+        super().__init__(synthesizer_config)
+        self.cancelled: List[str] = []
+
+    async def create_speech(
+        self,
+        message: BaseMessage,
+        chunk_size: int,
+        bot_sentiment: Optional[BotSentiment] = None,
+    ) -> SynthesisResult:
+        try:
+            await asyncio.sleep(SYNTHESIS_SECONDS[message.text])
+        except asyncio.CancelledError:
+            self.cancelled.append(message.text)
+            raise
+        return self.create_synthesis_result_from_raw(
+            synthesizer_config=self.synthesizer_config,
+            output_bytes=b"\xff" * 800,
+            message=message,
+            chunk_size=chunk_size,
+        )
+
+
+class TurnLatencyTracker:
+    def mark(self, stage):
+        pass
+
+
+class Conversation:
+    def __init__(self, synthesizer: BaseSynthesizer):
+        self.synthesizer = synthesizer
+        self.synthesis_enabled = True
+        self.filler_audio_worker = None
+        self.bot_sentiment = None
+        self.turn_latency_tracker = TurnLatencyTracker()
+        self.logger = logging.getLogger(__name__)
+        self.terminated = asyncio.Event()
+
+    async def terminate(self):
+        self.terminated.set()
+
+
+def create_worker(synthesis_lookahead: int, then_stop: bool = False):
+    synthesizer = DelayedSynthesizer(
+        TestSynthesizerConfig(
+            sampling_rate=8000,
+            audio_encoding=AudioEncoding.MULAW,
+            synthesis_lookahead=synthesis_lookahead,
+        )
+    )
+    output_queue: asyncio.Queue = asyncio.Queue()
+    interruptible_event_factory = InterruptibleEventFactory()
+    conversation = Conversation(synthesizer)
+    worker = StreamingConversation.AgentResponsesWorker(
+        input_queue=asyncio.Queue(),
+        output_queue=output_queue,
+        conversation=conversation,  # type: ignore
+        interruptible_event_factory=interruptible_event_factory,
+    )
+    worker.start()
+    agent_responses = [
+        AgentResponseMessage(message=BaseMessage(text=text))
+        for text in SYNTHESIS_SECONDS
+    ]
+    for agent_response in agent_responses + (
+        [AgentResponseStop()] if then_stop else []
+    ):
+        worker.consume_nonblocking(
+            interruptible_event_factory.create_interruptible_agent_response_event(
+                agent_response
+            )
+        )
+    return worker, synthesizer, output_queue, conversation
+
+
+@pytest.mark.asyncio
+async def test_lookahead_synthesizes_ahead_and_releases_in_order():
+    start_time = time.time()
+    worker, _, output_queue, _ = create_worker(synthesis_lookahead=2)
+    messages = []
+    for _ in SYNTHESIS_SECONDS:
+        event = await output_queue.get()
+        message, _ = event.payload
+        messages.append(message.text)
+    assert messages == list(SYNTHESIS_SECONDS)
+    # the messages were synthesized concurrently, not one after the other
+    assert time.time() - start_time < sum(SYNTHESIS_SECONDS.values())
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_interrupt_cancels_lookahead_in_flight():
+    worker, synthesizer, output_queue, _ = create_worker(synthesis_lookahead=2)
+    await asyncio.sleep(0.15)
+    # the second message is synthesized, but held back behind the first
+    assert output_queue.empty()
+    assert worker.cancel_current_task()
+    await asyncio.sleep(0.3)
+    assert output_queue.empty()
+    assert sorted(synthesizer.cancelled) == ["first", "third"]
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_stop_waits_for_the_messages_before_it():
+    worker, _, output_queue, conversation = create_worker(
+        synthesis_lookahead=3, then_stop=True
+    )
+    await asyncio.wait_for(conversation.terminated.wait(), timeout=1)
+    assert output_queue.qsize() == len(SYNTHESIS_SECONDS)
+    worker.terminate()
@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from typing import List
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizer, TestSynthesizerConfig
+from tests.streaming.fixtures.transcriber import (
+    TestAsyncTranscriber,
+    TestTranscriberConfig,
+)
+from vocode.streaming.agent.echo_agent import EchoAgent
+from vocode.streaming.models.agent import EchoAgentConfig
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import Message
+from vocode.streaming.output_device.base_output_device import BaseOutputDevice
+from vocode.streaming.streaming_conversation import StreamingConversation
+from vocode.streaming.synthesizer.base_synthesizer import SynthesisResult
+from vocode.streaming.utils.turn_latency import TurnStage
+
+logger = logging.getLogger(__name__)
+
+SAMPLING_RATE = 8000
+AUDIO_ENCODING = AudioEncoding.MULAW
+# 0.1s of mulaw audio at 8khz, and 0.02s frames of it
+CHUNK_BYTES = 800
+FRAME_SECONDS = 0.02
+FRAME_BYTES = 160
+LEAD_SECONDS = 0.04
+NUM_CHUNKS = 3
+
+
+class RecordingOutputDevice(BaseOutputDevice):
+    def __init__(self, stop_event: threading.Event, stop_after_frames: int):
+        super().__init__(sampling_rate=SAMPLING_RATE, audio_encoding=AUDIO_ENCODING)
+        self.stop_event = stop_event
+        self.stop_after_frames = stop_after_frames
+        self.frames: List[bytes] = []
+
+    def consume_nonblocking(self, chunk: bytes):
+        self.frames.append(chunk)
+        if len(self.frames) == self.stop_after_frames:
+            self.stop_event.set()
+
+
+class RecordingTurnLatencyTracker:
+    def __init__(self):
+        self.marks: List[TurnStage] = []
+
+    def mark(self, stage: TurnStage):
+        self.marks.append(stage)
+
+
+class ChunkGenerator:
+    def __init__(self):
+        self.chunks_generated = 0
+        self.closed = False
+
+    async def generate(self):
+        try:
+            for i in range(NUM_CHUNKS):
+                self.chunks_generated += 1
+                yield SynthesisResult.ChunkResult(
+                    bytes([i]) * CHUNK_BYTES, i == NUM_CHUNKS - 1
+                )
+        finally:
+            self.closed = True
+
+
+def create_conversation(output_device: BaseOutputDevice) -> StreamingConversation:
+    conversation = StreamingConversation(
+        output_device=output_device,
+        transcriber=TestAsyncTranscriber(
+            TestTranscriberConfig(
+                sampling_rate=SAMPLING_RATE,
+                audio_encoding=AUDIO_ENCODING,
+                chunk_size=CHUNK_BYTES,
+            )
+        ),
+        agent=EchoAgent(EchoAgentConfig()),
+        synthesizer=TestSynthesizer(
+            TestSynthesizerConfig(
+                sampling_rate=SAMPLING_RATE,
+                audio_encoding=AUDIO_ENCODING,
+                output_frame_size_seconds=FRAME_SECONDS,
+                output_lead_seconds=LEAD_SECONDS,
+            )
+        ),
+        logger=logger,
+    )
+    conversation.turn_latency_tracker = RecordingTurnLatencyTracker()  # type: ignore
+    return conversation
+
+
+async def send_speech(stop_after_frames: int = 0):
+    stop_event = threading.Event()
+    output_device = RecordingOutputDevice(stop_event, stop_after_frames)
+    conversation = create_conversation(output_device)
+    chunk_generator = ChunkGenerator()
+    start = time.monotonic()
+    message_sent, cut_off = await conversation.send_speech_to_output(
+        "hello world",
+        SynthesisResult(
+            chunk_generator.generate(),
+            lambda seconds: "hello" if seconds < 0.3 else "hello world",
+        ),
+        stop_event,
+        seconds_per_chunk=1,
+        transcript_message=Message(text="", sender=Sender.BOT),
+    )
+    elapsed = time.monotonic() - start
+    return conversation, output_device, chunk_generator, message_sent, cut_off, elapsed
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_sliced_into_frames():
+    conversation, output_device, _, message_sent, cut_off, _ = await send_speech()
+    assert not cut_off
+    assert message_sent == "hello world"
+    assert len(output_device.frames) == NUM_CHUNKS * CHUNK_BYTES // FRAME_BYTES
+    assert all(len(frame) == FRAME_BYTES for frame in output_device.frames)
+    assert b"".join(output_device.frames) == b"".join(
+        bytes([i]) * CHUNK_BYTES for i in range(NUM_CHUNKS)
+    )
+    turn_latency_tracker = conversation.turn_latency_tracker
+    assert isinstance(turn_latency_tracker, RecordingTurnLatencyTracker)
+    assert turn_latency_tracker.marks.count(TurnStage.OUTPUT_FIRST_CHUNK) == 1
+
+
+@pytest.mark.asyncio
+async def test_frames_are_paced_with_lead():
+    *_, elapsed = await send_speech()
+    # the last frame is awaited until it's about to finish playing, minus the lead
+    audio_seconds = NUM_CHUNKS * CHUNK_BYTES / SAMPLING_RATE
+    assert elapsed == pytest.approx(audio_seconds - LEAD_SECONDS, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_output_stops_mid_chunk_when_cut_off():
+    # stops on the 3rd frame of the 2nd chunk
+    stop_after_frames = CHUNK_BYTES // FRAME_BYTES + 2
+    _, output_device, chunk_generator, message_sent, cut_off, _ = await send_speech(
+        stop_after_frames
+    )
+    assert cut_off
+    assert message_sent == "hello-"
+    assert len(output_device.frames) == stop_after_frames
+    # the synthesizer was stopped before producing the last chunk
+    assert chunk_generator.closed
+    assert chunk_generator.chunks_generated == 2
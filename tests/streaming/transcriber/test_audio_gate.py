@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import (
+    AudioGateConfig,
+    DeepgramTranscriberConfig,
+    TimeEndpointingConfig,
+)
+from vocode.streaming.transcriber.audio_gate import AudioGate
+from vocode.streaming.transcriber.deepgram_transcriber import (
+    KEEPALIVE_MESSAGE,
+    DeepgramTranscriber,
+)
+
+SAMPLING_RATE = 8000
+# 100ms of linear16 audio
+SILENCE = b"\0" * 1600
+SPEECH = (
+    (np.sin(np.arange(800) * 2 * np.pi * 440 / SAMPLING_RATE) * 10000)
+    .astype(np.int16)
+    .tobytes()
+)
+KEEPALIVE = b"keepalive"
+
+
+def create_audio_gate() -> AudioGate:
+    return AudioGate(
+        AudioGateConfig(
+            hangover_seconds=0.3, pre_roll_seconds=0.2, keepalive_interval_seconds=1
+        ),
+        AudioEncoding.LINEAR16,
+        SAMPLING_RATE,
+        KEEPALIVE,
+    )
+
+
+def test_silence_is_held_back_after_the_hangover():
+    audio_gate = create_audio_gate()
+    assert audio_gate.process(SPEECH, is_muted=False) == [SPEECH]
+    sent = [audio_gate.process(SILENCE, is_muted=False) for _ in range(23)]
+    # 300ms of hangover, then a keepalive per second of held back silence
+    assert sent[:3] == [[SILENCE]] * 3
+    assert sum(sent[3:], []) == [KEEPALIVE, KEEPALIVE]
+    # the end of the silence is sent ahead of the speech
+    assert audio_gate.process(SPEECH, is_muted=False) == [SILENCE, SILENCE, SPEECH]
+
+
+def test_muted_audio_is_never_pre_rolled():
+    audio_gate = create_audio_gate()
+    for _ in range(5):
+        audio_gate.process(SILENCE, is_muted=False)
+    for _ in range(5):
+        assert audio_gate.process(SILENCE, is_muted=True) == []
+    assert audio_gate.process(SPEECH, is_muted=False) == [SPEECH]
+
+
+def test_deepgram_sends_its_keepalive_message():
+    transcriber = DeepgramTranscriber(
+        DeepgramTranscriberConfig(
+            sampling_rate=SAMPLING_RATE,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=1600,
+            audio_gate_config=AudioGateConfig(
+                hangover_seconds=0, keepalive_interval_seconds=0.2
+            ),
+        ),
+        api_key="test",
+    )
+    transcriber.mute()
+    assert transcriber.gate_audio(SPEECH) == []
+    assert transcriber.gate_audio(SPEECH) == [KEEPALIVE_MESSAGE]
+
+
+def test_muted_audio_is_only_silenced_when_forwarded(monkeypatch):
+    transcriber = DeepgramTranscriber(
+        DeepgramTranscriberConfig(
+            sampling_rate=SAMPLING_RATE,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=1600,
+            audio_gate_config=AudioGateConfig(
+                hangover_seconds=0.2, keepalive_interval_seconds=1
+            ),
+        ),
+        api_key="test",
+    )
+    silent_chunk_sizes = []
+    create_silent_chunk = transcriber.create_silent_chunk
+
+    def record_silent_chunk(chunk_size):
+        silent_chunk_sizes.append(chunk_size)
+        return create_silent_chunk(chunk_size)
+
+    monkeypatch.setattr(transcriber, "create_silent_chunk", record_silent_chunk)
+    transcriber.mute()
+    sent = [transcriber.gate_audio(SPEECH) for _ in range(5)]
+    # the hangover is sent as silence, the held back audio is never converted
+    assert sent == [[b"\0" * len(SPEECH)]] * 2 + [[]] * 3
+    assert silent_chunk_sizes == [len(SPEECH)] * 2
+
+
+def test_hangover_must_cover_the_endpointing_cutoff():
+    with pytest.raises(ValidationError, match="hangover_seconds"):
+        DeepgramTranscriberConfig(
+            sampling_rate=SAMPLING_RATE,
+            audio_encoding=AudioEncoding.LINEAR16,
+            chunk_size=1600,
+            endpointing_config=TimeEndpointingConfig(time_cutoff_seconds=0.4),
+            audio_gate_config=AudioGateConfig(hangover_seconds=0.3),
+        )
@@ -0,0 +1,90 @@
+import asyncio
+from typing import List
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from vocode.streaming.models.transcriber import ConnectionPoolConfig
+from vocode.streaming.transcriber.connection_pool import TranscriberConnectionPool
+
+KEEPALIVE_MESSAGE = '{"type": "KeepAlive"}'
+EXTRA_HEADERS = {"Authorization": "Token test"}
+
+received_messages: List[str] = []
+num_connections = 0
+
+
+async def handle_connection(websocket):
+    global num_connections
+    num_connections += 1
+    async for message in websocket:
+        received_messages.append(message)
+
+
+@pytest_asyncio.fixture
+async def url():
+    global num_connections
+    num_connections = 0
+    received_messages.clear()
+    async with websockets.serve(handle_connection, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        yield f"ws://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_connections_are_handed_out_warm_and_refilled(url):
+    pool_config = ConnectionPoolConfig(size=2, keepalive_interval_seconds=0.05)
+    connection_pool = TranscriberConnectionPool()
+    connection_pool.warm(url, EXTRA_HEADERS, pool_config, KEEPALIVE_MESSAGE)
+    await asyncio.sleep(0.2)
+    assert num_connections == 2
+    # idle connections are kept alive
+    assert KEEPALIVE_MESSAGE in received_messages
+
+    websocket = await connection_pool.connect(
+        url, EXTRA_HEADERS, pool_config, KEEPALIVE_MESSAGE
+    )
+    assert websocket.open
+    await asyncio.sleep(0.1)
+    # refilled in the background
+    assert num_connections == 3
+    assert len(connection_pool.idle_connections) == 1
+    await websocket.close()
+    await connection_pool.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_connections_are_not_handed_out(url):
+    pool_config = ConnectionPoolConfig(size=1, max_idle_seconds=0.05)
+    connection_pool = TranscriberConnectionPool()
+    connection_pool.warm(url, EXTRA_HEADERS, pool_config, KEEPALIVE_MESSAGE)
+    await asyncio.sleep(0.02)
+    (idle_connection,) = next(iter(connection_pool.idle_connections.values()))
+    await asyncio.sleep(0.08)
+
+    websocket = await connection_pool.connect(
+        url, EXTRA_HEADERS, pool_config, KEEPALIVE_MESSAGE
+    )
+    assert websocket is not idle_connection.websocket
+    assert not idle_connection.websocket.open
+    await websocket.close()
+    await connection_pool.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_connections_are_reaped_and_replaced(url):
+    pool_config = ConnectionPoolConfig(size=1, max_idle_seconds=0.1)
+    connection_pool = TranscriberConnectionPool()
+    connection_pool.warm(url, EXTRA_HEADERS, pool_config, KEEPALIVE_MESSAGE)
+    await asyncio.sleep(0.02)
+    (idle_connection,) = next(iter(connection_pool.idle_connections.values()))
+
+    # replaced without waiting for the next conversation to connect
+    await asyncio.sleep(0.23)
+    assert not idle_connection.websocket.open
+    (replacement,) = next(iter(connection_pool.idle_connections.values()))
+    assert replacement is not idle_connection
+    assert replacement.websocket.open
+    await connection_pool.close()
+    assert connection_pool.reap_task is None
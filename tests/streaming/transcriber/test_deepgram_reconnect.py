@@ -0,0 +1,118 @@
+import asyncio
+import json
+from typing import List
+
+import pytest
+import pytest_asyncio
+import websockets
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import DeepgramTranscriberConfig
+from vocode.streaming.transcriber.audio_replay_buffer import AudioReplayBuffer
+from vocode.streaming.transcriber import deepgram_transcriber
+from vocode.streaming.transcriber.deepgram_transcriber import DeepgramTranscriber
+
+CHUNK_SIZE = 800
+NUM_CHUNKS = 4
+
+received_audios: List[bytes] = []
+
+
+class RecordingHistogram:
+    def __init__(self):
+        self.values: List[float] = []
+
+    def record(self, value: float):
+        self.values.append(value)
+
+
+def create_result(transcript: str, start: float, duration: float, speech_final: bool):
+    return json.dumps(
+        {
+            "is_final": True,
+            "speech_final": speech_final,
+            "start": start,
+            "duration": duration,
+            "channel": {
+                "alternatives": [
+                    {"transcript": transcript, "confidence": 0.9, "words": []}
+                ]
+            },
+        }
+    )
+
+
+async def handle_connection(websocket):
+    received_audio = b""
+    received_audios.append(received_audio)
+    if len(received_audios) == 1:
+        while len(received_audio) < NUM_CHUNKS * CHUNK_SIZE:
+            received_audio += await websocket.recv()
+        # only the first 0.15s of audio are transcribed before the connection dies
+        await websocket.send(create_result("hello", 0.0, 0.15, False))
+        await asyncio.sleep(0.05)
+        await websocket.close()
+        return
+    async for message in websocket:
+        if isinstance(message, str):
+            break
+        received_audio += message
+        received_audios[-1] = received_audio
+        await websocket.send(create_result("world", 0.0, 0.1, True))
+
+
+@pytest_asyncio.fixture
+async def url():
+    received_audios.clear()
+    async with websockets.serve(handle_connection, "127.0.0.1", 0) as server:
+        port = next(iter(server.sockets)).getsockname()[1]
+        yield f"ws://127.0.0.1:{port}"
+
+
+def test_acknowledging_trims_replayed_audio():
+    replay_buffer = AudioReplayBuffer(max_bytes=10)
+    for chunk in (b"abcd", b"efgh", b"ijkl"):
+        replay_buffer.append(chunk)
+    # over max_bytes, the oldest chunk is dropped
+    assert replay_buffer.get_unacknowledged_chunks() == [b"efgh", b"ijkl"]
+    replay_buffer.acknowledge(6)
+    assert replay_buffer.start == 6
+    assert replay_buffer.get_unacknowledged_chunks() == [b"gh", b"ijkl"]
+    replay_buffer.acknowledge(12)
+    assert replay_buffer.get_unacknowledged_chunks() == []
+    assert replay_buffer.start == replay_buffer.end == 12
+
+
+@pytest.mark.asyncio
+async def test_unacknowledged_audio_is_replayed_on_reconnect(url, monkeypatch):
+    monkeypatch.setattr(DeepgramTranscriber, "get_deepgram_url", lambda self: url)
+    max_latency_hist = RecordingHistogram()
+    monkeypatch.setattr(deepgram_transcriber, "max_latency_hist", max_latency_hist)
+    transcriber = DeepgramTranscriber(
+        DeepgramTranscriberConfig(
+            sampling_rate=8000,
+            audio_encoding=AudioEncoding.MULAW,
+            chunk_size=CHUNK_SIZE,
+        ),
+        api_key="test",
+    )
+    transcriber.start()
+    for i in range(NUM_CHUNKS):
+        transcriber.send_audio(bytes([i]) * CHUNK_SIZE)
+
+    transcription = await asyncio.wait_for(transcriber.output_queue.get(), 2)
+    while not transcription.is_final:
+        transcription = await asyncio.wait_for(transcriber.output_queue.get(), 2)
+    # the transcript buffered before the reconnect is kept
+    assert transcription.message.split() == ["hello", "world"]
+    assert (
+        received_audios[1]
+        == b"".join(bytes([i]) * CHUNK_SIZE for i in range(NUM_CHUNKS))[1200:]
+    )
+    # timestamps of the new connection are offset by where its audio starts
+    assert transcriber.connection_start == 0.15
+    assert transcriber.audio_cursor == NUM_CHUNKS * CHUNK_SIZE / 8000
+    # the first result of the new connection is measured from where its audio starts, not
+    # from the start of the call
+    assert max_latency_hist.values[:2] == pytest.approx([0.4, 0.25])
+    transcriber.terminate()
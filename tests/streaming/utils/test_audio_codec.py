@@ -0,0 +1,42 @@
+import audioop
+
+import numpy as np
+import pytest
+
+from vocode.streaming.utils.audio_codec import (
+    StreamingResampler,
+    linear16_to_mulaw,
+    mulaw_to_linear16,
+)
+
+
+def test_mulaw_tables_match_audioop():
+    all_mulaw = bytes(range(256))
+    assert mulaw_to_linear16(all_mulaw) == audioop.ulaw2lin(all_mulaw, 2)
+    all_linear16 = np.arange(65536, dtype=np.uint16).tobytes()
+    assert linear16_to_mulaw(all_linear16) == audioop.lin2ulaw(all_linear16, 2)
+
+
+@pytest.mark.parametrize(
+    "input_sample_rate,output_sample_rate",
+    [(16000, 8000), (44100, 16000), (8000, 16000)],
+)
+def test_resampling_chunks_matches_resampling_at_once(
+    input_sample_rate, output_sample_rate
+):
+    rng = np.random.default_rng(0)
+    audio = rng.normal(0, 3000, input_sample_rate).astype(np.int16).tobytes()
+    resampled = StreamingResampler(input_sample_rate, output_sample_rate).resample(
+        audio
+    )
+    assert len(resampled) == len(
+        audioop.ratecv(audio, 2, 1, input_sample_rate, output_sample_rate, None)[0]
+    )
+    resampler = StreamingResampler(input_sample_rate, output_sample_rate)
+    chunks = []
+    i = 0
+    while i < len(audio):
+        chunk_size = 2 * int(rng.integers(1, 500))
+        chunks.append(resampler.resample(audio[i : i + chunk_size]))
+        i += chunk_size
+    assert b"".join(chunks) == resampled
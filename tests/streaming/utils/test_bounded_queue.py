@@ -0,0 +1,86 @@
+import asyncio
+from typing import Union
+
+import pytest
+
+from vocode.streaming.models.queue import OverflowPolicy, QueueConfig
+from vocode.streaming.utils.bounded_queue import BoundedQueue, concatenate_chunks
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest():
+    queue: BoundedQueue[int] = BoundedQueue(
+        "test", QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.DROP_OLDEST)
+    )
+    for i in range(4):
+        queue.put_nowait(i)
+    assert [queue.get_nowait() for _ in range(queue.qsize())] == [2, 3]
+
+
+@pytest.mark.asyncio
+async def test_drop_oldest_hands_dropped_items_to_on_drop():
+    dropped = []
+    queue: BoundedQueue[int] = BoundedQueue(
+        "test",
+        QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.DROP_OLDEST),
+        on_drop=dropped.append,
+    )
+    for i in range(4):
+        queue.put_nowait(i)
+    assert dropped == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_coalesce_merges_into_newest_item():
+    queue: BoundedQueue[bytes] = BoundedQueue(
+        "test",
+        QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.COALESCE),
+        coalesce=concatenate_chunks,
+    )
+    for chunk in [b"a", b"b", b"c", b"d"]:
+        queue.put_nowait(chunk)
+    assert [queue.get_nowait() for _ in range(queue.qsize())] == [b"a", b"bcd"]
+
+
+def test_coalesce_requires_a_coalesce_function():
+    with pytest.raises(ValueError):
+        BoundedQueue("test", QueueConfig(overflow_policy=OverflowPolicy.COALESCE))
+
+
+@pytest.mark.asyncio
+async def test_coalesce_queues_control_messages_on_their_own():
+    queue: BoundedQueue[Union[str, bytes]] = BoundedQueue(
+        "test",
+        QueueConfig(maxsize=2, overflow_policy=OverflowPolicy.COALESCE),
+        coalesce=concatenate_chunks,
+    )
+    for item in [b"a", "keepalive", b"b", b"c", "close", b"d"]:
+        queue.put_nowait(item)
+    assert [queue.get_nowait() for _ in range(queue.qsize())] == [
+        b"a",
+        "keepalive",
+        b"bc",
+        "close",
+        b"d",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_block_waits_for_room_on_put():
+    queue: BoundedQueue[int] = BoundedQueue(
+        "test", QueueConfig(maxsize=1), awaits_put=True
+    )
+    await queue.put(0)
+    put_task = asyncio.create_task(queue.put(1))
+    await asyncio.sleep(0.01)
+    assert not put_task.done()
+    assert await queue.get() == 0
+    await asyncio.wait_for(put_task, timeout=1)
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(2)
+    assert await queue.get() == 1
+
+
+def test_block_requires_producers_that_await_put():
+    with pytest.raises(ValueError):
+        BoundedQueue("test", QueueConfig(maxsize=1))
@@ -0,0 +1,39 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from vocode.streaming.utils.frame_coalescer import FrameCoalescer
+
+# 20ms of 8kHz mulaw, like a Twilio media event
+FRAME = b"\xff" * 160
+
+
+@pytest.mark.asyncio
+async def test_frames_are_batched_into_packets():
+    packets: List[bytes] = []
+    frame_coalescer = FrameCoalescer(
+        packets.append, packet_size=800, max_latency_seconds=10
+    )
+    for i in range(50):
+        frame_coalescer.add(bytes([i]) * 160)
+    assert len(packets) == 10
+    assert b"".join(packets) == b"".join(bytes([i]) * 160 for i in range(50))
+    assert frame_coalescer.flush_timer is None
+
+
+@pytest.mark.asyncio
+async def test_partial_packet_is_flushed_after_max_latency():
+    packets: List[bytes] = []
+    frame_coalescer = FrameCoalescer(
+        packets.append, packet_size=800, max_latency_seconds=0.05
+    )
+    frame_coalescer.add(FRAME)
+    frame_coalescer.add(FRAME)
+    await asyncio.sleep(0.1)
+    assert packets == [FRAME * 2]
+
+    frame_coalescer.add(FRAME)
+    frame_coalescer.cancel()
+    await asyncio.sleep(0.1)
+    assert packets == [FRAME * 2]
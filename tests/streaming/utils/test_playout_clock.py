@@ -0,0 +1,39 @@
+import asyncio
+import time
+
+import pytest
+
+from vocode.streaming.utils.playout_clock import PlayoutClock
+
+
+@pytest.mark.asyncio
+async def test_schedule_does_not_drift():
+    clock = PlayoutClock(lead_seconds=0.01)
+    start_time = time.monotonic()
+    for _ in range(20):
+        deadline = clock.schedule(0.02)
+        # simulate work on the event loop between chunks
+        time.sleep(0.002)
+        await clock.wait_until(deadline)
+    elapsed = time.monotonic() - start_time
+    assert 0.4 - 0.01 - 0.005 <= elapsed <= 0.4 + 0.02
+    assert clock.seconds_buffered() <= 0.011
+
+
+@pytest.mark.asyncio
+async def test_schedule_restarts_when_output_is_idle():
+    clock = PlayoutClock(lead_seconds=0)
+    clock.schedule(0.05)
+    await asyncio.sleep(0.1)
+    deadline = clock.schedule(0.05)
+    assert deadline - time.monotonic() == pytest.approx(0.05, abs=0.01)
+
+
+@pytest.mark.asyncio
+async def test_missed_deadline_is_recorded_as_lag():
+    clock = PlayoutClock(lead_seconds=0)
+    deadline = clock.schedule(0.01)
+    time.sleep(0.05)
+    lag = await clock.wait_until(deadline)
+    assert lag == pytest.approx(0.04, abs=0.01)
+    assert clock.last_scheduling_lag == lag
@@ -0,0 +1,54 @@
+from vocode.streaming.utils.turn_latency import (
+    TOTAL_SEGMENT,
+    TurnLatencyTracker,
+    TurnStage,
+)
+
+
+def test_turn_segments_cover_stages_in_pipeline_order():
+    tracker = TurnLatencyTracker(conversation_id="test")
+    turn = tracker.start_turn(endpoint_time=10.0)
+    turn.mark(TurnStage.TRANSCRIPTION_PROCESSED, 10.1)
+    turn.mark(TurnStage.AGENT_FIRST_SENTENCE, 10.6)
+    # only the first mark of a stage counts
+    turn.mark(TurnStage.AGENT_FIRST_SENTENCE, 11.0)
+    turn.mark(TurnStage.SYNTHESIS_STARTED, 10.7)
+    segments = {name: end - start for name, start, end in turn.get_segments()}
+    assert segments.keys() == {
+        "transcriber_endpoint->transcription_processed",
+        "transcription_processed->agent_first_sentence",
+        "agent_first_sentence->synthesis_started",
+        TOTAL_SEGMENT,
+    }
+    assert abs(segments[TOTAL_SEGMENT] - 0.7) < 1e-9
+
+
+def test_output_first_chunk_finishes_the_turn():
+    tracker = TurnLatencyTracker(conversation_id="test")
+    for _ in range(3):
+        tracker.start_turn()
+        tracker.mark(TurnStage.SYNTHESIS_STARTED)
+        tracker.mark(TurnStage.OUTPUT_FIRST_CHUNK)
+        assert tracker.current_turn is None
+    # marks outside of a turn (e.g. the initial message) are ignored
+    tracker.mark(TurnStage.SYNTHESIS_STARTED)
+    summary = tracker.get_latency_summary()
+    assert summary[TOTAL_SEGMENT]["count"] == 3
+    assert summary[TOTAL_SEGMENT]["p50"] <= summary[TOTAL_SEGMENT]["p95"]
+
+
+def test_incomplete_turns_are_left_out_of_the_summary():
+    tracker = TurnLatencyTracker(conversation_id="test")
+    turn = tracker.start_turn(endpoint_time=10.0)
+    turn.mark(TurnStage.TRANSCRIPTION_PROCESSED, 10.1)
+    turn.mark(TurnStage.OUTPUT_FIRST_CHUNK, 11.0)
+    tracker.finish_turn()
+    # the next turn is interrupted before the bot responds
+    turn = tracker.start_turn(endpoint_time=20.0)
+    turn.mark(TurnStage.TRANSCRIPTION_PROCESSED, 20.05)
+    tracker.start_turn()
+    tracker.finish_turn()
+    summary = tracker.get_latency_summary()
+    assert summary[TOTAL_SEGMENT]["count"] == 1
+    assert summary["transcriber_endpoint->transcription_processed"]["count"] == 1
+    assert tracker.num_incomplete_turns == 1
@@ -0,0 +1,86 @@
+import audioop
+
+import numpy as np
+import pytest
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import VADEndpointingConfig
+from vocode.streaming.utils.vad import EnergyVAD
+
+CHUNK_SECONDS = 0.02
+
+
+def create_chunks(audio_encoding, sampling_rate, amplitude, seconds, noise_std=30):
+    num_samples = int(sampling_rate * seconds)
+    tone = amplitude * np.sin(2 * np.pi * 440 * np.arange(num_samples) / sampling_rate)
+    noise = np.random.default_rng(0).normal(0, noise_std, num_samples)
+    audio = (tone + noise).astype(np.int16).tobytes()
+    if audio_encoding == AudioEncoding.MULAW:
+        audio = audioop.lin2ulaw(audio, 2)
+    chunk_size = int(len(audio) * CHUNK_SECONDS / seconds)
+    return [audio[i : i + chunk_size] for i in range(0, len(audio), chunk_size)]
+
+
+@pytest.mark.parametrize(
+    "audio_encoding,sampling_rate",
+    [(AudioEncoding.MULAW, 8000), (AudioEncoding.LINEAR16, 16000)],
+)
+def test_endpoint_after_speech_and_silence(audio_encoding, sampling_rate):
+    vad = EnergyVAD(
+        VADEndpointingConfig(time_cutoff_seconds=0.3),
+        audio_encoding=audio_encoding,
+        sampling_rate=sampling_rate,
+    )
+    silence = create_chunks(audio_encoding, sampling_rate, 0, 0.5)
+    speech = create_chunks(audio_encoding, sampling_rate, 8000, 0.5)
+    # silence alone is never an endpoint
+    assert not any(vad.process(chunk) for chunk in silence)
+    assert not any(vad.process(chunk) for chunk in speech)
+    endpoints = [vad.process(chunk) for chunk in silence]
+    assert endpoints.count(True) == 1
+    assert 0.25 <= endpoints.index(True) * CHUNK_SECONDS <= 0.35
+
+
+def test_noise_floor_follows_rising_noise():
+    audio_encoding, sampling_rate = AudioEncoding.LINEAR16, 16000
+    vad = EnergyVAD(
+        VADEndpointingConfig(time_cutoff_seconds=0.3),
+        audio_encoding=audio_encoding,
+        sampling_rate=sampling_rate,
+    )
+    quiet = create_chunks(audio_encoding, sampling_rate, 0, 1)
+    # background noise around -27 dBFS, well above min_speech_dbfs
+    noise = create_chunks(audio_encoding, sampling_rate, 0, 5, noise_std=1500)
+    speech = create_chunks(audio_encoding, sampling_rate, 16000, 0.5, noise_std=1500)
+    assert not any(vad.has_speech(chunk) for chunk in quiet)
+    detections = [vad.has_speech(chunk) for chunk in noise]
+    # the noise is taken for speech until the noise floor has caught up with it
+    assert detections[0]
+    assert not any(detections[-50:])
+    assert all(vad.has_speech(chunk) for chunk in speech)
+    vad.reset()
+    assert not any(vad.process(chunk) for chunk in speech)
+    assert any(vad.process(chunk) for chunk in noise[:25])
+
+
+def test_sustained_speech_is_not_an_endpoint():
+    audio_encoding, sampling_rate = AudioEncoding.LINEAR16, 16000
+    vad = EnergyVAD(
+        VADEndpointingConfig(),
+        audio_encoding=audio_encoding,
+        sampling_rate=sampling_rate,
+    )
+    num_samples = sampling_rate * 6
+    t = np.arange(num_samples) / sampling_rate
+    # an unbroken utterance, its level rising and falling by 8 dB around -12 dBFS
+    level_dbfs = -12 + 8 * np.sin(2 * np.pi * t / 1.5)
+    audio = (
+        (10 ** (level_dbfs / 20) * 32768 * np.sin(2 * np.pi * 440 * t))
+        .astype(np.int16)
+        .tobytes()
+    )
+    chunk_size = int(2 * sampling_rate * CHUNK_SECONDS)
+    speech = [audio[i : i + chunk_size] for i in range(0, len(audio), chunk_size)]
+    assert not any(vad.process(chunk) for chunk in speech)
+    silence = create_chunks(audio_encoding, sampling_rate, 0, 0.5)
+    assert any(vad.process(chunk) for chunk in silence)
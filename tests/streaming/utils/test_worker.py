@@ -0,0 +1,86 @@
+import asyncio
+import gc
+import time
+
+import pytest
+
+from vocode.streaming.utils.worker import (
+    InterruptibleEvent,
+    InterruptibleEventFactory,
+    InterruptibleEventRegistry,
+    InterruptibleWorker,
+)
+
+
+class SleepingWorker(InterruptibleWorker[InterruptibleEvent[float]]):
+    async def process(self, item: InterruptibleEvent[float]):
+        try:
+            await asyncio.sleep(item.payload)
+            self.produce_nonblocking(item.payload)
+        except asyncio.CancelledError:
+            pass
+
+
+def create_events(delays):
+    factory = InterruptibleEventFactory()
+    return [factory.create_interruptible_event(delay) for delay in delays]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_outputs_are_released_in_input_order():
+    output_queue: asyncio.Queue[float] = asyncio.Queue()
+    worker = SleepingWorker(asyncio.Queue(), output_queue, max_concurrency=3)
+    worker.start()
+    start_time = time.time()
+    for event in create_events([0.3, 0.1, 0.2]):
+        worker.consume_nonblocking(event)
+    outputs = [await output_queue.get() for _ in range(3)]
+    assert outputs == [0.3, 0.1, 0.2]
+    assert time.time() - start_time < 0.5
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_serial_by_default():
+    output_queue: asyncio.Queue[float] = asyncio.Queue()
+    worker = SleepingWorker(asyncio.Queue(), output_queue)
+    worker.start()
+    start_time = time.time()
+    for event in create_events([0.1, 0.1]):
+        worker.consume_nonblocking(event)
+    for _ in range(2):
+        await output_queue.get()
+    assert time.time() - start_time >= 0.2
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_cancel_current_task_cancels_all_in_flight_items():
+    output_queue: asyncio.Queue[float] = asyncio.Queue()
+    worker = SleepingWorker(asyncio.Queue(), output_queue, max_concurrency=2)
+    worker.start()
+    slow_event, fast_event = create_events([0.2, 0.05])
+    worker.consume_nonblocking(slow_event)
+    worker.consume_nonblocking(fast_event)
+    await asyncio.sleep(0.1)
+    # the fast item has finished but its output is held back behind the slow one
+    assert output_queue.empty()
+    assert worker.cancel_current_task()
+    await asyncio.sleep(0.2)
+    assert output_queue.empty()
+    assert not worker.in_flight_tasks
+    worker.terminate()
+
+
+def test_registry_only_holds_live_events():
+    registry = InterruptibleEventRegistry()
+    live_event, done_event, uninterruptible_event = create_events([0, 0, 0])
+    uninterruptible_event.is_interruptible = False
+    for event in (live_event, done_event, uninterruptible_event):
+        registry.add(event)
+    del done_event
+    gc.collect()
+    assert len(registry) == 2
+    assert registry.interrupt_all() == 1
+    assert live_event.is_interrupted()
+    assert len(registry) == 0
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.synthesizer.audio_stream_pump import AudioStreamPump
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
+
+CHUNK_SIZE = 100
+
+
+class SlowStream:
+    """Blocks on every read like Azure's AudioDataStream waiting for the service"""
+
+    def __init__(self, audio: bytes, seconds_per_read: float):
+        self.audio = audio
+        self.seconds_per_read = seconds_per_read
+        self.num_reads = 0
+        self.detached = threading.Event()
+
+    def read_chunk(self, size: int) -> bytes:
+        time.sleep(self.seconds_per_read)
+        self.num_reads += 1
+        if self.detached.is_set():
+            return b""
+        chunk, self.audio = self.audio[:size], self.audio[size:]
+        return chunk
+
+
+def create_pump(stream: SlowStream, max_buffered_chunks: int = 4) -> AudioStreamPump:
+    return AudioStreamPump(
+        stream.read_chunk,
+        ChunkSizeSchedule(
+            TestSynthesizerConfig(
+                sampling_rate=8000, audio_encoding=AudioEncoding.MULAW
+            ),
+            CHUNK_SIZE,
+        ),
+        max_buffered_chunks=max_buffered_chunks,
+        on_stop=stream.detached.set,
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_without_blocking_the_event_loop():
+    audio = bytes(range(256)) * 4
+    stream = SlowStream(audio, seconds_per_read=0.02)
+    num_ticks = 0
+
+    async def tick():
+        nonlocal num_ticks
+        while True:
+            await asyncio.sleep(0.005)
+            num_ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    chunks = [chunk async for chunk in create_pump(stream).chunks()]
+    ticker.cancel()
+    assert b"".join(chunk for chunk, _ in chunks) == audio
+    assert [is_last for _, is_last in chunks] == [False] * 10 + [True]
+    # 11 reads of 20ms, the loop kept ticking meanwhile
+    assert num_ticks > 20
+
+
+@pytest.mark.asyncio
+async def test_closing_early_stops_the_pump():
+    stream = SlowStream(bytes(100 * CHUNK_SIZE), seconds_per_read=0.01)
+    chunks = create_pump(stream, max_buffered_chunks=2).chunks()
+    await chunks.__anext__()
+    await asyncio.sleep(0.1)
+    # the pump is held back by the consumer
+    assert stream.num_reads <= 4
+    await chunks.aclose()
+    assert stream.detached.is_set()
+    await asyncio.sleep(0.2)
+    assert stream.num_reads <= 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_pumps_dont_wait_for_each_other():
+    streams = [
+        SlowStream(bytes(10 * CHUNK_SIZE), seconds_per_read=0.01) for _ in range(8)
+    ]
+
+    async def get_first_chunk_seconds(stream: SlowStream) -> float:
+        start = time.monotonic()
+        chunks = create_pump(stream, max_buffered_chunks=1).chunks()
+        await chunks.__anext__()
+        first_chunk_seconds = time.monotonic() - start
+        async for _ in chunks:
+            # paced like playback, so each pump spends the utterance waiting on its consumer
+            await asyncio.sleep(0.05)
+        return first_chunk_seconds
+
+    first_chunk_seconds = await asyncio.gather(
+        *[get_first_chunk_seconds(stream) for stream in streams]
+    )
+    assert max(first_chunk_seconds) < 0.2
@@ -0,0 +1,50 @@
+import gc
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("azure.cognitiveservices.speech")
+
+from vocode.streaming.synthesizer.azure_synthesizer import WordBoundaryDispatcher
+
+
+def create_event(result_id: str, seconds: float, text_offset: int):
+    # Azure's audio offsets are in ticks of 100ns
+    return SimpleNamespace(
+        result_id=result_id,
+        audio_offset=int(seconds * 10_000_000),
+        text_offset=text_offset,
+    )
+
+
+def test_events_are_routed_to_their_utterance():
+    dispatcher = WordBoundaryDispatcher()
+    # events can arrive before the utterance is registered
+    dispatcher.dispatch(create_event("first", 0.0, 10))
+    first_pool = dispatcher.register("first")
+    second_pool = dispatcher.register("second")
+    dispatcher.dispatch(create_event("first", 0.5, 20))
+    dispatcher.dispatch(create_event("second", 0.2, 30))
+    dispatcher.dispatch(create_event("first", 0.3, 15))
+
+    assert first_pool.text_offsets == [10, 15, 20]
+    assert first_pool.get_text_offset_after(0.4) == 20
+    assert first_pool.get_text_offset_after(1.0) is None
+    assert second_pool.text_offsets == [30]
+
+
+def test_pools_are_released():
+    dispatcher = WordBoundaryDispatcher()
+    pool = dispatcher.register("played")
+    dispatcher.release("played")
+    assert "played" not in dispatcher.pools
+    # released pools still answer get_message_up_to for their SynthesisResult
+    assert pool.get_text_offset_after(0) is None
+
+    dispatcher.register("dropped")
+    gc.collect()
+    assert "dropped" not in dispatcher.pools
+
+    for i in range(WordBoundaryDispatcher.MAX_PENDING_RESULTS + 5):
+        dispatcher.dispatch(create_event(f"never_registered_{i}", 0, 0))
+    assert len(dispatcher.pending_pools) == WordBoundaryDispatcher.MAX_PENDING_RESULTS
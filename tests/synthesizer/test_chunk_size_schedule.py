@@ -0,0 +1,28 @@
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.synthesizer import AdaptiveChunkingConfig
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
+
+CHUNK_SIZE = 32000
+
+
+def test_fixed_chunk_size_without_adaptive_chunking():
+    synthesizer_config = TestSynthesizerConfig(
+        sampling_rate=16000, audio_encoding=AudioEncoding.LINEAR16
+    )
+    chunk_size_schedule = ChunkSizeSchedule(synthesizer_config, CHUNK_SIZE)
+    assert [chunk_size_schedule.next_chunk_size() for _ in range(3)] == [CHUNK_SIZE] * 3
+
+
+def test_adaptive_chunk_sizes_grow_up_to_chunk_size():
+    synthesizer_config = TestSynthesizerConfig(
+        sampling_rate=16000,
+        audio_encoding=AudioEncoding.LINEAR16,
+        adaptive_chunking_config=AdaptiveChunkingConfig(
+            first_chunk_size_seconds=0.05, growth_factor=3
+        ),
+    )
+    chunk_size_schedule = ChunkSizeSchedule(synthesizer_config, CHUNK_SIZE)
+    chunk_sizes = [chunk_size_schedule.next_chunk_size() for _ in range(6)]
+    assert chunk_sizes == [1600, 4800, 14400, 32000, 32000, 32000]
+    assert all(chunk_size % 2 == 0 for chunk_size in chunk_sizes)
@@ -0,0 +1,55 @@
+import asyncio
+import concurrent.futures
+import mmap
+import threading
+
+import pytest
+
+from vocode.streaming.synthesizer.filler_audio_store import FillerAudioStore
+
+
+@pytest.mark.asyncio
+async def test_audio_is_generated_once_and_mapped_from_cache_path(tmp_path):
+    num_synthesized = 0
+
+    async def synthesize() -> bytes:
+        nonlocal num_synthesized
+        num_synthesized += 1
+        await asyncio.sleep(0.01)
+        return b"\x7f" * 8000
+
+    filler_audio_store = FillerAudioStore(cache_path=str(tmp_path))
+    audio_datas = await asyncio.gather(
+        *[filler_audio_store.get_audio_data("um", synthesize) for _ in range(5)]
+    )
+    assert num_synthesized == 1
+    assert all(audio_data is audio_datas[0] for audio_data in audio_datas)
+
+    # another process pointing to the same cache path maps the audio instead of synthesizing it
+    audio_data = await FillerAudioStore(cache_path=str(tmp_path)).get_audio_data(
+        "um", synthesize
+    )
+    assert num_synthesized == 1
+    assert isinstance(audio_data, mmap.mmap)
+    assert audio_data[:] == b"\x7f" * 8000
+
+
+def test_event_loops_dont_share_generation_tasks():
+    filler_audio_store = FillerAudioStore()
+    started = threading.Barrier(2)
+
+    async def synthesize() -> bytes:
+        await asyncio.sleep(0.01)
+        return b"\x7f" * 8000
+
+    def get_audio_data():
+        async def wait_and_get_audio_data():
+            # both loops ask for the audio while the other's generation is still running
+            started.wait()
+            return await filler_audio_store.get_audio_data("um", synthesize)
+
+        return asyncio.run(wait_and_get_audio_data())
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(get_audio_data) for _ in range(2)]
+        assert all(future.result() == b"\x7f" * 8000 for future in futures)
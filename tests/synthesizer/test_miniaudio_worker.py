@@ -0,0 +1,125 @@
+import asyncio
+import queue
+from typing import Optional
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.synthesizer.decode_pool import DecodePool
+from vocode.streaming.synthesizer.miniaudio_worker import MiniaudioWorker
+
+MP3_CHUNK_SIZE = 1024
+
+
+async def stream_utterance(
+    worker: MiniaudioWorker,
+    mp3: bytes,
+    mp3_chunk_size: int = MP3_CHUNK_SIZE,
+    chunk_interval_seconds: float = 0,
+) -> bytes:
+    async def send_chunks():
+        for i in range(0, len(mp3), mp3_chunk_size):
+            worker.consume_nonblocking(mp3[i : i + mp3_chunk_size])
+            if chunk_interval_seconds:
+                await asyncio.sleep(chunk_interval_seconds)
+        worker.consume_nonblocking(None)
+
+    send_chunks_task = asyncio.create_task(send_chunks())
+    audio = bytearray()
+    while True:
+        chunk, is_last = await asyncio.wait_for(worker.output_queue.get(), timeout=5)
+        audio.extend(chunk)
+        if is_last:
+            await send_chunks_task
+            return bytes(audio)
+
+
+def create_worker(decode_pool: Optional[DecodePool] = None) -> MiniaudioWorker:
+    worker = MiniaudioWorker(
+        TestSynthesizerConfig(sampling_rate=8000, audio_encoding=AudioEncoding.MULAW),
+        chunk_size=1600,
+        input_queue=queue.Queue(),
+        output_queue=asyncio.Queue(),
+        decode_pool=decode_pool,
+    )
+    worker.start()
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_decodes_consecutive_streamed_utterances():
+    with open("tests/streaming/data/fake_audio.mp3", "rb") as f:
+        mp3 = f.read()
+    worker = MiniaudioWorker(
+        TestSynthesizerConfig(sampling_rate=8000, audio_encoding=AudioEncoding.MULAW),
+        chunk_size=1600,
+        input_queue=queue.Queue(),
+        output_queue=asyncio.Queue(),
+    )
+    worker.start()
+    first_utterance = await stream_utterance(worker, mp3)
+    # fake_audio.mp3 is about 1.4s long
+    assert 1.3 < len(first_utterance) / 8000 < 1.7
+    assert await stream_utterance(worker, mp3) == first_utterance
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_streams_share_a_bounded_decode_pool():
+    with open("tests/streaming/data/fake_audio.mp3", "rb") as f:
+        mp3 = f.read()
+    decode_pool = DecodePool(max_workers=2)
+    workers = [
+        MiniaudioWorker(
+            TestSynthesizerConfig(
+                sampling_rate=8000, audio_encoding=AudioEncoding.MULAW
+            ),
+            chunk_size=1600,
+            input_queue=queue.Queue(),
+            output_queue=asyncio.Queue(),
+            decode_pool=decode_pool,
+        )
+        for _ in range(5)
+    ]
+    for worker in workers:
+        worker.start()
+    utterances = await asyncio.gather(
+        *[stream_utterance(worker, mp3) for worker in workers]
+    )
+    assert len(set(utterances)) == 1
+    for worker in workers:
+        worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_decoding_does_not_depend_on_mp3_chunking():
+    with open("tests/streaming/data/fake_audio.mp3", "rb") as f:
+        mp3 = f.read()
+    worker = create_worker()
+    whole = await stream_utterance(worker, mp3, mp3_chunk_size=len(mp3))
+    for mp3_chunk_size in [1, 100, 417, 5000]:
+        assert await stream_utterance(worker, mp3, mp3_chunk_size) == whole
+    worker.terminate()
+
+
+@pytest.mark.asyncio
+async def test_more_streams_than_pool_threads_make_progress():
+    with open("tests/streaming/data/fake_audio.mp3", "rb") as f:
+        mp3 = f.read()
+    # every stream is still receiving chunks while the others decode, so a thread held by a
+    # stream waiting for its next chunk would stall the streams queued behind it
+    decode_pool = DecodePool(max_workers=2)
+    workers = [create_worker(decode_pool) for _ in range(8)]
+    utterances = await asyncio.gather(
+        *[
+            stream_utterance(
+                worker, mp3, mp3_chunk_size=500, chunk_interval_seconds=0.01
+            )
+            for worker in workers
+        ]
+    )
+    assert len(set(utterances)) == 1
+    assert 1.3 < len(utterances[0]) / 8000 < 1.7
+    for worker in workers:
+        worker.terminate()
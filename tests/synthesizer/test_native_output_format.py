@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+import pytest_asyncio
+from aiohttp import web
+
+from tests.streaming.data.loader import get_audio_path
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import (
+    ElevenLabsSynthesizerConfig,
+    PlayHtSynthesizerConfig,
+)
+from vocode.streaming.synthesizer import eleven_labs_synthesizer, play_ht_synthesizer
+from vocode.streaming.synthesizer.eleven_labs_synthesizer import ElevenLabsSynthesizer
+from vocode.streaming.synthesizer.play_ht_synthesizer import PlayHtSynthesizer
+
+CHUNK_SIZE = 1000
+# the stand-in server's raw audio, sent in pieces that don't line up with chunks
+RAW_AUDIO = np.random.default_rng(0).integers(0, 256, 4500, dtype=np.uint8).tobytes()
+RESPONSE_PIECE_SIZE = 777
+# the output format of each request to the stand-in server
+requested_output_formats: list = []
+
+
+async def stream_audio(request: web.Request, output_format: str) -> web.StreamResponse:
+    requested_output_formats.append(output_format)
+    response = web.StreamResponse()
+    await response.prepare(request)
+    if output_format == "mp3":
+        with open(get_audio_path("fake_audio.mp3"), "rb") as f:
+            await response.write(f.read())
+    else:
+        for i in range(0, len(RAW_AUDIO), RESPONSE_PIECE_SIZE):
+            await response.write(RAW_AUDIO[i : i + RESPONSE_PIECE_SIZE])
+    await response.write_eof()
+    return response
+
+
+async def eleven_labs_tts(request: web.Request) -> web.StreamResponse:
+    return await stream_audio(request, request.query.get("output_format", "mp3"))
+
+
+async def play_ht_tts(request: web.Request) -> web.StreamResponse:
+    body = await request.json()
+    return await stream_audio(request, body.get("output_format", "mp3"))
+
+
+@pytest_asyncio.fixture
+async def stand_in_server(monkeypatch):
+    requested_output_formats.clear()
+    app = web.Application()
+    app.router.add_post("/v1/text-to-speech/{voice_id}/stream", eleven_labs_tts)
+    app.router.add_post("/api/v2/tts/stream", play_ht_tts)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+    monkeypatch.setattr(
+        eleven_labs_synthesizer, "ELEVEN_LABS_BASE_URL", f"{base_url}/v1/"
+    )
+    monkeypatch.setattr(
+        play_ht_synthesizer, "TTS_ENDPOINT", f"{base_url}/api/v2/tts/stream"
+    )
+    yield requested_output_formats
+    await runner.cleanup()
+
+
+async def synthesize(synthesizer) -> list:
+    synthesis_result = await synthesizer.create_speech(
+        BaseMessage(text="Hello, world!"), CHUNK_SIZE
+    )
+    chunks = [chunk async for chunk in synthesis_result.chunk_generator]
+    await synthesizer.tear_down()
+    assert [chunk.is_last_chunk for chunk in chunks].count(True) == 1
+    assert chunks[-1].is_last_chunk
+    return [chunk.chunk for chunk in chunks]
+
+
+def create_play_ht_synthesizer(**kwargs) -> PlayHtSynthesizer:
+    return PlayHtSynthesizer(
+        PlayHtSynthesizerConfig(
+            api_key="api_key",
+            user_id="user_id",
+            experimental_streaming=True,
+            **kwargs,
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_play_ht_streams_native_mulaw(stand_in_server):
+    chunks = await synthesize(
+        create_play_ht_synthesizer(
+            sampling_rate=8000, audio_encoding=AudioEncoding.MULAW
+        )
+    )
+    assert stand_in_server == ["mulaw"]
+    assert b"".join(chunks) == RAW_AUDIO
+    assert all(len(chunk) == CHUNK_SIZE for chunk in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_play_ht_falls_back_to_mp3(stand_in_server):
+    chunks = await synthesize(
+        create_play_ht_synthesizer(
+            sampling_rate=16000, audio_encoding=AudioEncoding.LINEAR16
+        )
+    )
+    assert stand_in_server == ["mp3"]
+    # fake_audio.mp3 is about 1.4s long
+    assert 1.3 < len(b"".join(chunks)) / (2 * 16000) < 1.7
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "audio_encoding,sampling_rate,output_format",
+    [
+        (AudioEncoding.MULAW, 8000, "ulaw_8000"),
+        (AudioEncoding.LINEAR16, 16000, "pcm_16000"),
+    ],
+)
+async def test_eleven_labs_streams_native_output_format(
+    stand_in_server, audio_encoding, sampling_rate, output_format
+):
+    pytest.importorskip("elevenlabs")
+    synthesizer = ElevenLabsSynthesizer(
+        ElevenLabsSynthesizerConfig(
+            api_key="api_key",
+            experimental_streaming=True,
+            sampling_rate=sampling_rate,
+            audio_encoding=audio_encoding,
+        )
+    )
+    chunks = await synthesize(synthesizer)
+    assert stand_in_server == [output_format]
+    assert b"".join(chunks) == RAW_AUDIO
+
+
+@pytest.mark.asyncio
+async def test_eleven_labs_falls_back_to_mp3_for_mulaw_above_8khz(stand_in_server):
+    pytest.importorskip("elevenlabs")
+    synthesizer = ElevenLabsSynthesizer(
+        ElevenLabsSynthesizerConfig(
+            api_key="api_key",
+            experimental_streaming=True,
+            sampling_rate=16000,
+            audio_encoding=AudioEncoding.MULAW,
+        )
+    )
+    chunks = await synthesize(synthesizer)
+    assert stand_in_server == ["mp3"]
+    # fake_audio.mp3 is about 1.4s long
+    assert 1.3 < len(b"".join(chunks)) / 16000 < 1.7
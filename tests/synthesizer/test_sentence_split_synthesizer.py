@@ -0,0 +1,130 @@
+import asyncio
+from typing import List, Optional
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import SentenceSplitConfig
+from vocode.streaming.synthesizer.base_synthesizer import (
+    BaseSynthesizer,
+    SynthesisResult,
+)
+from vocode.streaming.synthesizer.sentence_split_synthesizer import (
+    SentenceSplitSynthesizer,
+    split_sentences,
+)
+
+CHUNK_SIZE = 800
+SENTENCES = ["Hello there.", " How are you?", " I'm fine!", " Bye."]
+
+
+class SentenceSynthesizer(BaseSynthesizer):
+    def __init__(self, synthesizer_config):
+        super().__init__(synthesizer_config)
+        self.synthesized: List[str] = []
+        self.synthesis_results: List[SynthesisResult] = []
+        self.num_synthesizing = 0
+        self.max_num_synthesizing = 0
+
+    async def create_speech(
+        self,
+        message: BaseMessage,
+        chunk_size: int,
+        bot_sentiment: Optional[BotSentiment] = None,
+    ) -> SynthesisResult:
+        self.synthesized.append(message.text)
+        self.num_synthesizing += 1
+        self.max_num_synthesizing = max(
+            self.max_num_synthesizing, self.num_synthesizing
+        )
+        await asyncio.sleep(0.01)
+        self.num_synthesizing -= 1
+        # a second of audio per sentence
+        synthesis_result = self.create_synthesis_result_from_raw(
+            synthesizer_config=self.synthesizer_config,
+            output_bytes=bytes([SENTENCES.index(message.text)]) * 8000
+            if message.text in SENTENCES
+            else b"\0" * 8000,
+            message=message,
+            chunk_size=chunk_size,
+        )
+        self.synthesis_results.append(synthesis_result)
+        return synthesis_result
+
+
+def make_synthesizer(max_concurrency: int) -> SentenceSplitSynthesizer:
+    return SentenceSplitSynthesizer(
+        SentenceSynthesizer(
+            TestSynthesizerConfig(
+                sampling_rate=8000, audio_encoding=AudioEncoding.MULAW
+            )
+        ),
+        SentenceSplitConfig(min_characters=10, max_concurrency=max_concurrency),
+    )
+
+
+def test_split_sentences():
+    text = "".join(SENTENCES)
+    assert split_sentences(text) == [
+        (text.index(sentence), sentence) for sentence in SENTENCES
+    ]
+    assert split_sentences("3.5 percent, e.g.this") == [(0, "3.5 percent, e.g.this")]
+
+
+@pytest.mark.asyncio
+async def test_sentences_are_streamed_in_order_with_bounded_concurrency():
+    synthesizer = make_synthesizer(max_concurrency=2)
+    message = BaseMessage(text="".join(SENTENCES))
+    synthesis_result = await synthesizer.create_speech(message, CHUNK_SIZE)
+
+    audio = b""
+    last_chunks = []
+    async for chunk_result in synthesis_result.chunk_generator:
+        audio += chunk_result.chunk
+        last_chunks.append(chunk_result.is_last_chunk)
+    assert audio == b"".join(bytes([i]) * 8000 for i in range(len(SENTENCES)))
+    assert last_chunks == [False] * (len(last_chunks) - 1) + [True]
+    assert synthesizer.synthesizer.synthesized == SENTENCES
+    assert synthesizer.synthesizer.max_num_synthesizing == 2
+
+    assert synthesis_result.get_message_up_to(0.5) == "Hello "
+    assert synthesis_result.get_message_up_to(1.5) == "Hello there. How a"
+    assert synthesis_result.get_message_up_to(4) == message.text
+
+
+@pytest.mark.asyncio
+async def test_interrupting_stops_synthesizing_the_rest_of_the_message():
+    synthesizer = make_synthesizer(max_concurrency=1)
+    synthesis_result = await synthesizer.create_speech(
+        BaseMessage(text="".join(SENTENCES)), CHUNK_SIZE
+    )
+    async for _ in synthesis_result.chunk_generator:
+        break
+    await synthesis_result.chunk_generator.aclose()
+    await asyncio.sleep(0.05)
+    assert synthesizer.synthesizer.synthesized == SENTENCES[:1]
+
+
+@pytest.mark.asyncio
+async def test_interrupting_closes_the_audio_synthesized_ahead():
+    synthesizer = make_synthesizer(max_concurrency=3)
+    synthesis_result = await synthesizer.create_speech(
+        BaseMessage(text="".join(SENTENCES)), CHUNK_SIZE
+    )
+    async for _ in synthesis_result.chunk_generator:
+        break
+    await asyncio.sleep(0.05)
+    await synthesis_result.chunk_generator.aclose()
+    assert synthesizer.synthesizer.synthesized == SENTENCES
+    for sentence_result in synthesizer.synthesizer.synthesis_results:
+        assert sentence_result.chunk_generator.ag_frame is None  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_short_messages_are_not_split():
+    synthesizer = make_synthesizer(max_concurrency=2)
+    await synthesizer.create_speech(BaseMessage(text="Hi. Bye."), CHUNK_SIZE)
+    assert synthesizer.synthesizer.synthesized == ["Hi. Bye."]
@@ -0,0 +1,39 @@
+from vocode.streaming.synthesizer.ssml_builder import (
+    DEFAULT_PRONUNCIATION_RULES,
+    PhonemeRule,
+    SSMLBuilder,
+)
+
+
+def create_ssml_builder(**kwargs) -> SSMLBuilder:
+    return SSMLBuilder(
+        voice_name="en-US-SteffanNeural",
+        language_code="en-US",
+        pitch=0,
+        rate=15,
+        **kwargs,
+    )
+
+
+def test_default_rules():
+    ssml = create_ssml_builder().build("Dr. Chiro, email a.b@c.io")
+    assert "<text>doctor</text>" in ssml
+    assert '<phoneme alphabet="ipa" ph="ˈkaɪ.ro">Chiro</phoneme><text>,</text>' in ssml
+    assert (
+        '<say-as interpret-as="characters">a</say-as><break time="500ms" />'
+        '<text> dot </text><break time="500ms" />'
+    ) in ssml
+    assert "<text>a.b@c.io</text>" not in ssml
+
+
+def test_pluggable_rules_and_memoization():
+    ssml_builder = create_ssml_builder(
+        pronunciation_rules=[PhonemeRule("vocode", "ˈvoʊ.koʊd")]
+        + DEFAULT_PRONUNCIATION_RULES
+    )
+    ssml = ssml_builder.build("Welcome to Vocode!")
+    assert (
+        '<phoneme alphabet="ipa" ph="ˈvoʊ.koʊd">Vocode</phoneme><text>!</text>' in ssml
+    )
+    assert ssml_builder.build("Welcome to Vocode!") is ssml
+    assert ssml_builder.render.cache_info().hits == 1
@@ -0,0 +1,85 @@
+from typing import Optional
+
+import pytest
+
+from tests.streaming.fixtures.synthesizer import TestSynthesizerConfig
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import SynthesisCacheConfig
+from vocode.streaming.synthesizer.base_synthesizer import (
+    BaseSynthesizer,
+    SynthesisResult,
+)
+from vocode.streaming.synthesizer.synthesis_cache import SynthesisCache
+
+CHUNK_SIZE = 800
+
+
+class CountingSynthesizer(BaseSynthesizer):
+    def __init__(self, synthesizer_config):
+        super().__init__(synthesizer_config)
+        self.num_synthesized = 0
+
+    async def create_speech(
+        self,
+        message: BaseMessage,
+        chunk_size: int,
+        bot_sentiment: Optional[BotSentiment] = None,
+    ) -> SynthesisResult:
+        self.num_synthesized += 1
+        # a second of audio per character
+        return self.create_synthesis_result_from_raw(
+            synthesizer_config=self.synthesizer_config,
+            output_bytes=message.text.encode() * 8000,
+            message=message,
+            chunk_size=chunk_size,
+        )
+
+
+async def play(synthesis_result: SynthesisResult, num_chunks=None) -> bytes:
+    audio = b""
+    async for chunk_result in synthesis_result.chunk_generator:
+        audio += chunk_result.chunk
+        if num_chunks is not None and len(audio) >= num_chunks * CHUNK_SIZE:
+            break
+    return audio
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_past_byte_budget_and_reads_back_from_disk(tmp_path):
+    synthesis_cache = SynthesisCache(max_bytes=10, disk_cache_path=str(tmp_path))
+    await synthesis_cache.put("a", b"a" * 4)
+    await synthesis_cache.put("b", b"b" * 4)
+    assert await synthesis_cache.get("a") == b"a" * 4
+    await synthesis_cache.put("c", b"c" * 4)
+    # b was the least recently used
+    assert list(synthesis_cache.entries) == ["a", "c"]
+    assert synthesis_cache.num_bytes == 8
+    assert await synthesis_cache.get("b") == b"b" * 4
+    assert await SynthesisCache(max_bytes=10).get("b") is None
+
+
+@pytest.mark.asyncio
+async def test_create_speech_with_cache(tmp_path):
+    synthesizer = CountingSynthesizer(
+        TestSynthesizerConfig(
+            sampling_rate=8000,
+            audio_encoding=AudioEncoding.MULAW,
+            synthesis_cache_config=SynthesisCacheConfig(disk_cache_path=str(tmp_path)),
+        )
+    )
+    message = BaseMessage(text="are you still there?")
+    # interrupted speech isn't cached
+    await play(await synthesizer.create_speech_with_cache(message, CHUNK_SIZE), 2)
+    audio = await play(await synthesizer.create_speech_with_cache(message, CHUNK_SIZE))
+    assert synthesizer.num_synthesized == 2
+
+    cached_synthesis_result = await synthesizer.create_speech_with_cache(
+        message, CHUNK_SIZE
+    )
+    assert synthesizer.num_synthesized == 2
+    assert await play(cached_synthesis_result) == audio
+    assert cached_synthesis_result.get_message_up_to(5) == "are y"
+    assert cached_synthesis_result.get_message_up_to(100) == message.text
+    await synthesizer.tear_down()
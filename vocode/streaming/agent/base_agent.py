@@ -7,6 +7,7 @@ import logging
 import random
 from typing import (
     AsyncGenerator,
+    AsyncIterable,
     Generator,
     Generic,
     Optional,
@@ -24,6 +25,7 @@ from vocode.streaming.action.phone_call_action import (
     VonagePhoneCallAction,
 )
 from vocode.streaming.agent.lyngo_chat_gpt_agent_factory import LyngoChatGPTAgentRegistry
+from vocode.streaming.agent.speculation import Speculation
 from vocode.streaming.models.actions import (
     ActionConfig,
     ActionInput,
@@ -42,8 +44,11 @@ from vocode.streaming.models.message import BaseMessage
 from vocode.streaming.models.model import BaseModel, TypedModel
 from vocode.streaming.transcriber.base_transcriber import Transcription
 from vocode.streaming.utils import remove_non_letters_digits
+from vocode.streaming.utils.bounded_queue import BoundedQueue
 from vocode.streaming.utils.goodbye_model import GoodbyeModel
-from vocode.streaming.models.transcript import Transcript
+from vocode.streaming.models.events import Sender
+from vocode.streaming.models.transcript import Message, Transcript
+from vocode.streaming.utils.turn_latency import TurnLatencyTracker, TurnStage
 from vocode.streaming.utils.worker import (
     InterruptibleAgentResponseEvent,
     InterruptibleEvent,
@@ -74,6 +79,17 @@ class AgentInput(TypedModel, type=AgentInputType.BASE.value):
         arbitrary_types_allowed = True
 
 
+def get_confidence_label(confidence: float) -> str:
+    if confidence == 0.0:
+        return "UNKNOWN"
+    elif confidence <= 0.65:
+        return "LOW"
+    elif confidence > 0.65 and confidence <= 0.89:
+        return "MEDIUM"
+    else:
+        return "HIGH"
+
+
 class TranscriptionAgentInput(AgentInput, type=AgentInputType.TRANSCRIPTION.value):
     transcription: Transcription
 
@@ -149,10 +165,13 @@ class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
     ):
         self.input_queue: asyncio.Queue[
             InterruptibleEvent[AgentInput]
-        ] = asyncio.Queue()
+        ] = BoundedQueue(
+            "agent.input", agent_config.input_queue_config, awaits_put=True
+        )
+        # agent responses are awaited through their agent_response_tracker, so they're never dropped
         self.output_queue: asyncio.Queue[
             InterruptibleAgentResponseEvent[AgentResponse]
-        ] = asyncio.Queue()
+        ] = BoundedQueue("agent.output")
         AbstractAgent.__init__(self, agent_config=agent_config)
         InterruptibleWorker.__init__(
             self,
@@ -172,6 +191,8 @@ class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
                 self.goodbye_model.initialize_embeddings()
             )
         self.transcript: Optional[Transcript] = None
+        self.turn_latency_tracker: Optional[TurnLatencyTracker] = None
+        self.speculation: Optional[Speculation] = None
 
         self.functions = self.get_functions() if self.agent_config.actions else None
         self.is_muted = False
@@ -182,6 +203,114 @@ class BaseAgent(AbstractAgent[AgentConfigType], InterruptibleWorker):
     def attach_transcript(self, transcript: Transcript):
         self.transcript = transcript
 
+    def attach_turn_latency_tracker(self, turn_latency_tracker: TurnLatencyTracker):
+        self.turn_latency_tracker = turn_latency_tracker
+
+    def mark_turn_stage(self, stage: TurnStage):
+        if self.turn_latency_tracker is not None:
+            self.turn_latency_tracker.mark(stage)
+
+    async def mark_first_token(
+        self, tokens: AsyncIterable[Union[str, FunctionFragment]]
+    ) -> AsyncGenerator[Union[str, FunctionFragment], None]:
+        is_first_token = True
+        async for token in tokens:
+            if is_first_token:
+                self.mark_turn_stage(TurnStage.AGENT_FIRST_TOKEN)
+                is_first_token = False
+            yield token
+
+    def supports_speculation(self) -> bool:
+        # actions have side effects, so they are never run on a speculative response
+        return (
+            self.agent_config.speculative_generation_config is not None
+            and not self.agent_config.actions
+        )
+
+    async def speculate(self, item: InterruptibleEvent[TranscriptionAgentInput]):
+        """Queues a response to an interim transcription behind the agent's other inputs, its
+        outputs are held back until commit_speculation() is called with a matching final
+        transcription"""
+        self.cancel_speculation()
+        speculation = Speculation(item, item.payload.transcription)
+        self.speculation = speculation
+        try:
+            await self.input_queue.put(
+                typing.cast(InterruptibleEvent[AgentInput], item)
+            )
+        except asyncio.CancelledError:
+            if self.speculation is speculation:
+                self.speculation = None
+            raise
+
+    def get_current_speculation(self) -> Optional[Speculation]:
+        """The uncommitted speculation whose response is being generated in the current task"""
+        speculation = self.speculation
+        if (
+            speculation is not None
+            and not speculation.is_committed
+            and self.get_current_item() is speculation.item
+        ):
+            return speculation
+        return None
+
+    def commit_speculation(self, transcription: Transcription) -> bool:
+        """Releases the held outputs if the speculation was on the same message as the final
+        transcription, returns False if the transcription still needs a response"""
+        speculation = self.speculation
+        if (
+            speculation is None
+            or speculation.is_committed
+            or not speculation.matches(transcription)
+        ):
+            return False
+        speculation.is_committed = True
+        # if the speculation hasn't started yet, it responds to the final transcription
+        speculation.item.payload.transcription = transcription
+        if speculation.human_message is not None and self.transcript is not None:
+            speculation.human_message.text = (
+                transcription.message
+                + f" (conf: {get_confidence_label(transcription.confidence)})"
+            )
+            self.transcript.maybe_publish_transcript_event_from_message(
+                speculation.human_message,
+                conversation_id=speculation.item.payload.conversation_id,
+            )
+        for output in speculation.held_outputs:
+            InterruptibleWorker.produce_nonblocking(self, output)
+        speculation.held_outputs.clear()
+        return True
+
+    def cancel_speculation(self) -> bool:
+        """Cancels the speculation if it hasn't been committed"""
+        speculation = self.speculation
+        if speculation is None or speculation.is_committed:
+            return False
+        self.speculation = None
+        # skipped by the worker if it hasn't started yet
+        speculation.item.interrupt()
+        for task, item in self.in_flight_tasks.values():
+            if item is speculation.item:
+                task.cancel()
+        if self.transcript is not None:
+            for idx, event_log in enumerate(self.transcript.event_logs):
+                if event_log is speculation.human_message:
+                    del self.transcript.event_logs[idx]
+                    break
+        return True
+
+    def produce_nonblocking(self, item):
+        speculation = self.get_current_speculation()
+        if speculation is not None:
+            speculation.held_outputs.append(item)
+            return
+        super().produce_nonblocking(item)
+
+    def cancel_current_task(self):
+        # a committed speculation is in flight like any other input, and is cancelled with them
+        cancelled_speculation = self.cancel_speculation()
+        return super().cancel_current_task() or cancelled_speculation
+
     def attach_conversation_state_manager(
         self, conversation_state_manager: ConversationStateManager
     ):
@@ -230,6 +359,7 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                 continue
             if is_first_response:
                 agent_span_first.end()
+                self.mark_turn_stage(TurnStage.AGENT_FIRST_SENTENCE)
                 is_first_response = False
             self.produce_interruptible_agent_response_event_nonblocking(
                 AgentResponseMessage(message=BaseMessage(text=response)),
@@ -259,6 +389,7 @@ class RespondAgent(BaseAgent[AgentConfigType]):
             response = None
             return True
         if response:
+            self.mark_turn_stage(TurnStage.AGENT_FIRST_SENTENCE)
             self.produce_interruptible_agent_response_event_nonblocking(
                 AgentResponseMessage(message=BaseMessage(text=response)),
                 is_interruptible=self.agent_config.allow_agent_to_be_cut_off,
@@ -279,18 +410,24 @@ class RespondAgent(BaseAgent[AgentConfigType]):
                 transcription = typing.cast(
                     TranscriptionAgentInput, agent_input
                 ).transcription
-                if transcription.confidence == 0.0:
-                    conf_score = "UNKNOWN"
-                elif transcription.confidence <= 0.65:
-                    conf_score = "LOW"
-                elif transcription.confidence > 0.65 and transcription.confidence <= 0.89:
-                    conf_score = "MEDIUM"
+                conf_score = get_confidence_label(transcription.confidence)
+                speculation = self.get_current_speculation()
+                if speculation is not None:
+                    # published when the speculation is committed, removed if it's cancelled
+                    speculation.human_message = Message(
+                        text=transcription.message + f" (conf: {conf_score})",
+                        sender=Sender.HUMAN,
+                    )
+                    self.transcript.add_message(
+                        speculation.human_message,
+                        conversation_id=agent_input.conversation_id,
+                        publish_to_events_manager=False,
+                    )
                 else:
-                    conf_score = "HIGH"
-                self.transcript.add_human_message(
-                    text=transcription.message + f" (conf: {conf_score})",
-                    conversation_id=agent_input.conversation_id,
-                )
+                    self.transcript.add_human_message(
+                        text=transcription.message + f" (conf: {conf_score})",
+                        conversation_id=agent_input.conversation_id,
+                    )
             elif isinstance(agent_input, ActionResultAgentInput):
                 self.transcript.add_action_finish_log(
                     action_input=agent_input.action_input,
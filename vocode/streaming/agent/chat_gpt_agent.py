@@ -196,6 +196,6 @@ class ChatGPTAgent(RespondAgent[ChatGPTAgentConfig]):
         chat_parameters["stream"] = True
         stream = await self.aclient.chat.completions.create(**chat_parameters)
         async for message in collate_response_async(
-            openai_get_tokens(stream), get_functions=True
+            self.mark_first_token(openai_get_tokens(stream)), get_functions=True
         ):
             yield message, True
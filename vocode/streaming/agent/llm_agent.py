@@ -108,7 +108,7 @@ class LLMAgent(RespondAgent[LLMAgentConfig]):
         stop=self.stop_tokens,
         stream=True)
         async for sentence in collate_response_async(
-            openai_get_tokens(gen=stream),
+            self.mark_first_token(openai_get_tokens(gen=stream)),
         ):
             yield sentence
 
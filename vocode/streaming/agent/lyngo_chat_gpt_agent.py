@@ -246,6 +246,6 @@ class LyngoChatGPTAgent(RespondAgent[LyngoChatGPTAgentConfig]):
         chat_parameters["stream"] = True
         stream = await self.aclient.chat.completions.create(**chat_parameters)
         async for message in collate_response_async(
-            openai_get_tokens(stream), get_functions=True
+            self.mark_first_token(openai_get_tokens(stream)), get_functions=True
         ):
             yield message, True
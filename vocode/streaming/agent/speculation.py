@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import re
+from typing import Any, List, Optional
+
+from vocode.streaming.models.transcript import Message
+from vocode.streaming.transcriber.base_transcriber import Transcription
+from vocode.streaming.utils.worker import InterruptibleEvent
+
+
+def normalize_transcript(text: str) -> str:
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+class Speculation:
+    """A response to an interim transcription, generated before the user's turn has ended.
+
+    Its item goes through the agent's input queue like any other input. The outputs are held back
+    until it's committed by a matching final transcription.
+    """
+
+    def __init__(self, item: InterruptibleEvent, transcription: Transcription):
+        self.item = item
+        self.transcription = transcription
+        self.normalized_message = normalize_transcript(transcription.message)
+        self.held_outputs: List[Any] = []
+        # added to the transcript without being published until the speculation is committed
+        self.human_message: Optional[Message] = None
+        self.is_committed = False
+
+    def matches(self, transcription: Transcription) -> bool:
+        return self.normalized_message == normalize_transcript(transcription.message)
@@ -24,6 +24,9 @@ from vocode.streaming.streaming_conversation import StreamingConversation
 from vocode.streaming.synthesizer.azure_synthesizer import AzureSynthesizer
 from vocode.streaming.synthesizer.base_synthesizer import BaseSynthesizer
 from vocode.streaming.transcriber.base_transcriber import BaseTranscriber
+from vocode.streaming.transcriber.connection_pool import (
+    close_transcriber_connection_pool,
+)
 from vocode.streaming.transcriber.deepgram_transcriber import DeepgramTranscriber
 from vocode.streaming.utils.base_router import BaseRouter
 
@@ -61,7 +64,7 @@ class ConversationRouter(BaseRouter):
         self.agent_thunk = agent_thunk
         self.synthesizer_thunk = synthesizer_thunk
         self.logger = logger or logging.getLogger(__name__)
-        self.router = APIRouter()
+        self.router = APIRouter(on_shutdown=[close_transcriber_connection_pool])
         self.router.websocket(conversation_endpoint)(self.conversation)
 
     def get_conversation(
@@ -8,6 +8,7 @@ from vocode.streaming.models.actions import ActionConfig
 
 from vocode.streaming.models.message import BaseMessage
 from .model import TypedModel, BaseModel
+from .queue import QueueConfig
 from .vector_db import VectorDBConfig
 
 FILLER_AUDIO_DEFAULT_SILENCE_THRESHOLD_SECONDS = 0.5
@@ -54,6 +55,17 @@ class FillerAudioConfig(BaseModel):
         return v
 
 
+class SpeculativeGenerationConfig(BaseModel):
+    # how long an interim transcript has to stay unchanged before generation starts on it
+    stable_interim_seconds: float = 0.2
+
+    @validator("stable_interim_seconds")
+    def stable_interim_seconds_must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+
 class WebhookConfig(BaseModel):
     url: str
 
@@ -76,6 +88,9 @@ class AgentConfig(TypedModel, type=AgentType.BASE.value):
     webhook_config: Optional[WebhookConfig] = None
     track_bot_sentiment: bool = False
     actions: Optional[List[ActionConfig]] = None
+    speculative_generation_config: Optional[SpeculativeGenerationConfig] = None
+    # bounds the agent's queue of inputs; its producers await put(), so BLOCK applies backpressure
+    input_queue_config: QueueConfig = QueueConfig()
 
 
 class CutOffResponse(BaseModel):
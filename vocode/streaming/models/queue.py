@@ -0,0 +1,24 @@
+from enum import Enum
+
+from pydantic import validator
+
+from .model import BaseModel
+
+
+class OverflowPolicy(str, Enum):
+    # producers wait for room in put(), only for queues whose producers all await put()
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    # merge the new item into the newest queued item, only for queues of audio chunks
+    COALESCE = "coalesce"
+
+
+class QueueConfig(BaseModel):
+    maxsize: int = 0  # 0 means unbounded
+    overflow_policy: OverflowPolicy = OverflowPolicy.BLOCK
+
+    @validator("maxsize")
+    def maxsize_must_not_be_negative(cls, v):
+        if v < 0:
+            raise ValueError("must be non-negative")
+        return v
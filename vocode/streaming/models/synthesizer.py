@@ -12,6 +12,9 @@ from vocode.streaming.telephony.constants import (
 from .model import BaseModel, TypedModel
 from .audio_encoding import AudioEncoding
 
+DEFAULT_OUTPUT_LEAD_SECONDS = 0.1
+DEFAULT_SYNTHESIS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
 
 class SynthesizerType(str, Enum):
     BASE = "synthesizer_base"
@@ -38,11 +41,83 @@ class SentimentConfig(BaseModel):
         return v
 
 
+class AdaptiveChunkingConfig(BaseModel):
+    first_chunk_size_seconds: float = 0.1
+    growth_factor: float = 2.0
+
+    @validator("first_chunk_size_seconds")
+    def first_chunk_size_seconds_must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be greater than 0")
+        return v
+
+    @validator("growth_factor")
+    def growth_factor_must_be_greater_than_1(cls, v):
+        if v <= 1:
+            raise ValueError("must be greater than 1")
+        return v
+
+
+class SynthesisCacheConfig(BaseModel):
+    # budget of the in-memory tier, least recently used audio is evicted past it
+    max_bytes: int = DEFAULT_SYNTHESIS_CACHE_MAX_BYTES
+    # directory of the optional on-disk tier, shared by processes that point to it
+    disk_cache_path: Optional[str] = None
+
+    @validator("max_bytes")
+    def max_bytes_must_not_be_negative(cls, v):
+        if v < 0:
+            raise ValueError("must be greater than or equal to 0")
+        return v
+
+
+class SentenceSplitConfig(BaseModel):
+    # messages shorter than this are synthesized in one request
+    min_characters: int = 100
+    # number of sentences synthesized concurrently, ahead of the one being played
+    max_concurrency: int = 3
+
+    @validator("max_concurrency")
+    def max_concurrency_must_be_positive(cls, v):
+        if v < 1:
+            raise ValueError("must be greater than or equal to 1")
+        return v
+
+
 class SynthesizerConfig(TypedModel, type=SynthesizerType.BASE.value):
     sampling_rate: int
     audio_encoding: AudioEncoding
     should_encode_as_wav: bool = False
     sentiment_config: Optional[SentimentConfig] = None
+    # number of upcoming agent messages to synthesize while the current one is being synthesized/played
+    synthesis_lookahead: int = 0
+    # send speech to the output device in frames of this size (e.g. 0.02-0.1s) instead of whole chunks,
+    # keeping output_lead_seconds of audio buffered on the device - interrupts then take effect within a frame
+    output_frame_size_seconds: Optional[float] = None
+    output_lead_seconds: float = DEFAULT_OUTPUT_LEAD_SECONDS
+    # start streaming synthesizers with a small first chunk that grows up to the steady-state chunk size
+    adaptive_chunking_config: Optional[AdaptiveChunkingConfig] = None
+    # reuse the audio of messages already synthesized with the same voice, across conversations
+    synthesis_cache_config: Optional[SynthesisCacheConfig] = None
+    # split long messages into sentences that are synthesized concurrently, so playback can start
+    # after the first one (see SentenceSplitSynthesizer)
+    sentence_split_config: Optional[SentenceSplitConfig] = None
+
+    @validator("synthesis_lookahead")
+    def synthesis_lookahead_must_not_be_negative(cls, v):
+        if v < 0:
+            raise ValueError("must be greater than or equal to 0")
+        return v
+
+    @validator("output_frame_size_seconds")
+    def output_frame_size_seconds_check(cls, v, values):
+        if v is None:
+            return v
+        if v <= 0:
+            raise ValueError("must be greater than 0")
+        if values.get("should_encode_as_wav"):
+            raise ValueError("framed output is not supported with should_encode_as_wav")
+        return v
 
     class Config:
         arbitrary_types_allowed = True
@@ -111,6 +186,8 @@ class ElevenLabsSynthesizerConfig(
     stability: Optional[float]
     similarity_boost: Optional[float]
     model_id: Optional[str]
+    # request raw PCM / mulaw when ElevenLabs supports the output format instead of mp3
+    use_native_output_format: bool = True
 
     @validator("voice_id")
     def set_name(cls, voice_id):
@@ -173,6 +250,8 @@ class PlayHtSynthesizerConfig(SynthesizerConfig, type=SynthesizerType.PLAY_HT.va
     temperature: Optional[int] = None
     voice_id: str = PLAYHT_DEFAULT_VOICE_ID
     experimental_streaming: bool = False
+    # request raw mulaw when the output format is mulaw instead of mp3
+    use_native_output_format: bool = True
 
 
 class CoquiTTSSynthesizerConfig(
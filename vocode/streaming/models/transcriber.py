@@ -11,7 +11,8 @@ from vocode.streaming.telephony.constants import (
     DEFAULT_SAMPLING_RATE,
 )
 from .audio_encoding import AudioEncoding
-from .model import TypedModel
+from .model import BaseModel, TypedModel
+from .queue import QueueConfig
 
 AZURE_DEFAULT_LANGUAGE = "en-US"
 
@@ -31,6 +32,7 @@ class EndpointingType(str, Enum):
     BASE = "endpointing_base"
     TIME_BASED = "endpointing_time_based"
     PUNCTUATION_BASED = "endpointing_punctuation_based"
+    VAD_BASED = "endpointing_vad_based"
 
 
 class EndpointingConfig(TypedModel, type=EndpointingType.BASE):
@@ -47,6 +49,87 @@ class PunctuationEndpointingConfig(
     time_cutoff_seconds: float = 0.4
 
 
+class VADEndpointingConfig(EndpointingConfig, type=EndpointingType.VAD_BASED):
+    """Ends the user's turn on silence detected locally in the input audio, instead of waiting
+    on the transcriber service to declare an endpoint. Only supported by the Deepgram transcriber
+    (see AbstractTranscriber.mark_endpoint)"""
+
+    time_cutoff_seconds: float = 0.4
+    frame_duration_seconds: float = 0.02
+    # speech has to last this long before the following silence counts as an endpoint
+    min_speech_seconds: float = 0.1
+    # frames are speech if they are this far above the tracked noise floor, and above min_speech_dbfs
+    speech_margin_db: float = 10.0
+    min_speech_dbfs: float = -45.0
+
+    @validator("time_cutoff_seconds", "frame_duration_seconds")
+    def must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+
+class ConnectionPoolConfig(BaseModel):
+    # idle connections kept open, per transcriber configuration
+    size: int = 2
+    # idle connections are replaced once they are this old
+    max_idle_seconds: float = 60.0
+    # idle connections send the provider's keepalive message this often
+    keepalive_interval_seconds: float = 5.0
+
+    @validator("size")
+    def size_must_be_positive(cls, v):
+        if v < 1:
+            raise ValueError("must be greater than or equal to 1")
+        return v
+
+    @validator("max_idle_seconds", "keepalive_interval_seconds")
+    def must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+
+class AudioGateConfig(BaseModel):
+    """Stops streaming input audio to the transcriber while it's muted or the caller is silent
+    (see AudioGate)"""
+
+    # silence keeps being sent for this long after speech, so the provider can endpoint
+    hangover_seconds: float = 1.0
+    # silence sent right before speech resumes, so its onset isn't clipped
+    pre_roll_seconds: float = 0.2
+    # while audio is held back, a keepalive is sent once per this much of it
+    keepalive_interval_seconds: float = 2.0
+    vad_config: VADEndpointingConfig = VADEndpointingConfig()
+
+    @validator("hangover_seconds", "pre_roll_seconds")
+    def must_not_be_negative(cls, v):
+        if v < 0:
+            raise ValueError("must not be negative")
+        return v
+
+    @validator("keepalive_interval_seconds")
+    def must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+
+class FrameCoalescingConfig(BaseModel):
+    """Batches input audio frames into larger packets before they reach the transcriber (see
+    FrameCoalescer)"""
+
+    packet_duration_seconds: float = 0.1
+    # a partial packet is sent this long after its first frame
+    max_latency_seconds: float = 0.15
+
+    @validator("packet_duration_seconds", "max_latency_seconds")
+    def must_be_positive(cls, v):
+        if v <= 0:
+            raise ValueError("must be positive")
+        return v
+
+
 class TranscriberConfig(TypedModel, type=TranscriberType.BASE.value):
     sampling_rate: int
     audio_encoding: AudioEncoding
@@ -55,6 +138,10 @@ class TranscriberConfig(TypedModel, type=TranscriberType.BASE.value):
     downsampling: Optional[int] = None
     min_interrupt_confidence: Optional[float] = None
     mute_during_speech: bool = False
+    audio_gate_config: Optional[AudioGateConfig] = None
+    frame_coalescing_config: Optional[FrameCoalescingConfig] = None
+    # bounds the queue of input audio; audio is put without waiting, so it can't be bounded with BLOCK
+    input_queue_config: QueueConfig = QueueConfig()
 
     @validator("min_interrupt_confidence")
     def min_interrupt_confidence_must_be_between_0_and_1(cls, v):
@@ -62,6 +149,22 @@ class TranscriberConfig(TypedModel, type=TranscriberType.BASE.value):
             raise ValueError("must be between 0 and 1")
         return v
 
+    @validator("audio_gate_config")
+    def hangover_must_cover_endpointing_cutoff(cls, v, values):
+        # the provider only endpoints after this much silence, which the gate has to send it
+        time_cutoff_seconds = getattr(
+            values.get("endpointing_config"), "time_cutoff_seconds", None
+        )
+        if (
+            v is not None
+            and time_cutoff_seconds is not None
+            and v.hangover_seconds < time_cutoff_seconds
+        ):
+            raise ValueError(
+                "hangover_seconds must be at least the endpointing time_cutoff_seconds"
+            )
+        return v
+
     @classmethod
     def from_input_device(
         cls,
@@ -109,6 +212,9 @@ class DeepgramTranscriberConfig(TranscriberConfig, type=TranscriberType.DEEPGRAM
     tier: Optional[str] = None
     version: Optional[str] = None
     keywords: Optional[list] = None
+    # keep authenticated connections open ahead of calls, so the first utterance doesn't wait
+    # on the handshake (see TranscriberConnectionPool)
+    connection_pool_config: Optional[ConnectionPoolConfig] = None
 
 
 class GladiaTranscriberConfig(TranscriberConfig, type=TranscriberType.GLADIA.value):
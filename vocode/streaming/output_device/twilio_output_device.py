@@ -1,22 +1,26 @@
 from __future__ import annotations
 
 import asyncio
-import json
-import base64
-from typing import Optional
+from typing import Optional, Union
 
 from fastapi import WebSocket
 
+from vocode.streaming.models.queue import QueueConfig
 from vocode.streaming.output_device.base_output_device import BaseOutputDevice
 from vocode.streaming.telephony.constants import (
     DEFAULT_AUDIO_ENCODING,
     DEFAULT_SAMPLING_RATE,
 )
+from vocode.streaming.telephony.twilio_media_codec import TwilioMediaEncoder
+from vocode.streaming.utils.bounded_queue import BoundedQueue, concatenate_chunks
 
 
 class TwilioOutputDevice(BaseOutputDevice):
     def __init__(
-        self, ws: Optional[WebSocket] = None, stream_sid: Optional[str] = None
+        self,
+        ws: Optional[WebSocket] = None,
+        stream_sid: Optional[str] = None,
+        queue_config: Optional[QueueConfig] = None,
     ):
         super().__init__(
             sampling_rate=DEFAULT_SAMPLING_RATE, audio_encoding=DEFAULT_AUDIO_ENCODING
@@ -24,31 +28,33 @@ class TwilioOutputDevice(BaseOutputDevice):
         self.ws = ws
         self.stream_sid = stream_sid
         self.active = True
-        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        # audio is queued as chunks and encoded when it's sent, so that COALESCE can merge it
+        self.queue: asyncio.Queue[Union[bytes, str]] = BoundedQueue(
+            "output_device.twilio", queue_config, coalesce=concatenate_chunks
+        )
         self.process_task = asyncio.create_task(self.process())
 
+    @property
+    def stream_sid(self) -> Optional[str]:
+        return self.encoder.stream_sid
+
+    @stream_sid.setter
+    def stream_sid(self, stream_sid: Optional[str]):
+        # the stream's messages are rendered from templates holding its sid
+        self.encoder = TwilioMediaEncoder(stream_sid)
+
     async def process(self):
         while self.active:
             message = await self.queue.get()
+            if isinstance(message, bytes):
+                message = self.encoder.encode_media(message)
             await self.ws.send_text(message)
 
     def consume_nonblocking(self, chunk: bytes):
-        twilio_message = {
-            "event": "media",
-            "streamSid": self.stream_sid,
-            "media": {"payload": base64.b64encode(chunk).decode("utf-8")},
-        }
-        self.queue.put_nowait(json.dumps(twilio_message))
+        self.queue.put_nowait(chunk)
 
     def maybe_send_mark_nonblocking(self, message_sent):
-        mark_message = {
-            "event": "mark",
-            "streamSid": self.stream_sid,
-            "mark": {
-                "name": "Sent {}".format(message_sent),
-            },
-        }
-        self.queue.put_nowait(json.dumps(mark_message))
+        self.queue.put_nowait(self.encoder.encode_mark("Sent {}".format(message_sent)))
 
     def terminate(self):
         self.process_task.cancel()
@@ -4,6 +4,7 @@ import wave
 
 from fastapi import WebSocket
 from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.queue import QueueConfig
 from vocode.streaming.output_device.base_output_device import BaseOutputDevice
 from vocode.streaming.output_device.speaker_output import SpeakerOutput
 from vocode.streaming.telephony.constants import (
@@ -11,6 +12,7 @@ from vocode.streaming.telephony.constants import (
     VONAGE_CHUNK_SIZE,
     VONAGE_SAMPLING_RATE,
 )
+from vocode.streaming.utils.bounded_queue import BoundedQueue, concatenate_chunks
 
 
 class VonageOutputDevice(BaseOutputDevice):
@@ -18,13 +20,16 @@ class VonageOutputDevice(BaseOutputDevice):
         self,
         ws: Optional[WebSocket] = None,
         output_to_speaker: bool = False,
+        queue_config: Optional[QueueConfig] = None,
     ):
         super().__init__(
             sampling_rate=VONAGE_SAMPLING_RATE, audio_encoding=VONAGE_AUDIO_ENCODING
         )
         self.ws = ws
         self.active = True
-        self.queue: asyncio.Queue[bytes] = asyncio.Queue()
+        self.queue: asyncio.Queue[bytes] = BoundedQueue(
+            "output_device.vonage", queue_config, coalesce=concatenate_chunks
+        )
         self.process_task = asyncio.create_task(self.process())
         self.output_to_speaker = output_to_speaker
         if output_to_speaker:
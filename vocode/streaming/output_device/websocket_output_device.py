@@ -1,23 +1,34 @@
 from __future__ import annotations
 
 import asyncio
+from typing import Optional, Union
+
 from fastapi import WebSocket
 from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.output_device.base_output_device import BaseOutputDevice
 from vocode.streaming.models.websocket import AudioMessage
 from vocode.streaming.models.websocket import TranscriptMessage
 from vocode.streaming.models.transcript import TranscriptEvent
+from vocode.streaming.models.queue import QueueConfig
+from vocode.streaming.utils.bounded_queue import BoundedQueue, concatenate_chunks
 
 
 
 class WebsocketOutputDevice(BaseOutputDevice):
     def __init__(
-        self, ws: WebSocket, sampling_rate: int, audio_encoding: AudioEncoding
+        self,
+        ws: WebSocket,
+        sampling_rate: int,
+        audio_encoding: AudioEncoding,
+        queue_config: Optional[QueueConfig] = None,
     ):
         super().__init__(sampling_rate, audio_encoding)
         self.ws = ws
         self.active = False
-        self.queue: asyncio.Queue[str] = asyncio.Queue()
+        # audio is queued as chunks and serialized when it's sent, so that COALESCE can merge it
+        self.queue: asyncio.Queue[Union[bytes, str]] = BoundedQueue(
+            "output_device.websocket", queue_config, coalesce=concatenate_chunks
+        )
 
     def start(self):
         self.active = True
@@ -29,12 +40,13 @@ class WebsocketOutputDevice(BaseOutputDevice):
     async def process(self):
         while self.active:
             message = await self.queue.get()
+            if isinstance(message, bytes):
+                message = AudioMessage.from_bytes(message).json()
             await self.ws.send_text(message)
 
     def consume_nonblocking(self, chunk: bytes):
         if self.active:
-            audio_message = AudioMessage.from_bytes(chunk)
-            self.queue.put_nowait(audio_message.json())
+            self.queue.put_nowait(chunk)
 
     def consume_transcript(self, event: TranscriptEvent):
         if self.active:
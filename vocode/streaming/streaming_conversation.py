@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import asyncio
-import queue
 import random
 import threading
 from typing import Any, Awaitable, Callable, Generic, Optional, Tuple, TypeVar, cast
@@ -17,6 +16,7 @@ from vocode.streaming.agent.bot_sentiment_analyser import (
 from vocode.streaming.agent.lyngo_chat_gpt_agent import LyngoChatGPTAgent
 from vocode.streaming.agent.chat_gpt_agent import ChatGPTAgent
 from vocode.streaming.agent.lyngo_chat_gpt_agent_factory import LyngoChatGPTAgentRegistry
+from vocode.streaming.agent.speculation import normalize_transcript
 from vocode.streaming.models.actions import ActionInput
 from vocode.streaming.models.events import Sender
 from vocode.streaming.models.transcript import (
@@ -25,13 +25,24 @@ from vocode.streaming.models.transcript import (
     TranscriptCompleteEvent,
 )
 from vocode.streaming.models.message import BaseMessage
-from vocode.streaming.models.transcriber import EndpointingConfig, TranscriberConfig
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import (
+    EndpointingConfig,
+    TranscriberConfig,
+    VADEndpointingConfig,
+)
 from vocode.streaming.output_device.base_output_device import BaseOutputDevice
+from vocode.streaming.utils.bounded_queue import BoundedQueue
 from vocode.streaming.utils.conversation_logger_adapter import wrap_logger
 from vocode.streaming.utils.events_manager import EventsManager
+from vocode.streaming.utils.frame_coalescer import FrameCoalescer
 from vocode.streaming.utils.goodbye_model import GoodbyeModel
+from vocode.streaming.utils.playout_clock import PlayoutClock
+from vocode.streaming.utils.turn_latency import TurnLatencyTracker, TurnStage
+from vocode.streaming.utils.vad import EnergyVAD
 
 from vocode.streaming.models.agent import ChatGPTAgentConfig, FillerAudioConfig
+from vocode.streaming.models.queue import QueueConfig
 from vocode.streaming.models.synthesizer import (
     SentimentConfig,
 )
@@ -55,7 +66,12 @@ from vocode.streaming.synthesizer.base_synthesizer import (
     SynthesisResult,
     FillerAudio,
 )
-from vocode.streaming.utils import create_conversation_id, get_chunk_size_per_second
+from vocode.streaming.utils import (
+    create_conversation_id,
+    get_chunk_size_per_second,
+    get_frame_size,
+    split_into_frames,
+)
 from vocode.streaming.transcriber.base_transcriber import (
     Transcription,
     BaseTranscriber,
@@ -66,6 +82,7 @@ from vocode.streaming.utils.worker import (
     InterruptibleAgentResponseWorker,
     InterruptibleEvent,
     InterruptibleEventFactory,
+    InterruptibleEventRegistry,
     InterruptibleAgentResponseEvent,
     InterruptibleWorker,
 )
@@ -73,6 +90,13 @@ from vocode.streaming.utils.worker import (
 OutputDeviceType = TypeVar("OutputDeviceType", bound=BaseOutputDevice)
 
 
+def release_dropped_agent_response(event: InterruptibleAgentResponseEvent):
+    """Agent responses dropped from a full queue are never played, so whoever awaits them is
+    released"""
+    event.interrupt()
+    event.agent_response_tracker.set()
+
+
 class StreamingConversation(Generic[OutputDeviceType]):
     class QueueingInterruptibleEventFactory(InterruptibleEventFactory):
         def __init__(self, conversation: "StreamingConversation"):
@@ -84,7 +108,7 @@ class StreamingConversation(Generic[OutputDeviceType]):
             interruptible_event: InterruptibleEvent = (
                 super().create_interruptible_event(payload, is_interruptible)
             )
-            self.conversation.interruptible_events.put_nowait(interruptible_event)
+            self.conversation.interruptible_events.add(interruptible_event)
             return interruptible_event
 
         def create_interruptible_agent_response_event(
@@ -98,12 +122,17 @@ class StreamingConversation(Generic[OutputDeviceType]):
                 is_interruptible=is_interruptible,
                 agent_response_tracker=agent_response_tracker,
             )
-            self.conversation.interruptible_events.put_nowait(interruptible_event)
+            self.conversation.interruptible_events.add(interruptible_event)
             return interruptible_event
 
     class TranscriptionsWorker(AsyncQueueWorker):
         """Processes all transcriptions: sends an interrupt if needed
-        and sends final transcriptions to the output queue"""
+        and sends final transcriptions to the output queue
+
+        With speculative generation, the agent starts responding to an interim transcription once
+        it has been stable for a while; the final transcription then commits that response instead
+        of being sent to the agent, unless it doesn't match.
+        """
 
         def __init__(
             self,
@@ -117,9 +146,65 @@ class StreamingConversation(Generic[OutputDeviceType]):
             self.output_queue = output_queue
             self.conversation = conversation
             self.interruptible_event_factory = interruptible_event_factory
+            self.speculation_timer: Optional[asyncio.Task] = None
+            self.last_interim_message: Optional[str] = None
+
+        def create_agent_input_event(
+            self, transcription: Transcription
+        ) -> InterruptibleEvent[TranscriptionAgentInput]:
+            # we use getattr here to avoid the dependency cycle between VonageCall and StreamingConversation
+            return self.interruptible_event_factory.create_interruptible_event(
+                TranscriptionAgentInput(
+                    transcription=transcription,
+                    conversation_id=self.conversation.id,
+                    vonage_uuid=getattr(self.conversation, "vonage_uuid", None),
+                    twilio_sid=getattr(self.conversation, "twilio_sid", None),
+                )
+            )
+
+        def cancel_speculation_timer(self):
+            if self.speculation_timer is not None:
+                self.speculation_timer.cancel()
+                self.speculation_timer = None
+
+        def schedule_speculation(self, transcription: Transcription):
+            normalized_message = normalize_transcript(transcription.message)
+            if normalized_message == self.last_interim_message:
+                # unchanged, the running timer keeps counting
+                return
+            self.last_interim_message = normalized_message
+            self.cancel_speculation_timer()
+            self.conversation.agent.cancel_speculation()
+            self.speculation_timer = asyncio.create_task(
+                self.speculate_when_stable(transcription)
+            )
+
+        async def speculate_when_stable(self, transcription: Transcription):
+            speculative_generation_config = (
+                self.conversation.agent.get_agent_config().speculative_generation_config
+            )
+            assert speculative_generation_config is not None
+            await asyncio.sleep(speculative_generation_config.stable_interim_seconds)
+            self.conversation.logger.debug(
+                "Speculating on interim transcription: {}".format(transcription.message)
+            )
+            await self.conversation.agent.speculate(
+                self.create_agent_input_event(transcription)
+            )
 
         async def process(self, transcription: Transcription):
             self.conversation.mark_last_action_timestamp()
+            speculative_message = (
+                transcription.speculative_message or transcription.message
+            )
+            if (
+                not transcription.is_final
+                and speculative_message.strip()
+                and self.conversation.agent.supports_speculation()
+            ):
+                self.schedule_speculation(
+                    transcription.copy(update={"message": speculative_message})
+                )
             if transcription.message.strip() == "":
                 self.conversation.logger.info("Ignoring empty transcription")
                 return
@@ -145,16 +230,25 @@ class StreamingConversation(Generic[OutputDeviceType]):
             )
             self.conversation.is_human_speaking = not transcription.is_final
             if transcription.is_final:
-                # we use getattr here to avoid the dependency cycle between VonageCall and StreamingConversation
-                event = self.interruptible_event_factory.create_interruptible_event(
-                    TranscriptionAgentInput(
-                        transcription=transcription,
-                        conversation_id=self.conversation.id,
-                        vonage_uuid=getattr(self.conversation, "vonage_uuid", None),
-                        twilio_sid=getattr(self.conversation, "twilio_sid", None),
-                    )
+                self.conversation.turn_latency_tracker.start_turn(
+                    endpoint_time=transcription.timestamp
+                )
+                self.conversation.turn_latency_tracker.mark(
+                    TurnStage.TRANSCRIPTION_PROCESSED
                 )
-                self.output_queue.put_nowait(event)
+                self.cancel_speculation_timer()
+                self.last_interim_message = None
+                if self.conversation.agent.commit_speculation(transcription):
+                    self.conversation.logger.debug("Committed speculative response")
+                    return
+                self.conversation.agent.cancel_speculation()
+                event = self.create_agent_input_event(transcription)
+                # waits for room if the agent's input queue is bounded
+                await self.output_queue.put(event)
+
+        def terminate(self):
+            self.cancel_speculation_timer()
+            return super().terminate()
 
     class FillerAudioWorker(InterruptibleAgentResponseWorker):
         """
@@ -226,9 +320,13 @@ class StreamingConversation(Generic[OutputDeviceType]):
             conversation: "StreamingConversation",
             interruptible_event_factory: InterruptibleEventFactory,
         ):
+            synthesizer_config = conversation.synthesizer.get_synthesizer_config()
+            # synthesize the next `synthesis_lookahead` messages while the current one is in flight,
+            # the worker still releases the SynthesisResults in order
             super().__init__(
                 input_queue=input_queue,
                 output_queue=output_queue,
+                max_concurrency=synthesizer_config.synthesis_lookahead + 1,
             )
             self.input_queue = input_queue
             self.output_queue = output_queue
@@ -273,6 +371,8 @@ class StreamingConversation(Generic[OutputDeviceType]):
                     self.send_filler_audio(item.agent_response_tracker)
                     return
                 if isinstance(agent_response, AgentResponseStop):
+                    # the messages read before the stop are released before the conversation ends
+                    await self.wait_for_earlier_outputs()
                     self.conversation.logger.debug("Agent requested to stop")
                     item.agent_response_tracker.set()
                     await self.conversation.terminate()
@@ -289,7 +389,8 @@ class StreamingConversation(Generic[OutputDeviceType]):
                         await self.conversation.filler_audio_worker.wait_for_filler_audio_to_finish()
 
                 self.conversation.logger.debug("Synthesizing speech for message")
-                synthesis_result = await self.conversation.synthesizer.create_speech(
+                self.conversation.turn_latency_tracker.mark(TurnStage.SYNTHESIS_STARTED)
+                synthesis_result = await self.conversation.synthesizer.create_speech_with_cache(
                     agent_response_message.message,
                     self.chunk_size,
                     bot_sentiment=self.conversation.bot_sentiment,
@@ -377,6 +478,8 @@ class StreamingConversation(Generic[OutputDeviceType]):
         per_chunk_allowance_seconds: float = PER_CHUNK_ALLOWANCE_SECONDS,
         events_manager: Optional[EventsManager] = None,
         logger: Optional[logging.Logger] = None,
+        synthesis_results_queue_config: Optional[QueueConfig] = None,
+        filler_audio_queue_config: Optional[QueueConfig] = None,
     ):
         self.id = conversation_id or create_conversation_id()
         self.logger = wrap_logger(
@@ -392,17 +495,29 @@ class StreamingConversation(Generic[OutputDeviceType]):
         self.agent.set_agent_conversation_id(conversation_id)
         LyngoChatGPTAgentRegistry.register_agent(self.agent)
 
-        self.interruptible_events: queue.Queue[InterruptibleEvent] = queue.Queue()
+        self.interruptible_events = InterruptibleEventRegistry()
         self.interruptible_event_factory = self.QueueingInterruptibleEventFactory(
             conversation=self
         )
         self.agent.set_interruptible_event_factory(self.interruptible_event_factory)
+        self.turn_latency_tracker = TurnLatencyTracker(
+            conversation_id=self.id, logger=self.logger
+        )
+        self.agent.attach_turn_latency_tracker(self.turn_latency_tracker)
         self.synthesis_results_queue: asyncio.Queue[
             InterruptibleAgentResponseEvent[Tuple[BaseMessage, SynthesisResult]]
-        ] = asyncio.Queue()
+        ] = BoundedQueue(
+            "conversation.synthesis_results",
+            synthesis_results_queue_config,
+            on_drop=release_dropped_agent_response,
+        )
         self.filler_audio_queue: asyncio.Queue[
             InterruptibleAgentResponseEvent[FillerAudio]
-        ] = asyncio.Queue()
+        ] = BoundedQueue(
+            "conversation.filler_audio",
+            filler_audio_queue_config,
+            on_drop=release_dropped_agent_response,
+        )
         self.state_manager = self.create_state_manager()
         self.transcriptions_worker = self.TranscriptionsWorker(
             input_queue=self.transcriber.output_queue,
@@ -439,8 +554,13 @@ class StreamingConversation(Generic[OutputDeviceType]):
         self.events_manager = events_manager or EventsManager()
         self.events_task: Optional[asyncio.Task] = None
         self.per_chunk_allowance_seconds = per_chunk_allowance_seconds
+        # paces all speech sent to the output device, per_chunk_allowance_seconds of audio is kept buffered ahead
+        self.playout_clock = PlayoutClock(lead_seconds=per_chunk_allowance_seconds)
         self.transcript = Transcript()
         self.transcript.attach_events_manager(self.events_manager)
+        # detects the end of the user's turn locally when the transcriber uses VAD endpointing
+        self.vad = self.create_vad()
+        self.frame_coalescer = self.create_frame_coalescer()
         self.bot_sentiment = None
         if self.agent.get_agent_config().track_bot_sentiment:
             self.sentiment_config = (
@@ -583,8 +703,56 @@ class StreamingConversation(Generic[OutputDeviceType]):
         )
         self.transcriptions_worker.consume_nonblocking(transcription)
 
+    def get_input_sampling_rate(self) -> int:
+        transcriber_config = self.transcriber.get_transcriber_config()
+        sampling_rate = transcriber_config.sampling_rate
+        if (
+            transcriber_config.downsampling
+            and transcriber_config.audio_encoding == AudioEncoding.LINEAR16
+        ):
+            # receive_audio gets the audio before the transcriber downsamples it
+            sampling_rate *= transcriber_config.downsampling
+        return sampling_rate
+
+    def create_vad(self) -> Optional[EnergyVAD]:
+        transcriber_config = self.transcriber.get_transcriber_config()
+        if not isinstance(transcriber_config.endpointing_config, VADEndpointingConfig):
+            return None
+        return EnergyVAD(
+            transcriber_config.endpointing_config,
+            audio_encoding=transcriber_config.audio_encoding,
+            sampling_rate=self.get_input_sampling_rate(),
+        )
+
+    def create_frame_coalescer(self) -> Optional[FrameCoalescer]:
+        transcriber_config = self.transcriber.get_transcriber_config()
+        frame_coalescing_config = transcriber_config.frame_coalescing_config
+        if frame_coalescing_config is None:
+            return None
+        return FrameCoalescer(
+            self.process_audio,
+            packet_size=get_frame_size(
+                transcriber_config.audio_encoding,
+                self.get_input_sampling_rate(),
+                frame_coalescing_config.packet_duration_seconds,
+            ),
+            max_latency_seconds=frame_coalescing_config.max_latency_seconds,
+        )
+
     def receive_audio(self, chunk: bytes):
+        if self.frame_coalescer is not None:
+            self.frame_coalescer.add(chunk)
+        else:
+            self.process_audio(chunk)
+
+    def process_audio(self, chunk: bytes):
         self.transcriber.send_audio(chunk)
+        if self.vad is None:
+            return
+        if self.transcriber.is_muted:
+            self.vad.reset()
+        elif self.vad.process(chunk):
+            self.transcriber.mark_endpoint()
 
     def warmup_synthesizer(self):
         self.synthesizer.ready_synthesizer()
@@ -597,16 +765,9 @@ class StreamingConversation(Generic[OutputDeviceType]):
 
         Returns true if any events were interrupted - which is used as a flag for the agent (is_interrupt)
         """
-        num_interrupts = 0
-        while True:
-            try:
-                interruptible_event = self.interruptible_events.get_nowait()
-                if not interruptible_event.is_interrupted():
-                    if interruptible_event.interrupt():
-                        self.logger.debug("Interrupting event")
-                        num_interrupts += 1
-            except queue.Empty:
-                break
+        num_interrupts = self.interruptible_events.interrupt_all()
+        if num_interrupts:
+            self.logger.debug("Interrupted {} events".format(num_interrupts))
         self.agent.cancel_current_task()
         self.agent_responses_worker.cancel_current_task()
         return num_interrupts > 0
@@ -632,8 +793,13 @@ class StreamingConversation(Generic[OutputDeviceType]):
         - Sets started_event when the first chunk is sent
 
         Importantly, we rate limit the chunks sent to the output. For interrupts to work properly,
-        the next chunk of audio can only be sent after the last chunk is played, so we send
-        a chunk of x seconds only after x seconds have passed since the last chunk was sent.
+        the next chunk of audio can only be sent after the last chunk is played, so chunks are
+        scheduled on the conversation's playout clock: the next chunk is sent once everything sent
+        so far is about to finish playing (minus per_chunk_allowance_seconds of lead).
+
+        If the synthesizer config sets output_frame_size_seconds, each chunk is split into frames of
+        that size which are paced against an output_lead_seconds window, and stop_event is checked
+        before every frame - so an interrupt stops the output within one frame instead of one chunk.
 
         Returns the message that was sent up to, and a flag if the message was cut off
         """
@@ -642,46 +808,70 @@ class StreamingConversation(Generic[OutputDeviceType]):
             self.transcriber.mute()
         message_sent = message
         cut_off = False
+        synthesizer_config = self.synthesizer.get_synthesizer_config()
         chunk_size = seconds_per_chunk * get_chunk_size_per_second(
-            self.synthesizer.get_synthesizer_config().audio_encoding,
-            self.synthesizer.get_synthesizer_config().sampling_rate,
+            synthesizer_config.audio_encoding,
+            synthesizer_config.sampling_rate,
         )
+        frame_size: Optional[int] = None
+        lead_seconds: Optional[float] = None
+        if synthesizer_config.output_frame_size_seconds:
+            frame_size = get_frame_size(
+                synthesizer_config.audio_encoding,
+                synthesizer_config.sampling_rate,
+                synthesizer_config.output_frame_size_seconds,
+            )
+            lead_seconds = synthesizer_config.output_lead_seconds
         chunk_idx = 0
-        seconds_spoken = 0
+        seconds_spoken = 0.0
         async for chunk_result in synthesis_result.chunk_generator:
-            start_time = time.time()
-            speech_length_seconds = seconds_per_chunk * (
-                len(chunk_result.chunk) / chunk_size
+            # filler audio isn't the response to the user's turn, so only utterances with a
+            # transcript message count towards its latency
+            if transcript_message and chunk_idx == 0:
+                self.turn_latency_tracker.mark(TurnStage.SYNTHESIS_FIRST_CHUNK)
+            frames = (
+                split_into_frames(chunk_result.chunk, frame_size)
+                if frame_size
+                else [chunk_result.chunk]
             )
-            seconds_spoken = chunk_idx * seconds_per_chunk
-            if stop_event.is_set():
-                self.logger.debug(
-                    "Interrupted, stopping text to speech after {} chunks".format(
-                        chunk_idx
+            scheduling_lag = 0.0
+            for frame_idx, frame in enumerate(frames):
+                speech_length_seconds = seconds_per_chunk * (len(frame) / chunk_size)
+                if stop_event.is_set():
+                    self.logger.debug(
+                        "Interrupted, stopping text to speech after {} chunks ({:.3f}s)".format(
+                            chunk_idx, seconds_spoken
+                        )
                     )
-                )
-                message_sent = f"{synthesis_result.get_message_up_to(seconds_spoken)}-"
-                cut_off = True
-                break
-            if chunk_idx == 0:
-                if started_event:
+                    message_sent = (
+                        f"{synthesis_result.get_message_up_to(seconds_spoken)}-"
+                    )
+                    cut_off = True
+                    break
+                if started_event and not started_event.is_set():
                     started_event.set()
-            self.output_device.consume_nonblocking(chunk_result.chunk)
-            end_time = time.time()
-            await asyncio.sleep(
-                max(
-                    speech_length_seconds
-                    - (end_time - start_time)
-                    - self.per_chunk_allowance_seconds,
-                    0,
+                self.output_device.consume_nonblocking(frame)
+                if transcript_message and chunk_idx == 0 and frame_idx == 0:
+                    self.turn_latency_tracker.mark(TurnStage.OUTPUT_FIRST_CHUNK)
+                next_frame_deadline = self.playout_clock.schedule(
+                    speech_length_seconds, lead_seconds=lead_seconds
                 )
-            )
+                scheduling_lag = max(
+                    scheduling_lag,
+                    await self.playout_clock.wait_until(next_frame_deadline),
+                )
+                seconds_spoken += speech_length_seconds
+            if cut_off:
+                # stops the synthesizer from producing the rest of the speech
+                await synthesis_result.chunk_generator.aclose()
+                break
             self.logger.debug(
-                "Sent chunk {} with size {}".format(chunk_idx, len(chunk_result.chunk))
+                "Sent chunk {} with size {} (scheduling lag {:.3f}s)".format(
+                    chunk_idx, len(chunk_result.chunk), scheduling_lag
+                )
             )
             self.mark_last_action_timestamp()
             chunk_idx += 1
-            seconds_spoken += seconds_per_chunk
             if transcript_message:
                 transcript_message.text = synthesis_result.get_message_up_to(
                     seconds_spoken
@@ -714,6 +904,8 @@ class StreamingConversation(Generic[OutputDeviceType]):
         if self.events_manager and self.events_task:
             self.logger.debug("Terminating events Task")
             await self.events_manager.flush()
+        self.turn_latency_tracker.finish_turn()
+        self.turn_latency_tracker.log_latency_summary()
         self.logger.debug("Tearing down synthesizer")
         await self.synthesizer.tear_down()
         self.logger.debug("Terminating agent")
@@ -730,6 +922,8 @@ class StreamingConversation(Generic[OutputDeviceType]):
         self.logger.debug("Terminating output device")
         self.output_device.terminate()
         self.logger.debug("Terminating speech transcriber")
+        if self.frame_coalescer is not None:
+            self.frame_coalescer.cancel()
         self.transcriber.terminate()
         self.logger.debug("Terminating transcriptions worker")
         self.transcriptions_worker.terminate()
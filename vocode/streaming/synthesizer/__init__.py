@@ -9,6 +9,9 @@ from vocode.streaming.synthesizer.gtts_synthesizer import GTTSSynthesizer
 from vocode.streaming.synthesizer.play_ht_synthesizer import PlayHtSynthesizer
 from vocode.streaming.synthesizer.rime_synthesizer import RimeSynthesizer
 from vocode.streaming.synthesizer.polly_synthesizer import PollySynthesizer
+from vocode.streaming.synthesizer.sentence_split_synthesizer import (
+    SentenceSplitSynthesizer,
+)
 from vocode.streaming.synthesizer.stream_elements_synthesizer import (
     StreamElementsSynthesizer,
 )
@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import threading
+from typing import AsyncGenerator, Callable, Optional, Tuple
+
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BUFFERED_CHUNKS = 4
+# how often a pump waiting for room in its buffer checks whether it was stopped
+STOP_POLL_SECONDS = 0.1
+
+
+class AudioStreamPump:
+    """Reads a blocking audio stream (e.g. Azure's AudioDataStream) on a thread of its own, in
+    chunks following the chunk size schedule, so the event loop never waits on it. The thread
+    blocks on the stream and on the consumer for the whole utterance, so it isn't taken from the
+    DecodePool, whose jobs never wait.
+
+    At most `max_buffered_chunks` chunks are read ahead of the consumer of chunks(). The stream
+    ends at the first short chunk. Closing chunks() early (e.g. when the utterance is interrupted)
+    stops the pump after the read in progress, which `on_stop` can cut short.
+    """
+
+    def __init__(
+        self,
+        read_chunk: Callable[[int], bytes],
+        chunk_size_schedule: ChunkSizeSchedule,
+        max_buffered_chunks: int = DEFAULT_MAX_BUFFERED_CHUNKS,
+        on_stop: Optional[Callable[[], None]] = None,
+    ):
+        self.read_chunk = read_chunk
+        self.chunk_size_schedule = chunk_size_schedule
+        self.on_stop = on_stop
+        self.buffer: asyncio.Queue[Tuple[bytes, bool]] = asyncio.Queue()
+        self.buffer_slots = threading.Semaphore(max_buffered_chunks)
+        self.stopped = threading.Event()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def put(self, item: Tuple[bytes, bool]) -> bool:
+        assert self.loop is not None
+        while not self.buffer_slots.acquire(timeout=STOP_POLL_SECONDS):
+            if self.stopped.is_set():
+                return False
+        try:
+            self.loop.call_soon_threadsafe(self.buffer.put_nowait, item)
+        except RuntimeError:
+            # the event loop was closed
+            self.stopped.set()
+            return False
+        return True
+
+    def pump(self):
+        try:
+            while not self.stopped.is_set():
+                chunk_size = self.chunk_size_schedule.next_chunk_size()
+                chunk = self.read_chunk(chunk_size)
+                is_last = len(chunk) < chunk_size
+                if not self.put((chunk, is_last)) or is_last:
+                    return
+        except Exception as e:
+            logger.exception("Failed to read audio stream: %s", e)
+            self.put((b"", True))
+
+    def stop(self):
+        if self.stopped.is_set():
+            return
+        self.stopped.set()
+        if self.on_stop is not None:
+            self.on_stop()
+
+    async def chunks(self) -> AsyncGenerator[Tuple[bytes, bool], None]:
+        self.loop = asyncio.get_running_loop()
+        threading.Thread(
+            target=self.pump, name="audio_stream_pump", daemon=True
+        ).start()
+        is_last = False
+        try:
+            while not is_last:
+                chunk, is_last = await self.buffer.get()
+                self.buffer_slots.release()
+                yield chunk, is_last
+        finally:
+            if not is_last:
+                self.stop()
@@ -1,10 +1,12 @@
 import asyncio
+import bisect
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 import logging
-import os
 import re
-from typing import Any, List, Optional, Tuple
-from xml.etree import ElementTree
+import threading
+from typing import Any, List, Optional, Sequence, Tuple
+import weakref
 import aiohttp
 from vocode import getenv
 from opentelemetry.context.context import Context
@@ -15,43 +17,87 @@ from vocode.streaming.models.message import BaseMessage, SSMLMessage
 from vocode.streaming.synthesizer.base_synthesizer import (
     BaseSynthesizer,
     SynthesisResult,
-    FILLER_PHRASES,
-    FILLER_AUDIO_PATH,
-    FillerAudio,
     encode_as_wav,
     tracer,
 )
 from vocode.streaming.models.synthesizer import AzureSynthesizerConfig, SynthesizerType
+from vocode.streaming.synthesizer.audio_stream_pump import AudioStreamPump
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
+from vocode.streaming.synthesizer.ssml_builder import (
+    DEFAULT_PRONUNCIATION_RULES,
+    NAMESPACES,
+    PronunciationRule,
+    SSMLBuilder,
+)
 from vocode.streaming.models.audio_encoding import AudioEncoding
 
 import azure.cognitiveservices.speech as speechsdk
 
 
-NAMESPACES = {
-    "mstts": "https://www.w3.org/2001/mstts",
-    "": "https://www.w3.org/2001/10/synthesis",
-}
-
-ElementTree.register_namespace("", NAMESPACES[""])
-ElementTree.register_namespace("mstts", NAMESPACES["mstts"])
-
-
 class WordBoundaryEventPool:
+    """The word boundaries of one utterance, sorted by audio offset (in seconds)"""
+
     def __init__(self):
-        self.events = []
+        self.audio_offsets: List[float] = []
+        self.text_offsets: List[int] = []
+        self.lock = threading.Lock()
 
     def add(self, event):
-        self.events.append(
-            {
-                "text": event.text,
-                "text_offset": event.text_offset,
-                "audio_offset": (event.audio_offset + 5000) / (10000 * 1000),
-                "boudary_type": event.boundary_type,
-            }
-        )
+        audio_offset = (event.audio_offset + 5000) / (10000 * 1000)
+        with self.lock:
+            # events arrive in order, so this is almost always an append
+            index = bisect.bisect_right(self.audio_offsets, audio_offset)
+            self.audio_offsets.insert(index, audio_offset)
+            self.text_offsets.insert(index, event.text_offset)
+
+    def get_text_offset_after(self, seconds: float) -> Optional[int]:
+        """The text offset of the first word that starts after `seconds` of audio, if any"""
+        with self.lock:
+            index = bisect.bisect_right(self.audio_offsets, seconds)
+            if index == len(self.text_offsets):
+                return None
+            return self.text_offsets[index]
+
 
-    def get_events_sorted(self):
-        return sorted(self.events, key=lambda event: event["audio_offset"])
+class WordBoundaryDispatcher:
+    """Routes the word boundary events of a SpeechSynthesizer to the pool of the utterance
+    (synthesis result) they belong to, so a single callback is connected per synthesizer.
+
+    Events can arrive before the utterance is registered, they're kept in a pending pool until
+    it is (only for the last MAX_PENDING_RESULTS results). Registered pools are only held weakly
+    and are released once the utterance's audio has been played.
+    """
+
+    MAX_PENDING_RESULTS = 16
+
+    def __init__(self):
+        self.pools: "weakref.WeakValueDictionary[str, WordBoundaryEventPool]" = (
+            weakref.WeakValueDictionary()
+        )
+        self.pending_pools: "OrderedDict[str, WordBoundaryEventPool]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def dispatch(self, event):
+        with self.lock:
+            pool = self.pools.get(event.result_id)
+            if pool is None:
+                pool = self.pending_pools.get(event.result_id)
+                if pool is None:
+                    pool = self.pending_pools[event.result_id] = WordBoundaryEventPool()
+                    if len(self.pending_pools) > self.MAX_PENDING_RESULTS:
+                        self.pending_pools.popitem(last=False)
+        pool.add(event)
+
+    def register(self, result_id: str) -> WordBoundaryEventPool:
+        with self.lock:
+            pool = self.pending_pools.pop(result_id, None) or WordBoundaryEventPool()
+            self.pools[result_id] = pool
+            return pool
+
+    def release(self, result_id: str):
+        with self.lock:
+            self.pools.pop(result_id, None)
+            self.pending_pools.pop(result_id, None)
 
 
 class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
@@ -64,6 +110,7 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
         azure_speech_key: Optional[str] = None,
         azure_speech_region: Optional[str] = None,
         aiohttp_session: Optional[aiohttp.ClientSession] = None,
+        pronunciation_rules: Sequence[PronunciationRule] = DEFAULT_PRONUNCIATION_RULES,
     ):
         super().__init__(synthesizer_config, aiohttp_session)
         # Instantiates a client
@@ -108,48 +155,33 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
         self.synthesizer = speechsdk.SpeechSynthesizer(
             speech_config=speech_config, audio_config=None
         )
+        self.word_boundary_dispatcher = WordBoundaryDispatcher()
+        self.synthesizer.synthesis_word_boundary.connect(
+            self.word_boundary_dispatcher.dispatch
+        )
 
         self.voice_name = self.synthesizer_config.voice_name
         self.pitch = self.synthesizer_config.pitch
         self.rate = self.synthesizer_config.rate
+        self.ssml_builder = SSMLBuilder(
+            voice_name=self.voice_name,
+            language_code=self.synthesizer_config.language_code,
+            pitch=self.pitch,
+            rate=self.rate,
+            pronunciation_rules=pronunciation_rules,
+        )
         self.thread_pool_executor = ThreadPoolExecutor(max_workers=1)
         self.logger = logger or logging.getLogger(__name__)
 
-    async def get_phrase_filler_audios(self) -> List[FillerAudio]:
-        filler_phrase_audios = []
-        for filler_phrase in FILLER_PHRASES:
-            cache_key = "-".join(
-                (
-                    str(filler_phrase.text),
-                    str(self.synthesizer_config.type),
-                    str(self.synthesizer_config.audio_encoding),
-                    str(self.synthesizer_config.sampling_rate),
-                    str(self.voice_name),
-                    str(self.pitch),
-                    str(self.rate),
-                )
-            )
-            filler_audio_path = os.path.join(FILLER_AUDIO_PATH, f"{cache_key}.bytes")
-            if os.path.exists(filler_audio_path):
-                audio_data = open(filler_audio_path, "rb").read()
-            else:
-                self.logger.debug(f"Generating filler audio for {filler_phrase.text}")
-                ssml = self.create_ssml(filler_phrase.text)
-                result = await asyncio.get_event_loop().run_in_executor(
-                    self.thread_pool_executor, self.synthesizer.speak_ssml, ssml
-                )
-                offset = self.synthesizer_config.sampling_rate * self.OFFSET_MS // 1000
-                audio_data = result.audio_data[offset:]
-                with open(filler_audio_path, "wb") as f:
-                    f.write(audio_data)
-            filler_phrase_audios.append(
-                FillerAudio(
-                    filler_phrase,
-                    audio_data,
-                    self.synthesizer_config,
-                )
-            )
-        return filler_phrase_audios
+    async def synthesize_filler_audio_data(self, filler_phrase: BaseMessage) -> bytes:
+        ssml = self.create_ssml(filler_phrase.text)
+        # not on the single threaded executor, so the phrases are requested concurrently
+        result = await asyncio.get_event_loop().run_in_executor(
+            None, lambda: self.synthesizer.speak_ssml_async(ssml).get()
+        )
+        self.word_boundary_dispatcher.release(result.result_id)
+        offset = self.synthesizer_config.sampling_rate * self.OFFSET_MS // 1000
+        return result.audio_data[offset:]
 
     def add_marks(self, message: str, index=0) -> str:
         search_result = re.search(r"([\.\,\:\;\-\—]+)", message)
@@ -163,149 +195,16 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
             return with_mark
         return with_mark + self.add_marks(rest_stripped, index + 1)
 
-    def word_boundary_cb(self, evt, pool):
-        pool.add(evt)
-
     def create_ssml(
-            self, message: str, bot_sentiment: Optional[BotSentiment] = None
-        ) -> str:
-            voice_language_code = self.synthesizer_config.voice_name[:5]
-            ssml_root = ElementTree.fromstring(
-                f'<speak version="1.0" xmlns="https://www.w3.org/2001/10/synthesis" xml:lang="{voice_language_code}"></speak>'
-            )
-            voice = ElementTree.SubElement(ssml_root, "voice")
-            voice.set("name", self.voice_name)
-            voice.set("effect", "eq_telecomhp8k")
-            if self.synthesizer_config.language_code != "en-US":
-                lang = ElementTree.SubElement(voice, "{%s}lang" % NAMESPACES.get(""))
-                lang.set("xml:lang", self.synthesizer_config.language_code)
-                voice_root = lang
-            else:
-                voice_root = voice
-            if bot_sentiment and bot_sentiment.emotion:
-                styled = ElementTree.SubElement(
-                    voice, "{%s}express-as" % NAMESPACES.get("mstts")
-                )
-                styled.set("style", bot_sentiment.emotion)
-                styled.set(
-                    "styledegree", str(bot_sentiment.degree * 2)
-                )  # Azure specific, it's a scale of 0-2
-                voice_root = styled
-
-            print("PREVIOUS MESSAGE:")
-            print(message)
-            # Replacement for "dr." or "Dr." with "doctor"
-            message = re.sub(r'\b(Dr|dr)\.(?=\s|$)', 'doctor', message, flags=re.IGNORECASE)
-            print("AFTER REPLACEMENT:")
-            print(message)
-            # this ugly hack is necessary so we can limit the gap between sentences
-            # for normal sentences, it seems like the gap is > 500ms, so we're able to reduce it to 500ms
-            # for very tiny sentences, the API hangs - so we heuristically only update the silence gap
-            # if there is more than one word in the sentence
-            if " " in message:
-                silence = ElementTree.SubElement(
-                    voice_root, "{%s}silence" % NAMESPACES.get("mstts")
-                )
-                silence.set("value", "500ms")
-                silence.set("type", "Tailing-exact")
-
-            # This section catches when an email is returned and pronounces it as letters and slows it down
-            email_regex = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_regex, message)
-
-            # Regular expression to find spelled-out words prefixed with **, potentially surrounded by punctuation
-            # This will match patterns like "**T-A-N-M-A-Y" or "**T-A-N-M-A-Y"?' and similar
-            # spelled_word_regex = r'["\']?\s*\*\*["\']?([A-Za-z](-[A-Za-z])+)["\']?'
-
-            prosody = ElementTree.SubElement(voice_root, "prosody")
-            prosody.set("pitch", f"{self.pitch}%")
-            prosody.set("rate", f"{self.rate}%")
-
-            # Process each part of the message
-            message_parts = re.split(r'(\s+)', message)  # Split the message by whitespace to keep the structure
-
-            for part in message_parts:
-                ## below is to pronounce chiro as 'kai ro'.
-                chiro_regex = re.compile(r'^(chiro)([.,?!]*)$', re.IGNORECASE)
-                chiro_match = chiro_regex.match(part)
-                if chiro_match:
-                    chiro_text, punctuation = chiro_match.groups()
-                    phoneme_element = ElementTree.SubElement(prosody, "phoneme", alphabet="ipa", ph="ˈkaɪ.ro")
-                    phoneme_element.text = chiro_text
-                    if punctuation:  # If there's punctuation, directly append it after the phoneme element
-                        punctuation_element = ElementTree.SubElement(prosody, "text")
-                        punctuation_element.text = punctuation
-                elif part in emails:
-                    # Split the email into user and domain parts
-                    user, domain = part.split('@')
-                    domain_parts = domain.split('.')
-
-                    # User part spelled out with breaks
-                    for char in user:
-                        if char in ['-', '_', '.']:
-                            # Pronounce special characters in user part
-                            text_element = ElementTree.SubElement(prosody, "text")
-                            if char == '-':
-                                text_element.text = " dash "
-                            elif char == '_':
-                                text_element.text = " underscore "
-                            elif char == '.':
-                                text_element.text = " dot "
-                        else:
-                            # Regular characters in user part
-                            char_element = ElementTree.SubElement(prosody, "say-as", {"interpret-as": "characters"})
-                            char_element.text = char
-                        ElementTree.SubElement(prosody, "break", {"time": "500ms"})  # Short break between characters
-
-                    # Insert "at"
-                    ElementTree.SubElement(prosody, "break", {"time": "500ms"})
-                    at_text = ElementTree.SubElement(prosody, "text")
-                    at_text.text = " at "
-
-                    # Domain parts spelled out with breaks and "dot"
-                    for i, domain_part in enumerate(domain_parts):
-                        for char in domain_part:
-                            if char in ['-', '_', '.']:
-                                # Pronounce special characters in domain part
-                                text_element = ElementTree.SubElement(prosody, "text")
-                                if char == '-':
-                                    text_element.text = " dash "
-                                elif char == '_':
-                                    text_element.text = " underscore "
-                                elif char == '.':
-                                    text_element.text = " dot "
-                            else:
-                                # Regular characters in domain part
-                                char_element = ElementTree.SubElement(prosody, "say-as", {"interpret-as": "characters"})
-                                char_element.text = char
-                            ElementTree.SubElement(prosody, "break", {"time": "500ms"})  # Short break between characters
-
-                        if i < len(domain_parts) - 1:
-                            # Add "dot" between domain parts
-                            ElementTree.SubElement(prosody, "break", {"time": "500ms"})
-                            dot_text = ElementTree.SubElement(prosody, "text")
-                            dot_text.text = " dot "
-                # else:
-                #     # Check if the part matches the spelled-out pattern (like **C-A-M-E-R-O-N)
-                #     match = re.match(spelled_word_regex, part)
-                #     if match:
-                #         spelled_out_word = match.groups()[0]
-                #         for char in spelled_out_word.split('-'):
-                #             char_element = ElementTree.SubElement(prosody, "say-as", {"interpret-as": "characters"})
-                #             char_element.text = char
-                #             ElementTree.SubElement(prosody, "break", {"time": "500ms"})  # Short break between characters
-                else:
-                    # Process non-email, non-spelled-out parts as regular text
-                    text_element = ElementTree.SubElement(prosody, "text")
-                    text_element.text = part
-
-            return ElementTree.tostring(ssml_root, encoding="unicode")
-
-    def synthesize_ssml(self, ssml: str) -> speechsdk.AudioDataStream:
+        self, message: str, bot_sentiment: Optional[BotSentiment] = None
+    ) -> str:
+        return self.ssml_builder.build(message, bot_sentiment=bot_sentiment)
+
+    def synthesize_ssml(self, ssml: str) -> Tuple[speechsdk.AudioDataStream, str]:
         # print("SSML!!!!!!")
         # print(ssml)
         result = self.synthesizer.start_speaking_ssml_async(ssml).get()
-        return speechsdk.AudioDataStream(result)
+        return speechsdk.AudioDataStream(result), result.result_id
 
     def ready_synthesizer(self):
         connection = speechsdk.Connection.from_speech_synthesizer(self.synthesizer)
@@ -319,13 +218,12 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
         seconds: float,
         word_boundary_event_pool: WordBoundaryEventPool,
     ) -> str:
-        events = word_boundary_event_pool.get_events_sorted()
-        for event in events:
-            if event["audio_offset"] > seconds:
-                ssml_fragment = ssml[: event["text_offset"]]
-                # TODO: this is a little hacky, but it works for now
-                return ssml_fragment.split(">")[-1]
-        return message
+        text_offset = word_boundary_event_pool.get_text_offset_after(seconds)
+        if text_offset is None:
+            return message
+        ssml_fragment = ssml[:text_offset]
+        # TODO: this is a little hacky, but it works for now
+        return ssml_fragment.split(">")[-1]
 
     async def create_speech(
         self,
@@ -333,8 +231,6 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
         chunk_size: int,
         bot_sentiment: Optional[BotSentiment] = None,
     ) -> SynthesisResult:
-        # offset = int(self.OFFSET_MS * (self.synthesizer_config.sampling_rate / 1000))
-        offset = 0
         self.logger.debug(f"Synthesizing message: {message}")
 
         # Azure will return no audio for certain strings like "-", "[-", and "!"
@@ -347,50 +243,46 @@ class AzureSynthesizer(BaseSynthesizer[AzureSynthesizerConfig]):
             )
 
         async def chunk_generator(
-            audio_data_stream: speechsdk.AudioDataStream, chunk_transform=lambda x: x
+            audio_data_stream: speechsdk.AudioDataStream,
+            result_id: str,
+            chunk_transform=lambda x: x,
         ):
-            audio_buffer = bytes(chunk_size)
-            filled_size = await asyncio.get_event_loop().run_in_executor(
-                self.thread_pool_executor,
-                lambda: audio_data_stream.read_data(audio_buffer),
-            )
-            if filled_size != chunk_size:
-                yield SynthesisResult.ChunkResult(
-                    chunk_transform(audio_buffer[offset:]), True
-                )
-                return
-            else:
-                yield SynthesisResult.ChunkResult(
-                    chunk_transform(audio_buffer[offset:]), False
-                )
-            while True:
+            def read_chunk(size: int) -> bytes:
+                audio_buffer = bytes(size)
                 filled_size = audio_data_stream.read_data(audio_buffer)
-                if filled_size != chunk_size:
-                    yield SynthesisResult.ChunkResult(
-                        chunk_transform(audio_buffer[: filled_size - offset]), True
-                    )
-                    break
-                yield SynthesisResult.ChunkResult(chunk_transform(audio_buffer), False)
-
-        word_boundary_event_pool = WordBoundaryEventPool()
-        self.synthesizer.synthesis_word_boundary.connect(
-            lambda event: self.word_boundary_cb(event, word_boundary_event_pool)
-        )
+                return audio_buffer[:filled_size]
+
+            # reads the stream off the event loop, read_data blocks until Azure sends a full chunk
+            audio_stream_pump = AudioStreamPump(
+                read_chunk,
+                ChunkSizeSchedule(self.synthesizer_config, chunk_size),
+                on_stop=audio_data_stream.detach_input,
+            )
+            try:
+                async for chunk, is_last in audio_stream_pump.chunks():
+                    yield SynthesisResult.ChunkResult(chunk_transform(chunk), is_last)
+            finally:
+                # the utterance has been played (or interrupted), the SynthesisResult keeps
+                # the pool for get_message_up_to
+                self.word_boundary_dispatcher.release(result_id)
+
         ssml = (
             message.ssml
             if isinstance(message, SSMLMessage)
             else self.create_ssml(message.text, bot_sentiment=bot_sentiment)
         )
-        audio_data_stream = await asyncio.get_event_loop().run_in_executor(
+        audio_data_stream, result_id = await asyncio.get_event_loop().run_in_executor(
             self.thread_pool_executor, self.synthesize_ssml, ssml
         )
+        word_boundary_event_pool = self.word_boundary_dispatcher.register(result_id)
         if self.synthesizer_config.should_encode_as_wav:
             output_generator = chunk_generator(
                 audio_data_stream,
+                result_id,
                 lambda chunk: encode_as_wav(chunk, self.synthesizer_config),
             )
         else:
-            output_generator = chunk_generator(audio_data_stream)
+            output_generator = chunk_generator(audio_data_stream, result_id)
 
         return SynthesisResult(
             output_generator,
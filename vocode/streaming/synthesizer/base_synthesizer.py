@@ -1,5 +1,7 @@
 import asyncio
+import logging
 import os
+import queue
 from typing import (
     Any,
     AsyncGenerator,
@@ -24,11 +26,22 @@ from opentelemetry.trace import Span
 from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
 from vocode.streaming.models.agent import FillerAudioConfig
 from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.synthesizer.filler_audio_store import (
+    FillerAudioData,
+    get_filler_audio_store,
+)
 from vocode.streaming.synthesizer.miniaudio_worker import MiniaudioWorker
+from vocode.streaming.synthesizer.synthesis_cache import (
+    SynthesisCache,
+    get_cache_key,
+    get_synthesis_cache,
+)
 from vocode.streaming.utils import convert_wav, get_chunk_size_per_second
 from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.models.synthesizer import SynthesizerConfig
 
+logger = logging.getLogger(__name__)
+
 FILLER_PHRASES = [
     BaseMessage(text="Um..."),
     BaseMessage(text="Uh..."),
@@ -77,7 +90,7 @@ class FillerAudio:
     def __init__(
         self,
         message: BaseMessage,
-        audio_data: bytes,
+        audio_data: FillerAudioData,
         synthesizer_config: SynthesizerConfig,
         is_interruptible: bool = False,
         seconds_per_chunk: int = 1,
@@ -146,14 +159,27 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
     def get_synthesizer_config(self) -> SynthesizerConfig:
         return self.synthesizer_config
 
-    def get_typing_noise_filler_audio(self) -> FillerAudio:
+    async def get_typing_noise_filler_audio(self) -> FillerAudio:
+        output_sample_rate = self.synthesizer_config.sampling_rate
+        output_encoding = self.synthesizer_config.audio_encoding
+
+        async def convert_typing_noise() -> bytes:
+            return await asyncio.get_event_loop().run_in_executor(
+                None,
+                lambda: convert_wav(
+                    TYPING_NOISE_PATH,
+                    output_sample_rate=output_sample_rate,
+                    output_encoding=output_encoding,
+                ),
+            )
+
+        audio_data = await get_filler_audio_store().get_audio_data(
+            f"typing-noise-{output_encoding.value}-{output_sample_rate}",
+            convert_typing_noise,
+        )
         return FillerAudio(
             message=BaseMessage(text="<typing noise>"),
-            audio_data=convert_wav(
-                TYPING_NOISE_PATH,
-                output_sample_rate=self.synthesizer_config.sampling_rate,
-                output_encoding=self.synthesizer_config.audio_encoding,
-            ),
+            audio_data=audio_data,
             synthesizer_config=self.synthesizer_config,
             is_interruptible=True,
             seconds_per_chunk=2,
@@ -163,10 +189,59 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
         if filler_audio_config.use_phrases:
             self.filler_audios = await self.get_phrase_filler_audios()
         elif filler_audio_config.use_typing_noise:
-            self.filler_audios = [self.get_typing_noise_filler_audio()]
+            self.filler_audios = [await self.get_typing_noise_filler_audio()]
 
     async def get_phrase_filler_audios(self) -> List[FillerAudio]:
-        return []
+        """Gets the audio of the FILLER_PHRASES from the process-wide filler audio store,
+        synthesizing the phrases it doesn't have yet concurrently"""
+        filler_audio_store = get_filler_audio_store()
+
+        async def get_audio_data(filler_phrase: BaseMessage) -> FillerAudioData:
+            async def synthesize() -> bytes:
+                return await self.synthesize_filler_audio_data(filler_phrase)
+
+            return await filler_audio_store.get_audio_data(
+                get_cache_key(filler_phrase, self.synthesizer_config), synthesize
+            )
+
+        audio_datas = await asyncio.gather(
+            *[get_audio_data(filler_phrase) for filler_phrase in FILLER_PHRASES],
+            return_exceptions=True,
+        )
+        filler_audios = []
+        for filler_phrase, audio_data in zip(FILLER_PHRASES, audio_datas):
+            if isinstance(audio_data, BaseException):
+                logger.warning(
+                    "Failed to synthesize filler audio for %s: %s",
+                    filler_phrase.text,
+                    audio_data,
+                )
+                continue
+            filler_audios.append(
+                FillerAudio(filler_phrase, audio_data, self.synthesizer_config)
+            )
+        return filler_audios
+
+    async def synthesize_filler_audio_data(self, filler_phrase: BaseMessage) -> bytes:
+        """Synthesizes the complete audio of a filler phrase, in the synthesizer config's audio
+        encoding and sampling rate (not wav encoded)"""
+        synthesis_result = await self.create_speech(
+            filler_phrase,
+            get_chunk_size_per_second(
+                self.synthesizer_config.audio_encoding,
+                self.synthesizer_config.sampling_rate,
+            ),
+        )
+        audio_data = bytearray()
+        async for chunk_result in synthesis_result.chunk_generator:
+            if self.synthesizer_config.should_encode_as_wav:
+                with wave.open(io.BytesIO(chunk_result.chunk), "rb") as wav:
+                    audio_data.extend(wav.readframes(wav.getnframes()))
+            else:
+                audio_data.extend(chunk_result.chunk)
+            if chunk_result.is_last_chunk:
+                break
+        return bytes(audio_data)
 
     def ready_synthesizer(self):
         pass
@@ -195,6 +270,12 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
         tokens = word_tokenize(message.text)
         return TreebankWordDetokenizer().detokenize(tokens[:estimated_words_spoken])
 
+    def get_native_output_format(self) -> Optional[str]:
+        """The provider's name for its raw output format matching the synthesizer config's audio
+        encoding and sampling rate, or None if the provider can't send it and its audio has to be
+        converted (e.g. from mp3)"""
+        return None
+
     # returns a chunk generator and a thunk that can tell you what part of the message was read given the number of seconds spoken
     # chunk generator must return a ChunkResult, essentially a tuple (bytes of size chunk_size, flag if it is the last chunk)
     async def create_speech(
@@ -205,6 +286,77 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
     ) -> SynthesisResult:
         raise NotImplementedError
 
+    async def create_speech_with_cache(
+        self,
+        message: BaseMessage,
+        chunk_size: int,
+        bot_sentiment: Optional[BotSentiment] = None,
+    ) -> SynthesisResult:
+        """Runs create_speech, unless the message's audio is in the synthesis cache (see
+        SynthesisCacheConfig). Audio is cached once it has been synthesized completely.
+        """
+        synthesis_cache_config = self.synthesizer_config.synthesis_cache_config
+        # speech depending on the bot's sentiment and wav encoded chunks aren't cached
+        if (
+            synthesis_cache_config is None
+            or bot_sentiment is not None
+            or self.synthesizer_config.should_encode_as_wav
+        ):
+            return await self.create_speech(
+                message, chunk_size, bot_sentiment=bot_sentiment
+            )
+        synthesis_cache = get_synthesis_cache(synthesis_cache_config)
+        cache_key = get_cache_key(message, self.synthesizer_config)
+        audio = await synthesis_cache.get(cache_key)
+        if audio is not None:
+            return self.create_synthesis_result_from_cached_audio(
+                message, audio, chunk_size
+            )
+        synthesis_result = await self.create_speech(message, chunk_size)
+        return SynthesisResult(
+            self.cache_chunks(
+                synthesis_result.chunk_generator, synthesis_cache, cache_key
+            ),
+            synthesis_result.get_message_up_to,
+        )
+
+    async def cache_chunks(
+        self,
+        chunk_generator: AsyncGenerator[SynthesisResult.ChunkResult, None],
+        synthesis_cache: SynthesisCache,
+        cache_key: str,
+    ) -> AsyncGenerator[SynthesisResult.ChunkResult, None]:
+        audio = bytearray()
+        async for chunk_result in chunk_generator:
+            audio.extend(chunk_result.chunk)
+            yield chunk_result
+            if chunk_result.is_last_chunk:
+                break
+        # interrupted speech never gets here, so only complete audio is cached
+        await synthesis_cache.put(cache_key, bytes(audio))
+
+    def create_synthesis_result_from_cached_audio(
+        self, message: BaseMessage, audio: bytes, chunk_size: int
+    ) -> SynthesisResult:
+        synthesis_result = self.create_synthesis_result_from_raw(
+            synthesizer_config=self.synthesizer_config,
+            output_bytes=audio,
+            message=message,
+            chunk_size=chunk_size,
+        )
+        seconds_of_audio = len(audio) / get_chunk_size_per_second(
+            self.synthesizer_config.audio_encoding,
+            self.synthesizer_config.sampling_rate,
+        )
+
+        def get_message_up_to(seconds: float) -> str:
+            if seconds >= seconds_of_audio:
+                return message.text
+            return message.text[: int(len(message.text) * seconds / seconds_of_audio)]
+
+        synthesis_result.get_message_up_to = get_message_up_to
+        return synthesis_result
+
     # @param file - a file-like object in wav format
     @staticmethod
     def create_synthesis_result_from_wav(
@@ -218,7 +370,21 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
             output_sample_rate=synthesizer_config.sampling_rate,
             output_encoding=synthesizer_config.audio_encoding,
         )
+        return BaseSynthesizer.create_synthesis_result_from_raw(
+            synthesizer_config=synthesizer_config,
+            output_bytes=output_bytes,
+            message=message,
+            chunk_size=chunk_size,
+        )
 
+    # @param output_bytes - audio already in the synthesizer config's audio encoding and sampling rate
+    @staticmethod
+    def create_synthesis_result_from_raw(
+        synthesizer_config: SynthesizerConfig,
+        output_bytes: bytes,
+        message: BaseMessage,
+        chunk_size: int,
+    ) -> SynthesisResult:
         if synthesizer_config.should_encode_as_wav:
             chunk_transform = lambda chunk: encode_as_wav(chunk, synthesizer_config)
         else:
@@ -226,7 +392,7 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
 
         async def chunk_generator(output_bytes):
             for i in range(0, len(output_bytes), chunk_size):
-                if i + chunk_size > len(output_bytes):
+                if i + chunk_size >= len(output_bytes):
                     yield SynthesisResult.ChunkResult(
                         chunk_transform(output_bytes[i:]), True
                     )
@@ -248,9 +414,7 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
         chunk_size: int,
         create_speech_span: Optional[Span],
     ) -> AsyncGenerator[SynthesisResult.ChunkResult, None]:
-        miniaudio_worker_input_queue: asyncio.Queue[
-            Union[bytes, None]
-        ] = asyncio.Queue()
+        miniaudio_worker_input_queue: queue.Queue[Union[bytes, None]] = queue.Queue()
         miniaudio_worker_output_queue: asyncio.Queue[
             Tuple[bytes, bool]
         ] = asyncio.Queue()
@@ -289,6 +453,31 @@ class BaseSynthesizer(Generic[SynthesizerConfigType]):
         finally:
             miniaudio_worker.terminate()
 
+    async def raw_streaming_output_generator(
+        self,
+        response: aiohttp.ClientResponse,
+        chunk_size: int,
+        create_speech_span: Optional[Span],
+    ) -> AsyncGenerator[SynthesisResult.ChunkResult, None]:
+        """Streams a response that's already in the synthesizer config's audio encoding and
+        sampling rate (see get_native_output_format) into chunks, without decoding it"""
+        buffer = bytearray()
+        async for data in response.content.iter_any():
+            buffer.extend(data)
+            # keep the last chunk (at most chunk size) in the buffer
+            while len(buffer) > chunk_size:
+                chunk = bytes(buffer[:chunk_size])
+                del buffer[:chunk_size]
+                if self.synthesizer_config.should_encode_as_wav:
+                    chunk = encode_as_wav(chunk, self.synthesizer_config)
+                yield SynthesisResult.ChunkResult(chunk, False)
+        chunk = bytes(buffer)
+        if self.synthesizer_config.should_encode_as_wav:
+            chunk = encode_as_wav(chunk, self.synthesizer_config)
+        yield SynthesisResult.ChunkResult(chunk, True)
+        if create_speech_span is not None:
+            create_speech_span.end()
+
     async def tear_down(self):
         if self.should_close_session_on_tear_down:
             await self.aiohttp_session.close()
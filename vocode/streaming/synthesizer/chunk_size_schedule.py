@@ -0,0 +1,45 @@
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.synthesizer import SynthesizerConfig
+from vocode.streaming.utils import get_chunk_size_per_second
+
+
+class ChunkSizeSchedule:
+    """Sizes of the chunks a SynthesisResult chunk generator yields for one utterance.
+
+    Without an AdaptiveChunkingConfig every chunk is `chunk_size`. With one, the first chunk is
+    `first_chunk_size_seconds` long and each following chunk is `growth_factor` times bigger, up to
+    `chunk_size` - so playback can start as soon as the provider's first audio frames arrive.
+    """
+
+    def __init__(self, synthesizer_config: SynthesizerConfig, chunk_size: int):
+        self.chunk_size = chunk_size
+        self.sample_width = (
+            2 if synthesizer_config.audio_encoding == AudioEncoding.LINEAR16 else 1
+        )
+        self.growth_factor = 1.0
+        self.current_chunk_size = chunk_size
+        adaptive_chunking_config = synthesizer_config.adaptive_chunking_config
+        if adaptive_chunking_config:
+            first_chunk_size = int(
+                get_chunk_size_per_second(
+                    synthesizer_config.audio_encoding,
+                    synthesizer_config.sampling_rate,
+                )
+                * adaptive_chunking_config.first_chunk_size_seconds
+            )
+            self.current_chunk_size = min(
+                self._align(first_chunk_size), self.chunk_size
+            )
+            self.growth_factor = adaptive_chunking_config.growth_factor
+
+    def _align(self, size: int) -> int:
+        return max(size - size % self.sample_width, self.sample_width)
+
+    def next_chunk_size(self) -> int:
+        chunk_size = self.current_chunk_size
+        if self.current_chunk_size < self.chunk_size:
+            self.current_chunk_size = min(
+                self._align(int(self.current_chunk_size * self.growth_factor)),
+                self.chunk_size,
+            )
+        return chunk_size
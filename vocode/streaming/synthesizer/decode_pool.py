@@ -0,0 +1,93 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from opentelemetry import metrics
+
+from vocode import getenv
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+DEFAULT_DECODE_POOL_SIZE = 32
+
+active_jobs_counter = meter.create_up_down_counter(
+    name="synthesizer.decode_pool.active_jobs",
+    description="Decode jobs running on a pool thread",
+)
+queued_jobs_counter = meter.create_up_down_counter(
+    name="synthesizer.decode_pool.queued_jobs",
+    description="Decode jobs waiting for a free pool thread",
+)
+queue_wait_hist = meter.create_histogram(
+    name="synthesizer.decode_pool.queue_wait",
+    unit="seconds",
+    description="Time a decode job waited for a free pool thread",
+)
+utilization_hist = meter.create_histogram(
+    name="synthesizer.decode_pool.utilization",
+    description="Fraction of the pool's threads busy when a decode job is submitted",
+)
+
+
+class DecodePool:
+    """Process-wide, size bounded pool of threads that decode streamed audio, so concurrent
+    utterances reuse threads instead of starting one each.
+
+    Jobs decode the audio that has already arrived and return, they never wait for more - so any
+    number of streams make progress on the pool. Once all threads are busy, new jobs queue until
+    one frees up.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_DECODE_POOL_SIZE):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="decode_pool"
+        )
+        self.lock = threading.Lock()
+        self.num_active = 0
+        self.num_queued = 0
+
+    def utilization(self) -> float:
+        return self.num_active / self.max_workers
+
+    def submit(self, job: Callable[[], None]) -> Future:
+        with self.lock:
+            self.num_queued += 1
+            utilization_hist.record(self.utilization())
+        queued_jobs_counter.add(1)
+        submitted_at = time.monotonic()
+
+        def run():
+            with self.lock:
+                self.num_queued -= 1
+                self.num_active += 1
+            queued_jobs_counter.add(-1)
+            active_jobs_counter.add(1)
+            queue_wait_hist.record(time.monotonic() - submitted_at)
+            try:
+                job()
+            except Exception as e:
+                logger.exception("Decode job failed: %s", e)
+            finally:
+                with self.lock:
+                    self.num_active -= 1
+                active_jobs_counter.add(-1)
+
+        return self.executor.submit(run)
+
+
+_decode_pool: Optional[DecodePool] = None
+_decode_pool_lock = threading.Lock()
+
+
+def get_decode_pool() -> DecodePool:
+    global _decode_pool
+    with _decode_pool_lock:
+        if _decode_pool is None:
+            _decode_pool = DecodePool(
+                max_workers=int(getenv("DECODE_POOL_SIZE", DEFAULT_DECODE_POOL_SIZE))
+            )
+        return _decode_pool
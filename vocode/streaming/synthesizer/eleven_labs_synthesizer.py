@@ -1,7 +1,8 @@
 import asyncio
 import logging
 import time
-from typing import Any, AsyncGenerator, Optional, Tuple, Union
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple, Union
+from urllib.parse import urlencode
 import wave
 import aiohttp
 from opentelemetry.trace import Span
@@ -13,6 +14,7 @@ from vocode.streaming.synthesizer.base_synthesizer import (
     encode_as_wav,
     tracer,
 )
+from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.models.synthesizer import (
     ElevenLabsSynthesizerConfig,
     SynthesizerType,
@@ -25,6 +27,7 @@ from vocode.streaming.synthesizer.miniaudio_worker import MiniaudioWorker
 
 ADAM_VOICE_ID = "pNInz6obpgDQGcFmaJgB"
 ELEVEN_LABS_BASE_URL = "https://api.elevenlabs.io/v1/"
+ELEVEN_LABS_PCM_SAMPLING_RATES = [16000, 22050, 24000, 44100]
 
 
 class ElevenLabsSynthesizer(BaseSynthesizer[ElevenLabsSynthesizerConfig]):
@@ -49,6 +52,18 @@ class ElevenLabsSynthesizer(BaseSynthesizer[ElevenLabsSynthesizerConfig]):
         self.words_per_minute = 150
         self.experimental_streaming = synthesizer_config.experimental_streaming
 
+    def get_native_output_format(self) -> Optional[str]:
+        if not self.synthesizer_config.use_native_output_format:
+            return None
+        if self.synthesizer_config.audio_encoding == AudioEncoding.MULAW:
+            # ElevenLabs only sends mulaw at 8kHz, other rates are resampled from mp3
+            if self.synthesizer_config.sampling_rate == 8000:
+                return "ulaw_8000"
+            return None
+        if self.synthesizer_config.sampling_rate in ELEVEN_LABS_PCM_SAMPLING_RATES:
+            return f"pcm_{self.synthesizer_config.sampling_rate}"
+        return None
+
     async def create_speech(
         self,
         message: BaseMessage,
@@ -65,8 +80,14 @@ class ElevenLabsSynthesizer(BaseSynthesizer[ElevenLabsSynthesizerConfig]):
         if self.experimental_streaming:
             url += "/stream"
 
+        query_params: Dict[str, Union[int, str]] = {}
         if self.optimize_streaming_latency:
-            url += f"?optimize_streaming_latency={self.optimize_streaming_latency}"
+            query_params["optimize_streaming_latency"] = self.optimize_streaming_latency
+        output_format = self.get_native_output_format()
+        if output_format is not None:
+            query_params["output_format"] = output_format
+        if query_params:
+            url += f"?{urlencode(query_params)}"
         headers = {"xi-api-key": self.api_key}
         body = {
             "text": message.text,
@@ -91,10 +112,16 @@ class ElevenLabsSynthesizer(BaseSynthesizer[ElevenLabsSynthesizerConfig]):
         if not response.ok:
             raise Exception(f"ElevenLabs API returned {response.status} status code")
         if self.experimental_streaming:
-            return SynthesisResult(
-                self.experimental_mp3_streaming_output_generator(
+            if output_format is not None:
+                chunk_generator = self.raw_streaming_output_generator(
                     response, chunk_size, create_speech_span
-                ),  # should be wav
+                )
+            else:
+                chunk_generator = self.experimental_mp3_streaming_output_generator(
+                    response, chunk_size, create_speech_span
+                )  # should be wav
+            return SynthesisResult(
+                chunk_generator,
                 lambda seconds: self.get_message_cutoff_from_voice_speed(
                     message, seconds, self.words_per_minute
                 ),
@@ -102,6 +129,13 @@ class ElevenLabsSynthesizer(BaseSynthesizer[ElevenLabsSynthesizerConfig]):
         else:
             audio_data = await response.read()
             create_speech_span.end()
+            if output_format is not None:
+                return self.create_synthesis_result_from_raw(
+                    synthesizer_config=self.synthesizer_config,
+                    output_bytes=audio_data,
+                    message=message,
+                    chunk_size=chunk_size,
+                )
             convert_span = tracer.start_span(
                 f"synthesizer.{SynthesizerType.ELEVEN_LABS.value.split('_', 1)[-1]}.convert",
             )
@@ -27,6 +27,9 @@ from vocode.streaming.synthesizer.stream_elements_synthesizer import (
     StreamElementsSynthesizer,
 )
 from vocode.streaming.synthesizer.coqui_tts_synthesizer import CoquiTTSSynthesizer
+from vocode.streaming.synthesizer.sentence_split_synthesizer import (
+    SentenceSplitSynthesizer,
+)
 
 
 class SynthesizerFactory:
@@ -35,6 +38,21 @@ class SynthesizerFactory:
         synthesizer_config: SynthesizerConfig,
         logger: Optional[logging.Logger] = None,
         aiohttp_session: Optional[aiohttp.ClientSession] = None,
+    ):
+        synthesizer = self.create_provider_synthesizer(
+            synthesizer_config, logger=logger, aiohttp_session=aiohttp_session
+        )
+        if synthesizer_config.sentence_split_config is not None:
+            return SentenceSplitSynthesizer(
+                synthesizer, synthesizer_config.sentence_split_config
+            )
+        return synthesizer
+
+    def create_provider_synthesizer(
+        self,
+        synthesizer_config: SynthesizerConfig,
+        logger: Optional[logging.Logger] = None,
+        aiohttp_session: Optional[aiohttp.ClientSession] = None,
     ):
         if isinstance(synthesizer_config, GoogleSynthesizerConfig):
             return GoogleSynthesizer(
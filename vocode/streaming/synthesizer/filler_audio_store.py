@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import mmap
+import os
+import threading
+import weakref
+from typing import Awaitable, Callable, Dict, Optional, Union
+
+from vocode import getenv
+
+logger = logging.getLogger(__name__)
+
+FillerAudioData = Union[bytes, mmap.mmap]
+
+
+class FillerAudioStore:
+    """Process-wide store of filler audio, shared (read only) by all conversations.
+
+    Audio is keyed by the phrase and the synthesizer's voice config (see
+    synthesis_cache.get_cache_key) and generated at most once per key, however many conversations
+    ask for it at the same time. With a `cache_path`, generated audio is written there and
+    memory-mapped, so the audio survives restarts and processes share one copy in the page cache;
+    otherwise a single copy is held in memory.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        if cache_path is not None:
+            os.makedirs(cache_path, exist_ok=True)
+        self.audio_datas: Dict[str, FillerAudioData] = {}
+        # tasks belong to the event loop they were created on, so each loop has its own
+        self.generation_tasks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get_path(self, key: str) -> str:
+        assert self.cache_path is not None
+        return os.path.join(self.cache_path, f"{key}.bytes")
+
+    def load(self, key: str) -> Optional[FillerAudioData]:
+        try:
+            with open(self.get_path(key), "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                # the mapping stays valid after the file is closed
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def save(self, key: str, audio_data: bytes) -> FillerAudioData:
+        path = self.get_path(key)
+        # write to a temporary file first so other processes never map a partial file
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as f:
+            f.write(audio_data)
+        os.replace(temporary_path, path)
+        return self.load(key) or audio_data
+
+    def get_generation_tasks(self) -> Dict[str, asyncio.Task]:
+        return self.generation_tasks.setdefault(asyncio.get_running_loop(), {})
+
+    async def generate(
+        self, key: str, synthesize: Callable[[], Awaitable[bytes]]
+    ) -> FillerAudioData:
+        try:
+            audio_data: FillerAudioData = await synthesize()
+            if self.cache_path is not None:
+                try:
+                    audio_data = await asyncio.get_event_loop().run_in_executor(
+                        None, self.save, key, audio_data
+                    )
+                except OSError as e:
+                    logger.warning("Failed to write filler audio to disk: %s", e)
+            self.audio_datas[key] = audio_data
+            return audio_data
+        finally:
+            self.get_generation_tasks().pop(key, None)
+
+    async def get_audio_data(
+        self, key: str, synthesize: Callable[[], Awaitable[bytes]]
+    ) -> FillerAudioData:
+        """Returns the audio stored under key, running synthesize() to generate it if needed"""
+        if key in self.audio_datas:
+            return self.audio_datas[key]
+        if self.cache_path is not None:
+            audio_data = self.load(key)
+            if audio_data is not None:
+                self.audio_datas[key] = audio_data
+                return audio_data
+        generation_tasks = self.get_generation_tasks()
+        if key not in generation_tasks:
+            generation_tasks[key] = asyncio.create_task(self.generate(key, synthesize))
+        # a conversation giving up on the audio doesn't cancel it for the others
+        return await asyncio.shield(generation_tasks[key])
+
+
+_filler_audio_store: Optional[FillerAudioStore] = None
+_filler_audio_store_lock = threading.Lock()
+
+
+def get_filler_audio_store() -> FillerAudioStore:
+    global _filler_audio_store
+    with _filler_audio_store_lock:
+        if _filler_audio_store is None:
+            _filler_audio_store = FillerAudioStore(
+                cache_path=getenv("FILLER_AUDIO_CACHE_PATH")
+            )
+        return _filler_audio_store
@@ -1,85 +1,276 @@
 from __future__ import annotations
 import queue
 
-from typing import Optional, Tuple, Union
+import threading
+from typing import Iterator, Optional, Tuple, Union
 import asyncio
+import logging
 import miniaudio
 
+from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.models.synthesizer import SynthesizerConfig
-from vocode.streaming.utils import convert_wav
-from vocode.streaming.utils.mp3_helper import decode_mp3
-from vocode.streaming.utils.worker import ThreadAsyncWorker, logger
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
+from vocode.streaming.synthesizer.decode_pool import DecodePool, get_decode_pool
+from vocode.streaming.utils.audio_codec import linear16_to_mulaw
 
+logger = logging.getLogger(__name__)
+
+# how much audio the decoder produces per step, small so the first chunk isn't held up
+DECODE_STEP_SECONDS = 0.02
+# how much received audio is left undecoded until the utterance is finished, enough to cover
+# the frames the decoder reads ahead of what it outputs
+DECODER_RESERVE_SECONDS = 0.2
+
+ID3_HEADER_BYTES = 10
+MP3_HEADER_BYTES = 4
+# kbps by bitrate index, for MPEG-1 and MPEG-2/2.5 layer III
+MP3_BITRATES = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+MP3_SAMPLE_RATES = {
+    1: [44100, 48000, 32000],
+    2: [22050, 24000, 16000],
+    25: [11025, 12000, 8000],
+}
+MP3_VERSIONS = {0b11: 1, 0b10: 2, 0b00: 25}
+
+
+def parse_mp3_frame_header(header: bytes) -> Optional[Tuple[int, int, int]]:
+    """Returns the length in bytes, samples and sample rate of a layer III frame"""
+    if header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = MP3_VERSIONS.get((header[1] >> 3) & 0b11)
+    layer = (header[1] >> 1) & 0b11
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0b11
+    # free format frames don't have a length in their header
+    if (
+        version is None
+        or layer != 0b01
+        or bitrate_index in (0, 15)
+        or sample_rate_index == 3
+    ):
+        return None
+    bitrate = MP3_BITRATES[min(version, 2)][bitrate_index] * 1000
+    sample_rate = MP3_SAMPLE_RATES[version][sample_rate_index]
+    padding = (header[2] >> 1) & 1
+    num_samples = 1152 if version == 1 else 576
+    return num_samples // 8 * bitrate // sample_rate + padding, num_samples, sample_rate
+
+
+class Mp3ChunkSource(miniaudio.StreamableSource):
+    """The mp3 of one utterance received so far, read by its decoder.
+
+    The decoder throws away a frame it only has part of and takes an empty read when it has
+    nothing buffered as the end of the stream, so until the utterance is finished reads only hand
+    out whole frames, and the decoder is only stepped while more than DECODER_RESERVE_SECONDS of
+    the frames received haven't been decoded.
+    """
+
+    def __init__(self):
+        self.pending = bytearray()
+        # how much of pending is whole frames (or bytes that aren't part of any frame)
+        self.num_complete_bytes = 0
+        self.num_received_samples = 0
+        self.sample_rate: Optional[int] = None
+        self.is_finished = False
+
+    def extend(self, mp3_chunk: bytes):
+        self.pending.extend(mp3_chunk)
+        while True:
+            remaining = len(self.pending) - self.num_complete_bytes
+            if remaining < MP3_HEADER_BYTES:
+                return
+            header = bytes(
+                self.pending[
+                    self.num_complete_bytes : self.num_complete_bytes + ID3_HEADER_BYTES
+                ]
+            )
+            if header.startswith(b"ID3"):
+                if len(header) < ID3_HEADER_BYTES:
+                    return
+                # the tag size is syncsafe, 7 bits per byte, and excludes the header and footer
+                tag_size = int.from_bytes(bytes(b & 0x7F for b in header[6:10]), "big")
+                num_bytes = ID3_HEADER_BYTES * (2 if header[5] & 0x10 else 1) + tag_size
+                num_samples = 0
+            else:
+                frame = parse_mp3_frame_header(header)
+                if frame is None:
+                    # not a frame, the decoder skips it
+                    num_bytes, num_samples = 1, 0
+                else:
+                    num_bytes, num_samples, self.sample_rate = frame
+            if remaining < num_bytes:
+                return
+            self.num_complete_bytes += num_bytes
+            self.num_received_samples += num_samples
+
+    def read(self, num_bytes: int) -> bytes:
+        available = len(self.pending) if self.is_finished else self.num_complete_bytes
+        data = bytes(self.pending[: min(num_bytes, available)])
+        del self.pending[: len(data)]
+        self.num_complete_bytes = max(self.num_complete_bytes - len(data), 0)
+        return data
+
+
+class UtteranceDecoder:
+    """Decoder state of one utterance, fed one mp3 chunk at a time"""
+
+    def __init__(self, synthesizer_config: SynthesizerConfig, chunk_size: int):
+        self.synthesizer_config = synthesizer_config
+        self.source = Mp3ChunkSource()
+        self.samples_stream: Optional[Iterator] = None
+        self.is_exhausted = False
+        self.num_decoded_samples = 0
+        self.chunk_size_schedule = ChunkSizeSchedule(synthesizer_config, chunk_size)
+        self.current_chunk_size = self.chunk_size_schedule.next_chunk_size()
+        # the decoded audio that hasn't been sent to the output queue yet
+        self.current_wav_output_buffer = bytearray()
+
+    def feed(self, mp3_chunk: bytes) -> Iterator[bytes]:
+        """Decodes what it can of the utterance so far, yields the chunks that are complete"""
+        self.source.extend(mp3_chunk)
+        return self.decode()
+
+    def finish(self) -> Iterator[bytes]:
+        """Decodes the rest of the utterance, the last chunk yielded may be short"""
+        self.source.is_finished = True
+        yield from self.decode()
+        yield bytes(self.current_wav_output_buffer)
+
+    def can_decode(self) -> bool:
+        if self.source.is_finished:
+            return True
+        if self.source.sample_rate is None:
+            return False
+        undecoded_seconds = (
+            self.source.num_received_samples / self.source.sample_rate
+            - self.num_decoded_samples / self.synthesizer_config.sampling_rate
+        )
+        return undecoded_seconds > DECODER_RESERVE_SECONDS + DECODE_STEP_SECONDS
+
+    def decode(self) -> Iterator[bytes]:
+        try:
+            while not self.is_exhausted and self.can_decode():
+                if self.samples_stream is None:
+                    self.samples_stream = miniaudio.stream_any(
+                        self.source,
+                        source_format=miniaudio.FileFormat.MP3,
+                        output_format=miniaudio.SampleFormat.SIGNED16,
+                        nchannels=1,
+                        sample_rate=self.synthesizer_config.sampling_rate,
+                        frames_to_read=max(
+                            int(
+                                self.synthesizer_config.sampling_rate
+                                * DECODE_STEP_SECONDS
+                            ),
+                            1,
+                        ),
+                    )
+                samples = next(self.samples_stream, None)
+                if samples is None:
+                    self.is_exhausted = True
+                    break
+                self.num_decoded_samples += len(samples)
+                new_bytes = samples.tobytes()
+                if self.synthesizer_config.audio_encoding == AudioEncoding.MULAW:
+                    new_bytes = linear16_to_mulaw(new_bytes)
+                self.current_wav_output_buffer.extend(new_bytes)
+                # send chunks following the chunk size schedule, but keep the last chunk (less than chunk size) in the wav output buffer
+                while len(self.current_wav_output_buffer) > self.current_chunk_size:
+                    yield bytes(
+                        self.current_wav_output_buffer[: self.current_chunk_size]
+                    )
+                    del self.current_wav_output_buffer[: self.current_chunk_size]
+                    self.current_chunk_size = self.chunk_size_schedule.next_chunk_size()
+        except miniaudio.DecodeError as e:
+            # TODO: better logging
+            logger.exception("MiniaudioWorker error: " + str(e), exc_info=True)
+            # skips whatever is left of the utterance
+            self.is_exhausted = True
+
+
+class MiniaudioWorker:
+    """Decodes streamed mp3 into chunks of the synthesizer's output format.
+
+    A single miniaudio decoder (which also resamples to the output sampling rate) runs per
+    utterance, so each chunk is decoded exactly once. Every mp3 chunk is decoded by its own job on
+    the shared DecodePool, which picks up the utterance's decoder state and returns its thread as
+    soon as the chunk is decoded, so no thread waits for chunks to arrive. A worker's jobs are
+    chained - the job of a chunk submits the job of the next one - so they run one at a time, in
+    order. Chunks are handed over through the thread-safe input_queue and the decoded chunks are
+    put on output_queue on the event loop.
+    """
 
-class MiniaudioWorker(ThreadAsyncWorker[Union[bytes, None]]):
     def __init__(
         self,
         synthesizer_config: SynthesizerConfig,
         chunk_size: int,
-        input_queue: asyncio.Queue[Union[bytes, None]],
+        input_queue: queue.Queue[Union[bytes, None]],
         output_queue: asyncio.Queue[Tuple[bytes, bool]],
+        decode_pool: Optional[DecodePool] = None,
     ) -> None:
-        super().__init__(input_queue, output_queue)
-        self.output_queue = output_queue  # for typing
+        self.input_queue = input_queue
+        self.output_queue = output_queue
         self.synthesizer_config = synthesizer_config
         self.chunk_size = chunk_size
+        self.decode_pool = decode_pool or get_decode_pool()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.utterance_decoder: Optional[UtteranceDecoder] = None
+        # whether a job is submitted or running, guarded by the lock
+        self.is_decoding = False
+        self.lock = threading.Lock()
         self._ended = False
 
-    def _run_loop(self):
-        # tracks the mp3 so far
-        current_mp3_buffer = bytearray()
-        # tracks the wav so far
-        current_wav_buffer = bytearray()
-        # the leftover chunks of the wav that haven't been sent to the output queue yet
-        current_wav_output_buffer = bytearray()
-        while not self._ended:
-            # Get a tuple of (mp3_chunk, is_last) from the input queue
-            try:
-                mp3_chunk = self.input_janus_queue.sync_q.get(timeout=1)
-            except queue.Empty:
-                continue
-            if mp3_chunk is None:
-                current_mp3_buffer.clear()
-                current_wav_buffer.clear()
-                self.output_janus_queue.sync_q.put(
-                    (bytes(current_wav_output_buffer), True)
-                )
-                current_wav_output_buffer.clear()
-                continue
-            try:
-                current_mp3_buffer.extend(mp3_chunk)
-                output_bytes = decode_mp3(bytes(current_mp3_buffer))
-            except miniaudio.DecodeError as e:
-                # TODO: better logging
-                logger.exception("MiniaudioWorker error: " + str(e), exc_info=True)
-                self.output_janus_queue.sync_q.put(
-                    (bytes(current_wav_output_buffer), True)
-                )  # sentinel
-                continue
-            converted_output_bytes = convert_wav(
-                output_bytes,
-                output_sample_rate=self.synthesizer_config.sampling_rate,
-                output_encoding=self.synthesizer_config.audio_encoding,
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+
+    def consume_nonblocking(self, item: Union[bytes, None]):
+        self.input_queue.put_nowait(item)
+        with self.lock:
+            if self.is_decoding:
+                # picked up by the job that's running once it's done
+                return
+            self.is_decoding = True
+        self.decode_pool.submit(self.decode_next_item)
+
+    def decode_next_item(self):
+        try:
+            if not self._ended:
+                self.decode_item(self.input_queue.get_nowait())
+        finally:
+            with self.lock:
+                has_next_item = not self._ended and not self.input_queue.empty()
+                self.is_decoding = has_next_item
+            if has_next_item:
+                self.decode_pool.submit(self.decode_next_item)
+
+    def decode_item(self, item: Union[bytes, None]):
+        if item is None:
+            if self.utterance_decoder is None:
+                self.produce((b"", True))
+                return
+            *chunks, last_chunk = self.utterance_decoder.finish()
+            self.utterance_decoder = None
+            for chunk in chunks:
+                self.produce((chunk, False))
+            self.produce((last_chunk, True))
+            return
+        if self.utterance_decoder is None:
+            self.utterance_decoder = UtteranceDecoder(
+                self.synthesizer_config, self.chunk_size
             )
-            # take the difference between the current_wav_buffer and the converted_output_bytes
-            # and put the difference in the output buffer
-            new_bytes = converted_output_bytes[len(current_wav_buffer) :]
-            current_wav_output_buffer.extend(new_bytes)
-
-            # chunk up new_bytes in chunks of chunk_size bytes, but keep the last chunk (less than chunk size) in the wav output buffer
-            output_buffer_idx = 0
-            while output_buffer_idx < len(current_wav_output_buffer) - self.chunk_size:
-                chunk = current_wav_output_buffer[
-                    output_buffer_idx : output_buffer_idx + self.chunk_size
-                ]
-                self.output_janus_queue.sync_q.put(
-                    (chunk, False)
-                )  # don't need to use bytes() since we already sliced it (which is a copy)
-                output_buffer_idx += self.chunk_size
+        for chunk in self.utterance_decoder.feed(item):
+            self.produce((chunk, False))
 
-            current_wav_output_buffer = current_wav_output_buffer[output_buffer_idx:]
-            current_wav_buffer.extend(new_bytes)
+    def produce(self, item: Tuple[bytes, bool]):
+        assert self.loop is not None
+        try:
+            self.loop.call_soon_threadsafe(self.output_queue.put_nowait, item)
+        except RuntimeError:
+            # the event loop was closed
+            self._ended = True
 
     def terminate(self):
         self._ended = True
-        super().terminate()
@@ -5,6 +5,7 @@ from typing import Optional
 from aiohttp import ClientSession, ClientTimeout
 from vocode import getenv
 from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.models.message import BaseMessage
 from vocode.streaming.models.synthesizer import PlayHtSynthesizerConfig, SynthesizerType
 from vocode.streaming.synthesizer.base_synthesizer import (
@@ -39,6 +40,15 @@ class PlayHtSynthesizer(BaseSynthesizer[PlayHtSynthesizerConfig]):
         self.max_backoff_retries = max_backoff_retries
         self.backoff_retry_delay = backoff_retry_delay
 
+    def get_native_output_format(self) -> Optional[str]:
+        # Play.ht only sends linear audio in a wav container, so only mulaw is streamed as is
+        if (
+            self.synthesizer_config.use_native_output_format
+            and self.synthesizer_config.audio_encoding == AudioEncoding.MULAW
+        ):
+            return "mulaw"
+        return None
+
     async def create_speech(
         self,
         message: BaseMessage,
@@ -58,6 +68,9 @@ class PlayHtSynthesizer(BaseSynthesizer[PlayHtSynthesizerConfig]):
             "sample_rate": self.synthesizer_config.sampling_rate,
             "voice_engine": "PlayHT2.0-turbo"
         }
+        output_format = self.get_native_output_format()
+        if output_format is not None:
+            body["output_format"] = output_format
         if self.synthesizer_config.speed:
             body["speed"] = self.synthesizer_config.speed
         if self.synthesizer_config.seed:
@@ -89,10 +102,16 @@ class PlayHtSynthesizer(BaseSynthesizer[PlayHtSynthesizerConfig]):
                 raise Exception(f"Play.ht API error status code {response.status}")
 
             if self.experimental_streaming:
-                return SynthesisResult(
-                    self.experimental_mp3_streaming_output_generator(
+                if output_format is not None:
+                    chunk_generator = self.raw_streaming_output_generator(
                         response, chunk_size, create_speech_span
-                    ),
+                    )
+                else:
+                    chunk_generator = self.experimental_mp3_streaming_output_generator(
+                        response, chunk_size, create_speech_span
+                    )
+                return SynthesisResult(
+                    chunk_generator,
                     lambda seconds: self.get_message_cutoff_from_voice_speed(
                         message, seconds, self.words_per_minute
                     ),
@@ -100,6 +119,13 @@ class PlayHtSynthesizer(BaseSynthesizer[PlayHtSynthesizerConfig]):
             else:
                 read_response = await response.read()
                 create_speech_span.end()
+                if output_format is not None:
+                    return self.create_synthesis_result_from_raw(
+                        synthesizer_config=self.synthesizer_config,
+                        output_bytes=read_response,
+                        message=message,
+                        chunk_size=chunk_size,
+                    )
                 convert_span = tracer.start_span(
                     f"synthesizer.{SynthesizerType.PLAY_HT.value.split('_', 1)[-1]}.convert",
                 )
@@ -14,6 +14,7 @@ from vocode.streaming.synthesizer.base_synthesizer import (
     encode_as_wav,
 )
 from vocode.streaming.models.synthesizer import PollySynthesizerConfig, SynthesizerType
+from vocode.streaming.synthesizer.chunk_size_schedule import ChunkSizeSchedule
 from vocode.streaming.utils.mp3_helper import decode_mp3
 
 import boto3
@@ -107,18 +108,21 @@ class PollySynthesizer(BaseSynthesizer[PollySynthesizerConfig]):
         create_speech_span.end()
 
         async def chunk_generator(audio_data_stream, chunk_transform=lambda x: x):
+            chunk_size_schedule = ChunkSizeSchedule(self.synthesizer_config, chunk_size)
+            current_chunk_size = chunk_size_schedule.next_chunk_size()
             audio_buffer = await asyncio.get_event_loop().run_in_executor(
                 self.thread_pool_executor,
-                lambda: audio_stream.read(chunk_size),
+                lambda: audio_stream.read(current_chunk_size),
             )
-            if len(audio_buffer) != chunk_size:
+            if len(audio_buffer) != current_chunk_size:
                 yield SynthesisResult.ChunkResult(chunk_transform(audio_buffer), True)
                 return
             else:
                 yield SynthesisResult.ChunkResult(chunk_transform(audio_buffer), False)
             while True:
-                audio_buffer = audio_stream.read(chunk_size)
-                if len(audio_buffer) != chunk_size:
+                current_chunk_size = chunk_size_schedule.next_chunk_size()
+                audio_buffer = audio_stream.read(current_chunk_size)
+                if len(audio_buffer) != current_chunk_size:
                     yield SynthesisResult.ChunkResult(
                         chunk_transform(audio_buffer[: len(audio_buffer)]), True
                     )
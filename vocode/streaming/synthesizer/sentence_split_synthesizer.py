@@ -0,0 +1,162 @@
+import asyncio
+import bisect
+import re
+from typing import AsyncGenerator, List, Optional, Tuple
+
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+from vocode.streaming.models.agent import FillerAudioConfig
+from vocode.streaming.models.message import BaseMessage, SSMLMessage
+from vocode.streaming.models.synthesizer import SentenceSplitConfig, SynthesizerConfig
+from vocode.streaming.synthesizer.base_synthesizer import (
+    BaseSynthesizer,
+    FillerAudio,
+    SynthesisResult,
+)
+from vocode.streaming.utils import get_chunk_size_per_second
+
+# a sentence ends at ., ! or ? followed by whitespace, or at a newline
+SENTENCE_REGEX = re.compile(r".+?(?:[.!?](?=\s)|\n|$)", re.DOTALL)
+
+
+def split_sentences(text: str) -> List[Tuple[int, str]]:
+    """Splits text into (offset in text, sentence) pairs; the sentences keep their leading
+    whitespace, so together they make up the whole text"""
+    return [
+        (match.start(), match.group())
+        for match in SENTENCE_REGEX.finditer(text)
+        if match.group().strip()
+    ]
+
+
+class SentenceSplitSynthesizer(BaseSynthesizer[SynthesizerConfig]):
+    """Wraps a synthesizer so that long messages are split into sentences, synthesized
+    concurrently (at most `max_concurrency` sentences ahead of the one being played) and
+    streamed back in order as one SynthesisResult.
+
+    With providers that only return audio once it's all rendered, playback starts after the
+    first sentence instead of after the whole message.
+    """
+
+    def __init__(
+        self,
+        synthesizer: BaseSynthesizer,
+        sentence_split_config: Optional[SentenceSplitConfig] = None,
+    ):
+        super().__init__(
+            synthesizer.get_synthesizer_config(),
+            aiohttp_session=synthesizer.aiohttp_session,
+        )
+        self.synthesizer = synthesizer
+        self.sentence_split_config = (
+            sentence_split_config
+            or self.synthesizer_config.sentence_split_config
+            or SentenceSplitConfig()
+        )
+
+    async def set_filler_audios(self, filler_audio_config: FillerAudioConfig):
+        await self.synthesizer.set_filler_audios(filler_audio_config)
+        self.filler_audios = self.synthesizer.filler_audios
+
+    async def get_phrase_filler_audios(self) -> List[FillerAudio]:
+        return await self.synthesizer.get_phrase_filler_audios()
+
+    def ready_synthesizer(self):
+        self.synthesizer.ready_synthesizer()
+
+    async def create_speech(
+        self,
+        message: BaseMessage,
+        chunk_size: int,
+        bot_sentiment: Optional[BotSentiment] = None,
+    ) -> SynthesisResult:
+        sentences = (
+            split_sentences(message.text)
+            if not isinstance(message, SSMLMessage)
+            and len(message.text) >= self.sentence_split_config.min_characters
+            else []
+        )
+        if len(sentences) < 2:
+            return await self.synthesizer.create_speech(
+                message, chunk_size, bot_sentiment=bot_sentiment
+            )
+
+        def synthesize(sentence: str) -> asyncio.Task:
+            # sentences are cached on their own, so they're reused across messages
+            return asyncio.create_task(
+                self.synthesizer.create_speech_with_cache(
+                    BaseMessage(text=sentence), chunk_size, bot_sentiment=bot_sentiment
+                )
+            )
+
+        # started right away, so the first sentences are synthesized before playback
+        tasks = [
+            synthesize(sentence)
+            for _, sentence in sentences[: self.sentence_split_config.max_concurrency]
+        ]
+        # where each sentence starts and ends in the audio, filled in as the sentences are streamed
+        start_seconds: List[float] = []
+        end_seconds: List[float] = []
+        synthesis_results: List[SynthesisResult] = []
+        bytes_per_second = get_chunk_size_per_second(
+            self.synthesizer_config.audio_encoding,
+            self.synthesizer_config.sampling_rate,
+        )
+
+        async def chunk_generator() -> AsyncGenerator[
+            SynthesisResult.ChunkResult, None
+        ]:
+            num_bytes = 0
+            try:
+                for i in range(len(sentences)):
+                    synthesis_result = await tasks[i]
+                    next_sentence = i + self.sentence_split_config.max_concurrency
+                    if next_sentence < len(sentences):
+                        tasks.append(synthesize(sentences[next_sentence][1]))
+                    start_seconds.append(num_bytes / bytes_per_second)
+                    synthesis_results.append(synthesis_result)
+                    is_last_sentence = i == len(sentences) - 1
+                    is_last_chunk = False
+                    async for chunk_result in synthesis_result.chunk_generator:
+                        num_bytes += len(chunk_result.chunk)
+                        is_last_chunk = is_last_sentence and chunk_result.is_last_chunk
+                        yield SynthesisResult.ChunkResult(
+                            chunk_result.chunk, is_last_chunk
+                        )
+                        if chunk_result.is_last_chunk:
+                            break
+                    end_seconds.append(num_bytes / bytes_per_second)
+                if not is_last_chunk:
+                    yield SynthesisResult.ChunkResult(b"", True)
+            finally:
+                # the message was interrupted, don't synthesize the rest of it
+                unplayed_tasks = tasks[len(synthesis_results) :]
+                for task in unplayed_tasks:
+                    task.cancel()
+                # retrieves the exceptions of the sentences that failed, or were cancelled
+                unplayed_results = await asyncio.gather(
+                    *unplayed_tasks, return_exceptions=True
+                )
+                # and closes the audio of the sentence being played, and of the ones synthesized
+                # ahead of it
+                for synthesis_result in synthesis_results[-1:] + [
+                    result
+                    for result in unplayed_results
+                    if isinstance(result, SynthesisResult)
+                ]:
+                    await synthesis_result.chunk_generator.aclose()
+
+        def get_message_up_to(seconds: float) -> str:
+            i = bisect.bisect_right(start_seconds, seconds) - 1
+            if i < 0:
+                return ""
+            offset, sentence = sentences[i]
+            if i < len(end_seconds) and seconds >= end_seconds[i]:
+                return message.text[: offset + len(sentence)]
+            return message.text[:offset] + synthesis_results[i].get_message_up_to(
+                seconds - start_seconds[i]
+            )
+
+        return SynthesisResult(chunk_generator(), get_message_up_to)
+
+    async def tear_down(self):
+        await self.synthesizer.tear_down()
@@ -0,0 +1,164 @@
+import functools
+import re
+from typing import List, Optional, Sequence
+from xml.etree import ElementTree
+
+from vocode.streaming.agent.bot_sentiment_analyser import BotSentiment
+
+NAMESPACES = {
+    "mstts": "https://www.w3.org/2001/mstts",
+    "": "https://www.w3.org/2001/10/synthesis",
+}
+
+ElementTree.register_namespace("", NAMESPACES[""])
+ElementTree.register_namespace("mstts", NAMESPACES["mstts"])
+
+XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+DEFAULT_SSML_CACHE_SIZE = 256
+
+DOCTOR_REGEX = re.compile(r"\b(Dr|dr)\.(?=\s|$)", re.IGNORECASE)
+WHITESPACE_SPLIT_REGEX = re.compile(r"(\s+)")
+EMAIL_REGEX = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b")
+
+SPECIAL_CHARACTER_NAMES = {"-": " dash ", "_": " underscore ", ".": " dot "}
+
+
+class PronunciationRule:
+    """Renders the parts (whitespace separated words) of a message that need a particular
+    pronunciation into the message's prosody element"""
+
+    def render(self, prosody: ElementTree.Element, part: str) -> bool:
+        """Renders `part` and returns True if the rule applies to it"""
+        raise NotImplementedError
+
+
+class PhonemeRule(PronunciationRule):
+    """Pronounces a word (case insensitive, optionally followed by punctuation) as IPA"""
+
+    def __init__(self, word: str, ipa: str):
+        self.ipa = ipa
+        self.regex = re.compile(rf"^({re.escape(word)})([.,?!]*)$", re.IGNORECASE)
+
+    def render(self, prosody: ElementTree.Element, part: str) -> bool:
+        match = self.regex.match(part)
+        if match is None:
+            return False
+        text, punctuation = match.groups()
+        phoneme = ElementTree.SubElement(
+            prosody, "phoneme", alphabet="ipa", ph=self.ipa
+        )
+        phoneme.text = text
+        if punctuation:
+            punctuation_element = ElementTree.SubElement(prosody, "text")
+            punctuation_element.text = punctuation
+        return True
+
+
+class EmailRule(PronunciationRule):
+    """Spells email addresses out character by character, slowly"""
+
+    def render_characters(self, prosody: ElementTree.Element, characters: str):
+        for character in characters:
+            if character in SPECIAL_CHARACTER_NAMES:
+                text = ElementTree.SubElement(prosody, "text")
+                text.text = SPECIAL_CHARACTER_NAMES[character]
+            else:
+                say_as = ElementTree.SubElement(
+                    prosody, "say-as", {"interpret-as": "characters"}
+                )
+                say_as.text = character
+            ElementTree.SubElement(prosody, "break", {"time": "500ms"})
+
+    def render(self, prosody: ElementTree.Element, part: str) -> bool:
+        if EMAIL_REGEX.fullmatch(part) is None:
+            return False
+        user, domain = part.split("@")
+        self.render_characters(prosody, user)
+        ElementTree.SubElement(prosody, "break", {"time": "500ms"})
+        at = ElementTree.SubElement(prosody, "text")
+        at.text = " at "
+        domain_parts = domain.split(".")
+        for i, domain_part in enumerate(domain_parts):
+            self.render_characters(prosody, domain_part)
+            if i < len(domain_parts) - 1:
+                ElementTree.SubElement(prosody, "break", {"time": "500ms"})
+                dot = ElementTree.SubElement(prosody, "text")
+                dot.text = " dot "
+        return True
+
+
+DEFAULT_PRONUNCIATION_RULES: List[PronunciationRule] = [
+    PhonemeRule("chiro", "ˈkaɪ.ro"),
+    EmailRule(),
+]
+
+
+class SSMLBuilder:
+    """Renders messages into Azure SSML for a voice, applying the first matching pronunciation
+    rule to each word. Rendered SSML is memoized (LRU) per message and bot sentiment."""
+
+    def __init__(
+        self,
+        voice_name: str,
+        language_code: str,
+        pitch: int,
+        rate: int,
+        pronunciation_rules: Sequence[PronunciationRule] = DEFAULT_PRONUNCIATION_RULES,
+        cache_size: int = DEFAULT_SSML_CACHE_SIZE,
+    ):
+        self.voice_name = voice_name
+        self.language_code = language_code
+        self.pitch = pitch
+        self.rate = rate
+        self.pronunciation_rules = list(pronunciation_rules)
+        self.render = functools.lru_cache(maxsize=cache_size)(self.render_uncached)
+
+    def build(self, message: str, bot_sentiment: Optional[BotSentiment] = None) -> str:
+        if bot_sentiment and bot_sentiment.emotion:
+            return self.render(message, bot_sentiment.emotion, bot_sentiment.degree)
+        return self.render(message, None, 0.0)
+
+    def render_uncached(
+        self, message: str, emotion: Optional[str], degree: float
+    ) -> str:
+        ssml_root = ElementTree.Element(
+            "{%s}speak" % NAMESPACES[""],
+            {"version": "1.0", XML_LANG: self.voice_name[:5]},
+        )
+        voice = ElementTree.SubElement(ssml_root, "voice")
+        voice.set("name", self.voice_name)
+        voice.set("effect", "eq_telecomhp8k")
+        if self.language_code != "en-US":
+            voice_root = ElementTree.SubElement(voice, "{%s}lang" % NAMESPACES[""])
+            voice_root.set("xml:lang", self.language_code)
+        else:
+            voice_root = voice
+        if emotion:
+            voice_root = ElementTree.SubElement(
+                voice, "{%s}express-as" % NAMESPACES["mstts"]
+            )
+            voice_root.set("style", emotion)
+            # Azure specific, it's a scale of 0-2
+            voice_root.set("styledegree", str(degree * 2))
+
+        message = DOCTOR_REGEX.sub("doctor", message)
+        # this ugly hack is necessary so we can limit the gap between sentences
+        # for normal sentences, it seems like the gap is > 500ms, so we're able to reduce it to 500ms
+        # for very tiny sentences, the API hangs - so we heuristically only update the silence gap
+        # if there is more than one word in the sentence
+        if " " in message:
+            silence = ElementTree.SubElement(
+                voice_root, "{%s}silence" % NAMESPACES["mstts"]
+            )
+            silence.set("value", "500ms")
+            silence.set("type", "Tailing-exact")
+
+        prosody = ElementTree.SubElement(voice_root, "prosody")
+        prosody.set("pitch", f"{self.pitch}%")
+        prosody.set("rate", f"{self.rate}%")
+        for part in WHITESPACE_SPLIT_REGEX.split(message):
+            if not any(rule.render(prosody, part) for rule in self.pronunciation_rules):
+                text = ElementTree.SubElement(prosody, "text")
+                text.text = part
+
+        return ElementTree.tostring(ssml_root, encoding="unicode")
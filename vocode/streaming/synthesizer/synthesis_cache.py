@@ -0,0 +1,158 @@
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from opentelemetry import metrics
+
+from vocode.streaming.models.message import BaseMessage
+from vocode.streaming.models.synthesizer import SynthesisCacheConfig, SynthesizerConfig
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+# SynthesizerConfig fields that don't change the synthesized audio, left out of the cache key
+NON_VOICE_SYNTHESIZER_CONFIG_FIELDS = {
+    "should_encode_as_wav",
+    "sentiment_config",
+    "synthesis_lookahead",
+    "output_frame_size_seconds",
+    "output_lead_seconds",
+    "adaptive_chunking_config",
+    "synthesis_cache_config",
+    "sentence_split_config",
+    "api_key",
+    "user_id",
+    "experimental_streaming",
+    "optimize_streaming_latency",
+    "use_native_output_format",
+}
+
+hits_counter = meter.create_counter(
+    name="synthesizer.cache.hits",
+    description="Messages whose audio was found in the synthesis cache, by tier",
+)
+misses_counter = meter.create_counter(
+    name="synthesizer.cache.misses",
+    description="Messages whose audio wasn't in the synthesis cache",
+)
+memory_bytes_counter = meter.create_up_down_counter(
+    name="synthesizer.cache.memory_bytes",
+    unit="bytes",
+    description="Audio held in the in-memory tier of the synthesis cache",
+)
+
+
+def get_cache_key(message: BaseMessage, synthesizer_config: SynthesizerConfig) -> str:
+    # the message's text, and its SSML if it has any
+    content = message.dict()
+    voice = synthesizer_config.dict(exclude=NON_VOICE_SYNTHESIZER_CONFIG_FIELDS)
+    return hashlib.sha256(
+        json.dumps(
+            {"message": content, "voice": voice}, sort_keys=True, default=str
+        ).encode()
+    ).hexdigest()
+
+
+class SynthesisCache:
+    """Content addressed cache of synthesized audio, keyed by get_cache_key.
+
+    The in-memory tier is an LRU bounded by `max_bytes`. If `disk_cache_path` is set, audio is
+    also written there (one file per key, never evicted) and read back on in-memory misses.
+    """
+
+    def __init__(self, max_bytes: int, disk_cache_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.disk_cache_path = disk_cache_path
+        if disk_cache_path is not None:
+            os.makedirs(disk_cache_path, exist_ok=True)
+        self.entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self.num_bytes = 0
+        self.lock = threading.Lock()
+
+    def get_disk_path(self, key: str) -> str:
+        assert self.disk_cache_path is not None
+        return os.path.join(self.disk_cache_path, f"{key}.bytes")
+
+    def get_from_memory(self, key: str) -> Optional[bytes]:
+        with self.lock:
+            audio = self.entries.get(key)
+            if audio is not None:
+                self.entries.move_to_end(key)
+            return audio
+
+    def put_in_memory(self, key: str, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = audio
+            num_bytes_added = len(audio)
+            while self.num_bytes + num_bytes_added > self.max_bytes:
+                _, evicted_audio = self.entries.popitem(last=False)
+                num_bytes_added -= len(evicted_audio)
+            self.num_bytes += num_bytes_added
+        memory_bytes_counter.add(num_bytes_added)
+
+    def read_from_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.get_disk_path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def write_to_disk(self, key: str, audio: bytes):
+        path = self.get_disk_path(key)
+        # write to a temporary file first so readers never see a partial file
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary_path, "wb") as f:
+                f.write(audio)
+            os.replace(temporary_path, path)
+        except OSError as e:
+            logger.warning("Failed to write synthesized audio to disk: %s", e)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        audio = self.get_from_memory(key)
+        if audio is not None:
+            hits_counter.add(1, {"tier": "memory"})
+            return audio
+        if self.disk_cache_path is not None:
+            audio = await asyncio.get_event_loop().run_in_executor(
+                None, self.read_from_disk, key
+            )
+            if audio is not None:
+                hits_counter.add(1, {"tier": "disk"})
+                self.put_in_memory(key, audio)
+                return audio
+        misses_counter.add(1)
+        return None
+
+    async def put(self, key: str, audio: bytes):
+        self.put_in_memory(key, audio)
+        if self.disk_cache_path is not None:
+            await asyncio.get_event_loop().run_in_executor(
+                None, self.write_to_disk, key, audio
+            )
+
+
+_synthesis_caches: Dict[Tuple[int, Optional[str]], SynthesisCache] = {}
+_synthesis_caches_lock = threading.Lock()
+
+
+def get_synthesis_cache(synthesis_cache_config: SynthesisCacheConfig) -> SynthesisCache:
+    """Returns the process-wide cache for the config, shared by all conversations using it"""
+    cache_id = (
+        synthesis_cache_config.max_bytes,
+        synthesis_cache_config.disk_cache_path,
+    )
+    with _synthesis_caches_lock:
+        if cache_id not in _synthesis_caches:
+            _synthesis_caches[cache_id] = SynthesisCache(*cache_id)
+        return _synthesis_caches[cache_id]
@@ -1,6 +1,5 @@
 import asyncio
 from fastapi import WebSocket
-import base64
 from enum import Enum
 import json
 import logging
@@ -24,6 +23,7 @@ from vocode.streaming.telephony.config_manager.base_config_manager import (
     BaseConfigManager,
 )
 from vocode.streaming.telephony.conversation.call import Call
+from vocode.streaming.telephony.twilio_media_codec import decode_message
 from vocode.streaming.transcriber.factory import TranscriberFactory
 from vocode.streaming.utils.events_manager import EventsManager
 from vocode.streaming.utils.state_manager import TwilioCallStateManager
@@ -141,20 +141,20 @@ class TwilioCall(Call[TwilioOutputDevice]):
         if message is None:
             return PhoneCallWebsocketAction.CLOSE_WEBSOCKET
 
-        data = json.loads(message)
-        if data["event"] == "media":
-            media = data["media"]
-            chunk = base64.b64decode(media["payload"])
-            if self.latest_media_timestamp + 20 < int(media["timestamp"]):
+        twilio_message = decode_message(message)
+        if twilio_message.event == "media":
+            assert twilio_message.timestamp is not None
+            assert twilio_message.payload is not None
+            if self.latest_media_timestamp + 20 < twilio_message.timestamp:
                 bytes_to_fill = 8 * (
-                    int(media["timestamp"]) - (self.latest_media_timestamp + 20)
+                    twilio_message.timestamp - (self.latest_media_timestamp + 20)
                 )
                 self.logger.debug(f"Filling {bytes_to_fill} bytes of silence")
                 # NOTE: 0xff is silence for mulaw audio
                 self.receive_audio(b"\xff" * bytes_to_fill)
-            self.latest_media_timestamp = int(media["timestamp"])
-            self.receive_audio(chunk)
-        elif data["event"] == "stop":
+            self.latest_media_timestamp = twilio_message.timestamp
+            self.receive_audio(twilio_message.payload)
+        elif twilio_message.event == "stop":
             self.logger.debug(f"Media WS: Received event 'stop': {message}")
             self.logger.debug("Stopping...")
             return PhoneCallWebsocketAction.CLOSE_WEBSOCKET
@@ -25,6 +25,9 @@ from vocode.streaming.telephony.constants import (
 )
 
 from vocode.streaming.telephony.server.router.calls import CallsRouter
+from vocode.streaming.transcriber.connection_pool import (
+    close_transcriber_connection_pool,
+)
 from vocode.streaming.models.telephony import (
     TwilioCallConfig,
     TwilioConfig,
@@ -74,7 +77,7 @@ class TelephonyServer:
     ):
         self.base_url = base_url
         self.logger = logger or logging.getLogger(__name__)
-        self.router = APIRouter()
+        self.router = APIRouter(on_shutdown=[close_transcriber_connection_pool])
         self.config_manager = config_manager
         self.templater = Templater()
         self.events_manager = events_manager
@@ -0,0 +1,84 @@
+import binascii
+import json
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+try:
+    import orjson
+
+    loads: Callable[[str], Any] = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# Twilio sends compact JSON, so a media message always contains these
+MEDIA_EVENT_MARKER = '"event":"media"'
+TIMESTAMP_MARKER = '"timestamp":"'
+PAYLOAD_MARKER = '"payload":"'
+
+
+class TwilioMessage(NamedTuple):
+    event: str
+    # media events only: milliseconds since the start of the stream, and the decoded audio
+    timestamp: Optional[int] = None
+    payload: Optional[bytes] = None
+    # the whole message, for events other than media
+    data: Optional[Dict[str, Any]] = None
+
+
+def decode_message(message: str) -> TwilioMessage:
+    """Parses a message of a Twilio media stream. Media messages (one per 20ms of audio) are
+    parsed by scanning for the few fields that are used, the others are parsed as JSON
+    """
+    if MEDIA_EVENT_MARKER in message:
+        # the payload follows the timestamp in Twilio's media messages
+        timestamp_start = message.find(TIMESTAMP_MARKER) + len(TIMESTAMP_MARKER)
+        timestamp_end = message.find('"', timestamp_start)
+        payload_start = message.find(PAYLOAD_MARKER, timestamp_end) + len(
+            PAYLOAD_MARKER
+        )
+        payload_end = message.find('"', payload_start)
+        if (
+            timestamp_start >= len(TIMESTAMP_MARKER)
+            and payload_start >= len(PAYLOAD_MARKER)
+            and timestamp_end != -1
+            and payload_end != -1
+        ):
+            return TwilioMessage(
+                "media",
+                int(message[timestamp_start:timestamp_end]),
+                binascii.a2b_base64(message[payload_start:payload_end]),
+                None,
+            )
+    data = loads(message)
+    if data["event"] == "media":
+        media = data["media"]
+        return TwilioMessage(
+            "media",
+            int(media["timestamp"]),
+            binascii.a2b_base64(media["payload"]),
+            None,
+        )
+    return TwilioMessage(data["event"], None, None, data)
+
+
+class TwilioMediaEncoder:
+    """Renders outbound messages of a Twilio media stream. Media messages are rendered into a
+    template pre-rendered for the stream, so only the audio is encoded per message"""
+
+    def __init__(self, stream_sid: Optional[str]):
+        self.stream_sid = stream_sid
+        self.media_message_prefix = (
+            '{"event": "media", "streamSid": %s, "media": {"payload": "'
+            % json.dumps(stream_sid)
+        )
+
+    def encode_media(self, chunk: bytes) -> str:
+        return (
+            self.media_message_prefix
+            + binascii.b2a_base64(chunk, newline=False).decode("ascii")
+            + '"}}'
+        )
+
+    def encode_mark(self, name: str) -> str:
+        return json.dumps(
+            {"event": "mark", "streamSid": self.stream_sid, "mark": {"name": name}}
+        )
@@ -68,6 +68,10 @@ class AssemblyAITranscriber(BaseAsyncTranscriber[AssemblyAITranscriberConfig]):
         await self.process()
 
     def send_audio(self, chunk):
+        for data in self.gate_audio(chunk):
+            self.buffer_audio(data)
+
+    def buffer_audio(self, chunk):
         if self.transcriber_config.audio_encoding == AudioEncoding.MULAW:
             sample_width = 1
             if isinstance(chunk, np.ndarray):
@@ -0,0 +1,91 @@
+from collections import deque
+from typing import Deque, List, Union
+
+from opentelemetry import metrics
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import AudioGateConfig
+from vocode.streaming.utils import get_chunk_size_per_second
+from vocode.streaming.utils.vad import EnergyVAD
+
+meter = metrics.get_meter(__name__)
+
+held_back_seconds_counter = meter.create_counter(
+    name="transcriber.audio_gate.held_back_seconds",
+    unit="seconds",
+    description="Input audio not streamed to the transcriber, because it was muted or silent",
+)
+
+KeepaliveMessage = Union[str, bytes]
+
+
+class AudioGate:
+    """Decides which input audio is streamed to the transcriber.
+
+    Speech always passes, and so does the first `hangover_seconds` of silence (or muted audio)
+    after it, so the provider sees the end of the utterance. After that, audio is held back and a
+    keepalive is sent instead once per `keepalive_interval_seconds` of it. When speech resumes, the
+    last `pre_roll_seconds` of held back silence is sent ahead of it; muted audio is never sent.
+
+    The provider's timestamps only cover the audio it was sent: transcribers keep their cursors in
+    sent audio, which the held back audio never advances.
+    """
+
+    def __init__(
+        self,
+        audio_gate_config: AudioGateConfig,
+        audio_encoding: AudioEncoding,
+        sampling_rate: int,
+        keepalive_message: KeepaliveMessage,
+    ):
+        self.audio_gate_config = audio_gate_config
+        self.keepalive_message = keepalive_message
+        self.bytes_per_second = get_chunk_size_per_second(audio_encoding, sampling_rate)
+        self.vad = EnergyVAD(
+            audio_gate_config.vad_config, audio_encoding, sampling_rate
+        )
+        self.max_pre_roll_bytes = int(
+            audio_gate_config.pre_roll_seconds * self.bytes_per_second
+        )
+        self.hangover_bytes = int(
+            audio_gate_config.hangover_seconds * self.bytes_per_second
+        )
+        self.keepalive_interval_bytes = int(
+            audio_gate_config.keepalive_interval_seconds * self.bytes_per_second
+        )
+        self.pre_roll: Deque[bytes] = deque()
+        self.pre_roll_bytes = 0
+        # audio since the last speech
+        self.silence_bytes = 0
+        # audio held back since the last keepalive
+        self.held_back_bytes = 0
+
+    def hold_back(self, chunk: bytes, is_muted: bool) -> List[KeepaliveMessage]:
+        if is_muted:
+            self.pre_roll.clear()
+            self.pre_roll_bytes = 0
+        else:
+            self.pre_roll.append(chunk)
+            self.pre_roll_bytes += len(chunk)
+            while self.pre_roll_bytes > self.max_pre_roll_bytes:
+                self.pre_roll_bytes -= len(self.pre_roll.popleft())
+        held_back_seconds_counter.add(len(chunk) / self.bytes_per_second)
+        self.held_back_bytes += len(chunk)
+        if self.held_back_bytes >= self.keepalive_interval_bytes:
+            self.held_back_bytes = 0
+            return [self.keepalive_message]
+        return []
+
+    def process(self, chunk: bytes, is_muted: bool) -> List[KeepaliveMessage]:
+        """Returns what to send to the transcriber for the chunk (muted chunks are silence)"""
+        if not is_muted and self.vad.has_speech(chunk):
+            self.silence_bytes = 0
+            self.held_back_bytes = 0
+            audio: List[KeepaliveMessage] = [*self.pre_roll, chunk]
+            self.pre_roll.clear()
+            self.pre_roll_bytes = 0
+            return audio
+        self.silence_bytes += len(chunk)
+        if self.silence_bytes <= self.hangover_bytes:
+            return [chunk]
+        return self.hold_back(chunk, is_muted)
@@ -0,0 +1,45 @@
+from collections import deque
+from typing import Deque, List, Tuple
+
+
+class AudioReplayBuffer:
+    """Audio sent to a streaming transcriber that it hasn't acknowledged yet (i.e. transcribed as
+    final), so it can be sent again on a new connection if the current one dies.
+
+    Positions are byte offsets into all the audio sent since the transcriber started, across
+    connections. At most `max_bytes` are held; older audio is dropped, and won't be replayed.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        # (position, chunk)
+        self.chunks: Deque[Tuple[int, bytes]] = deque()
+        self.num_bytes = 0
+        # position right after the last chunk sent
+        self.end = 0
+
+    @property
+    def start(self) -> int:
+        """Position of the oldest audio that would be replayed"""
+        return self.chunks[0][0] if self.chunks else self.end
+
+    def append(self, chunk: bytes):
+        self.chunks.append((self.end, chunk))
+        self.end += len(chunk)
+        self.num_bytes += len(chunk)
+        while self.num_bytes > self.max_bytes:
+            _, dropped_chunk = self.chunks.popleft()
+            self.num_bytes -= len(dropped_chunk)
+
+    def acknowledge(self, position: int):
+        """Drops the audio before position, so replaying starts right at it"""
+        while self.chunks and self.chunks[0][0] < position:
+            chunk_position, chunk = self.chunks.popleft()
+            if chunk_position + len(chunk) > position:
+                self.chunks.appendleft((position, chunk[position - chunk_position :]))
+                self.num_bytes -= position - chunk_position
+                break
+            self.num_bytes -= len(chunk)
+
+    def get_unacknowledged_chunks(self) -> List[bytes]:
+        return [chunk for _, chunk in self.chunks]
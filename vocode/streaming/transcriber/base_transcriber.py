@@ -1,24 +1,36 @@
 from __future__ import annotations
 
 import asyncio
-import audioop
+import time
 from opentelemetry import trace, metrics
-from typing import Generic, TypeVar, Union
+from typing import Generic, List, Optional, TypeVar, Union
+from pydantic import Field
 from vocode.streaming.models.audio_encoding import AudioEncoding
 from vocode.streaming.models.model import BaseModel
 
 from vocode.streaming.models.transcriber import TranscriberConfig
+from vocode.streaming.transcriber.audio_gate import AudioGate, KeepaliveMessage
+from vocode.streaming.utils.audio_codec import linear16_to_mulaw
+from vocode.streaming.utils.bounded_queue import BoundedQueue, concatenate_chunks
 from vocode.streaming.utils.worker import AsyncWorker, ThreadAsyncWorker
 
 
 tracer = trace.get_tracer(__name__)
 meter = metrics.get_meter(__name__)
 
+# silence sent as keepalive to transcribers that have no keepalive message
+KEEPALIVE_SILENCE_SECONDS = 0.02
+
 class Transcription(BaseModel):
     message: str
     confidence: float
     is_final: bool
     is_interrupt: bool = False
+    # interim transcriptions only: the finalized transcript followed by the latest hypothesis of
+    # what comes after it, which speculative generation responds to (see SpeculativeGenerationConfig)
+    speculative_message: Optional[str] = None
+    # when the transcriber emitted this transcription, i.e. the endpoint of the user's turn
+    timestamp: float = Field(default_factory=time.time)
 
     def __str__(self):
         return f"Transcription({self.message}, {self.confidence}, {self.is_final})"
@@ -31,6 +43,14 @@ class AbstractTranscriber(Generic[TranscriberConfigType]):
     def __init__(self, transcriber_config: TranscriberConfigType):
         self.transcriber_config = transcriber_config
         self.is_muted = False
+        self.audio_gate: Optional[AudioGate] = None
+        if transcriber_config.audio_gate_config is not None:
+            self.audio_gate = AudioGate(
+                transcriber_config.audio_gate_config,
+                transcriber_config.audio_encoding,
+                transcriber_config.sampling_rate,
+                self.get_keepalive_message(),
+            )
 
     def mute(self):
         self.is_muted = True
@@ -41,15 +61,41 @@ class AbstractTranscriber(Generic[TranscriberConfigType]):
     def get_transcriber_config(self) -> TranscriberConfigType:
         return self.transcriber_config
 
+    def mark_endpoint(self):
+        """Called when the end of the user's turn is detected locally (see VADEndpointingConfig),
+        transcribers that buffer the turn's transcript send it as final right away.
+
+        Only DeepgramTranscriber does so far: with other transcribers this is a no-op, and the
+        turn still ends when the provider sends a final transcription."""
+        pass
+
     async def ready(self):
         return True
 
+    def get_keepalive_message(self) -> KeepaliveMessage:
+        """Sent while the audio gate holds back audio, so the provider keeps the stream open"""
+        return self.create_silent_chunk(
+            2 * int(self.transcriber_config.sampling_rate * KEEPALIVE_SILENCE_SECONDS)
+        )
+
+    def gate_audio(self, chunk: bytes) -> List[KeepaliveMessage]:
+        if self.audio_gate is None:
+            return [self.create_silent_chunk(len(chunk)) if self.is_muted else chunk]
+        audio = self.audio_gate.process(chunk, self.is_muted)
+        if not self.is_muted:
+            return audio
+        # muted audio is only forwarded during the hangover, and is sent as silence
+        return [
+            self.create_silent_chunk(len(chunk)) if data is chunk else data
+            for data in audio
+        ]
+
     def create_silent_chunk(self, chunk_size, sample_width=2):
         linear_audio = b"\0" * chunk_size
         if self.get_transcriber_config().audio_encoding == AudioEncoding.LINEAR16:
             return linear_audio
         elif self.get_transcriber_config().audio_encoding == AudioEncoding.MULAW:
-            return audioop.lin2ulaw(linear_audio, sample_width)
+            return linear16_to_mulaw(linear_audio)
 
 
 class BaseAsyncTranscriber(AbstractTranscriber[TranscriberConfigType], AsyncWorker):
@@ -57,8 +103,14 @@ class BaseAsyncTranscriber(AbstractTranscriber[TranscriberConfigType], AsyncWork
         self,
         transcriber_config: TranscriberConfigType,
     ):
-        self.input_queue: asyncio.Queue[bytes] = asyncio.Queue()
-        self.output_queue: asyncio.Queue[Transcription] = asyncio.Queue()
+        self.input_queue: asyncio.Queue[bytes] = BoundedQueue(
+            "transcriber.input",
+            transcriber_config.input_queue_config,
+            coalesce=concatenate_chunks,
+        )
+        self.output_queue: asyncio.Queue[Transcription] = BoundedQueue(
+            "transcriber.output"
+        )
         AsyncWorker.__init__(self, self.input_queue, self.output_queue)
         AbstractTranscriber.__init__(self, transcriber_config)
 
@@ -66,10 +118,8 @@ class BaseAsyncTranscriber(AbstractTranscriber[TranscriberConfigType], AsyncWork
         raise NotImplementedError
 
     def send_audio(self, chunk):
-        if not self.is_muted:
-            self.consume_nonblocking(chunk)
-        else:
-            self.consume_nonblocking(self.create_silent_chunk(len(chunk)))
+        for data in self.gate_audio(chunk):
+            self.consume_nonblocking(data)
 
     def terminate(self):
         AsyncWorker.terminate(self)
@@ -82,8 +132,14 @@ class BaseThreadAsyncTranscriber(
         self,
         transcriber_config: TranscriberConfigType,
     ):
-        self.input_queue: asyncio.Queue[bytes] = asyncio.Queue()
-        self.output_queue: asyncio.Queue[Transcription] = asyncio.Queue()
+        self.input_queue: asyncio.Queue[bytes] = BoundedQueue(
+            "transcriber.input",
+            transcriber_config.input_queue_config,
+            coalesce=concatenate_chunks,
+        )
+        self.output_queue: asyncio.Queue[Transcription] = BoundedQueue(
+            "transcriber.output"
+        )
         ThreadAsyncWorker.__init__(self, self.input_queue, self.output_queue)
         AbstractTranscriber.__init__(self, transcriber_config)
 
@@ -91,10 +147,8 @@ class BaseThreadAsyncTranscriber(
         raise NotImplementedError
 
     def send_audio(self, chunk):
-        if not self.is_muted:
-            self.consume_nonblocking(chunk)
-        else:
-            self.consume_nonblocking(self.create_silent_chunk(len(chunk)))
+        for data in self.gate_audio(chunk):
+            self.consume_nonblocking(data)
 
     def terminate(self):
         ThreadAsyncWorker.terminate(self)
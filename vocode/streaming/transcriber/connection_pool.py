@@ -0,0 +1,235 @@
+import asyncio
+from collections import deque
+import hashlib
+import json
+import logging
+import time
+from typing import Deque, Dict, Optional
+import weakref
+
+from opentelemetry import metrics
+import websockets
+import websockets.client
+from websockets.client import WebSocketClientProtocol
+
+from vocode.streaming.models.transcriber import ConnectionPoolConfig
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+hits_counter = meter.create_counter(
+    name="transcriber.connection_pool.hits",
+    description="Transcriber connections handed out already open",
+)
+misses_counter = meter.create_counter(
+    name="transcriber.connection_pool.misses",
+    description="Transcriber connections opened on demand, because none were idle",
+)
+
+# how often idle connections older than max_idle_seconds are closed
+REAP_INTERVAL_SECONDS = 5.0
+
+
+def get_fingerprint(url: str, extra_headers: Dict[str, str]) -> str:
+    # connections are interchangeable if they have the same url and credentials
+    return hashlib.sha256(
+        json.dumps({"url": url, "headers": extra_headers}, sort_keys=True).encode()
+    ).hexdigest()
+
+
+class PooledEndpoint:
+    """What the pool needs to open connections for a fingerprint, so it can refill on its own"""
+
+    def __init__(
+        self,
+        url: str,
+        extra_headers: Dict[str, str],
+        pool_config: ConnectionPoolConfig,
+        keepalive_message: str,
+    ):
+        self.url = url
+        self.extra_headers = extra_headers
+        self.pool_config = pool_config
+        self.keepalive_message = keepalive_message
+
+
+class IdleConnection:
+    def __init__(
+        self, websocket: WebSocketClientProtocol, keepalive_task: asyncio.Task
+    ):
+        self.websocket = websocket
+        self.keepalive_task = keepalive_task
+        self.created_at = time.monotonic()
+
+
+class TranscriberConnectionPool:
+    """Keeps up to `size` authenticated, idle websockets open per transcriber url and credentials,
+    sending the provider's keepalive message so they aren't closed, and hands them out to new
+    conversations. The pool refills itself in the background after each hand out, and replaces
+    idle connections once they are older than max_idle_seconds.
+    """
+
+    def __init__(self):
+        self.idle_connections: Dict[str, Deque[IdleConnection]] = {}
+        self.endpoints: Dict[str, PooledEndpoint] = {}
+        self.refill_tasks: Dict[str, asyncio.Task] = {}
+        self.reap_task: Optional[asyncio.Task] = None
+
+    async def keep_alive(
+        self,
+        websocket: WebSocketClientProtocol,
+        keepalive_message: str,
+        interval_seconds: float,
+    ):
+        try:
+            while True:
+                await asyncio.sleep(interval_seconds)
+                await websocket.send(keepalive_message)
+        except websockets.exceptions.ConnectionClosed:
+            logger.debug("Idle transcriber connection was closed")
+
+    async def close_idle_connection(self, idle_connection: IdleConnection):
+        idle_connection.keepalive_task.cancel()
+        await idle_connection.websocket.close()
+
+    def is_stale(
+        self, idle_connection: IdleConnection, pool_config: ConnectionPoolConfig
+    ) -> bool:
+        return (
+            not idle_connection.websocket.open
+            or time.monotonic() - idle_connection.created_at
+            > pool_config.max_idle_seconds
+        )
+
+    async def reap(self):
+        while True:
+            await asyncio.sleep(
+                min(
+                    REAP_INTERVAL_SECONDS,
+                    *[
+                        endpoint.pool_config.max_idle_seconds
+                        for endpoint in self.endpoints.values()
+                    ],
+                )
+            )
+            stale_connections = []
+            for fingerprint, idle_connections in self.idle_connections.items():
+                pool_config = self.endpoints[fingerprint].pool_config
+                for idle_connection in list(idle_connections):
+                    if self.is_stale(idle_connection, pool_config):
+                        idle_connections.remove(idle_connection)
+                        stale_connections.append((fingerprint, idle_connection))
+            for _, idle_connection in stale_connections:
+                await self.close_idle_connection(idle_connection)
+            for fingerprint in {fingerprint for fingerprint, _ in stale_connections}:
+                self.start_refill(fingerprint)
+
+    async def refill(self, fingerprint: str):
+        endpoint = self.endpoints[fingerprint]
+        idle_connections = self.idle_connections.setdefault(fingerprint, deque())
+        try:
+            while len(idle_connections) < endpoint.pool_config.size:
+                websocket = await websockets.client.connect(
+                    endpoint.url, extra_headers=endpoint.extra_headers
+                )
+                keepalive_task = asyncio.create_task(
+                    self.keep_alive(
+                        websocket,
+                        endpoint.keepalive_message,
+                        endpoint.pool_config.keepalive_interval_seconds,
+                    )
+                )
+                idle_connections.append(IdleConnection(websocket, keepalive_task))
+        except Exception as e:
+            # the next conversation connects on demand, and tries to refill again
+            logger.warning("Failed to open idle transcriber connection: %s", e)
+        finally:
+            self.refill_tasks.pop(fingerprint, None)
+
+    def start_refill(self, fingerprint: str):
+        if fingerprint not in self.refill_tasks:
+            self.refill_tasks[fingerprint] = asyncio.create_task(
+                self.refill(fingerprint)
+            )
+
+    def warm(
+        self,
+        url: str,
+        extra_headers: Dict[str, str],
+        pool_config: ConnectionPoolConfig,
+        keepalive_message: str,
+    ):
+        """Opens idle connections in the background, until there are `size` of them"""
+        fingerprint = get_fingerprint(url, extra_headers)
+        self.endpoints[fingerprint] = PooledEndpoint(
+            url, extra_headers, pool_config, keepalive_message
+        )
+        if self.reap_task is None:
+            self.reap_task = asyncio.create_task(self.reap())
+        self.start_refill(fingerprint)
+
+    async def pop_idle_connection(
+        self, fingerprint: str, pool_config: ConnectionPoolConfig
+    ) -> Optional[WebSocketClientProtocol]:
+        idle_connections = self.idle_connections.get(fingerprint)
+        while idle_connections:
+            idle_connection = idle_connections.popleft()
+            if self.is_stale(idle_connection, pool_config):
+                await self.close_idle_connection(idle_connection)
+                continue
+            idle_connection.keepalive_task.cancel()
+            try:
+                # so that no keepalive message is sent once the connection is handed out
+                await idle_connection.keepalive_task
+            except asyncio.CancelledError:
+                pass
+            return idle_connection.websocket
+        return None
+
+    async def connect(
+        self,
+        url: str,
+        extra_headers: Dict[str, str],
+        pool_config: ConnectionPoolConfig,
+        keepalive_message: str,
+    ) -> WebSocketClientProtocol:
+        """Returns an idle connection if there is one, otherwise opens a new connection"""
+        fingerprint = get_fingerprint(url, extra_headers)
+        websocket = await self.pop_idle_connection(fingerprint, pool_config)
+        self.warm(url, extra_headers, pool_config, keepalive_message)
+        if websocket is not None:
+            hits_counter.add(1)
+            return websocket
+        misses_counter.add(1)
+        return await websockets.client.connect(url, extra_headers=extra_headers)
+
+    async def close(self):
+        if self.reap_task is not None:
+            self.reap_task.cancel()
+            self.reap_task = None
+        for refill_task in self.refill_tasks.values():
+            refill_task.cancel()
+        for idle_connections in self.idle_connections.values():
+            while idle_connections:
+                await self.close_idle_connection(idle_connections.popleft())
+
+
+# websockets belong to the event loop they were opened on
+_connection_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TranscriberConnectionPool]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_transcriber_connection_pool() -> TranscriberConnectionPool:
+    """Returns the connection pool of the running event loop, shared by all its conversations"""
+    loop = asyncio.get_running_loop()
+    if loop not in _connection_pools:
+        _connection_pools[loop] = TranscriberConnectionPool()
+    return _connection_pools[loop]
+
+
+async def close_transcriber_connection_pool():
+    """Closes the idle connections of the running event loop, e.g. when the server shuts down"""
+    connection_pool = _connection_pools.pop(asyncio.get_running_loop(), None)
+    if connection_pool is not None:
+        await connection_pool.close()
@@ -1,12 +1,16 @@
 import asyncio
 import json
 import logging
+import time
 from typing import Optional
-import websockets
+import websockets.client
 from websockets.client import WebSocketClientProtocol
-import audioop
 from urllib.parse import urlencode
 from vocode import getenv
+from vocode.streaming.utils.audio_codec import StreamingResampler
+from vocode.streaming.transcriber.audio_replay_buffer import AudioReplayBuffer
+from vocode.streaming.transcriber.connection_pool import get_transcriber_connection_pool
+from vocode.streaming.utils import get_chunk_size_per_second
 
 from vocode.streaming.transcriber.base_transcriber import (
     BaseAsyncTranscriber,
@@ -19,12 +23,23 @@ from vocode.streaming.models.transcriber import (
     EndpointingType,
     PunctuationEndpointingConfig,
     TimeEndpointingConfig,
+    VADEndpointingConfig,
 )
 from vocode.streaming.models.audio_encoding import AudioEncoding
 
 
 PUNCTUATION_TERMINATORS = [".", "!", "?"]
+# consecutive failed connections after which the transcriber gives up
 NUM_RESTARTS = 5
+# connections that lasted this long were healthy, and don't count towards NUM_RESTARTS
+HEALTHY_CONNECTION_SECONDS = 10.0
+INITIAL_BACKOFF_SECONDS = 0.1
+MAX_BACKOFF_SECONDS = 2.0
+# sent instead of audio after this long without any, so Deepgram doesn't close the connection
+KEEPALIVE_INTERVAL_SECONDS = 5
+# audio not transcribed as final yet that is kept, to be replayed on a new connection
+REPLAY_BUFFER_SECONDS = 10
+KEEPALIVE_MESSAGE = json.dumps({"type": "KeepAlive"})
 
 
 avg_latency_hist = meter.create_histogram(
@@ -61,31 +76,97 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         self._ended = False
         self.is_ready = False
         self.logger = logger or logging.getLogger(__name__)
+        self.bytes_per_second = get_chunk_size_per_second(
+            transcriber_config.audio_encoding, transcriber_config.sampling_rate
+        )
+        self.replay_buffer = AudioReplayBuffer(
+            REPLAY_BUFFER_SECONDS * self.bytes_per_second
+        )
+        # seconds of audio sent, across connections
         self.audio_cursor = 0.0
+        # where in the audio sent across connections the current connection's audio starts,
+        # Deepgram's timestamps are relative to it
+        self.connection_start = 0.0
+        # keeps its state across chunks, so there are no artifacts at chunk boundaries
+        self.resampler = StreamingResampler(
+            transcriber_config.sampling_rate * (transcriber_config.downsampling or 1),
+            transcriber_config.sampling_rate,
+        )
+        self.reset_buffer()
+        # audio time up to which the transcript was already sent as final by mark_endpoint()
+        self.finalized_until = 0.0
+        if transcriber_config.connection_pool_config is not None:
+            self.warm_connection_pool()
+
+    def reset_buffer(self):
+        self.buffer = ""
+        self.buffer_avg_confidence = 0
+        self.num_buffer_utterances = 1
+        self.time_silent = 0
+        # the latest interim result, not yet part of the buffer
+        self.interim_transcript = ""
+        self.interim_confidence = 0.0
+        self.interim_end = 0.0
+
+    def send_final_transcription(self, message: str, confidence: float):
+        self.output_queue.put_nowait(
+            Transcription(
+                message=message,
+                confidence=confidence,
+                is_final=True,
+            )
+        )
+        self.reset_buffer()
+
+    def mark_endpoint(self):
+        if not self.interim_transcript and not self.buffer:
+            return
+        message = self.buffer
+        confidence = self.buffer_avg_confidence
+        if self.interim_transcript:
+            message = f"{message} {self.interim_transcript}"
+            confidence = confidence or self.interim_confidence
+            # the final result for the interim's audio will be dropped when it comes in
+            self.finalized_until = self.interim_end
+            self.acknowledge_audio(self.interim_end)
+        self.logger.debug("Endpoint detected locally, sending transcription as final")
+        self.send_final_transcription(message, confidence)
+
+    def acknowledge_audio(self, until: float):
+        position = int(until * self.bytes_per_second)
+        # replaying has to start on a sample
+        sample_width = self.bytes_per_second // self.transcriber_config.sampling_rate
+        self.replay_buffer.acknowledge(position - position % sample_width)
 
     async def _run_loop(self):
         restarts = 0
         while not self._ended and restarts < NUM_RESTARTS:
-            await self.process()
+            connected_at = time.monotonic()
+            try:
+                await self.process()
+            except Exception as e:
+                self.logger.debug("Deepgram connection failed: %s", e)
+            if self._ended:
+                break
+            if time.monotonic() - connected_at >= HEALTHY_CONNECTION_SECONDS:
+                restarts = 0
             restarts += 1
+            backoff_seconds = min(
+                INITIAL_BACKOFF_SECONDS * 2 ** (restarts - 1), MAX_BACKOFF_SECONDS
+            )
             self.logger.debug(
-                "Deepgram connection died, restarting, num_restarts: %s", restarts
+                "Deepgram connection died, restarting in %ss, num_restarts: %s",
+                backoff_seconds,
+                restarts,
             )
+            await asyncio.sleep(backoff_seconds)
 
     def send_audio(self, chunk):
         if (
             self.transcriber_config.downsampling
             and self.transcriber_config.audio_encoding == AudioEncoding.LINEAR16
         ):
-            chunk, _ = audioop.ratecv(
-                chunk,
-                2,
-                1,
-                self.transcriber_config.sampling_rate
-                * self.transcriber_config.downsampling,
-                self.transcriber_config.sampling_rate,
-                None,
-            )
+            chunk = self.resampler.resample(chunk)
         super().send_audio(chunk)
 
     def terminate(self):
@@ -94,6 +175,39 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         self._ended = True
         super().terminate()
 
+    def get_keepalive_message(self):
+        return KEEPALIVE_MESSAGE
+
+    def get_extra_headers(self):
+        return {"Authorization": f"Token {self.api_key}"}
+
+    def warm_connection_pool(self):
+        """Starts opening the pooled connections for this config, if an event loop is running
+        (e.g. while the call waits for Twilio's start event)"""
+        assert self.transcriber_config.connection_pool_config is not None
+        try:
+            connection_pool = get_transcriber_connection_pool()
+        except RuntimeError:
+            return
+        connection_pool.warm(
+            self.get_deepgram_url(),
+            self.get_extra_headers(),
+            self.transcriber_config.connection_pool_config,
+            KEEPALIVE_MESSAGE,
+        )
+
+    async def connect(self) -> WebSocketClientProtocol:
+        if self.transcriber_config.connection_pool_config is None:
+            return await websockets.client.connect(
+                self.get_deepgram_url(), extra_headers=self.get_extra_headers()
+            )
+        return await get_transcriber_connection_pool().connect(
+            self.get_deepgram_url(),
+            self.get_extra_headers(),
+            self.transcriber_config.connection_pool_config,
+            KEEPALIVE_MESSAGE,
+        )
+
     def get_deepgram_url(self):
         if self.transcriber_config.audio_encoding == AudioEncoding.LINEAR16:
             encoding = "linear16"
@@ -132,7 +246,10 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         transcript = deepgram_response["channel"]["alternatives"][0]["transcript"]
 
         # if it is not time based, then return true if speech is final and there is a transcript
-        if not self.transcriber_config.endpointing_config:
+        if not self.transcriber_config.endpointing_config or isinstance(
+            self.transcriber_config.endpointing_config, VADEndpointingConfig
+        ):
+            # with VAD endpointing, speech_final is the fallback for endpoints the VAD misses
             return transcript and deepgram_response["speech_final"]
         elif isinstance(
             self.transcriber_config.endpointing_config, TimeEndpointingConfig
@@ -169,35 +286,35 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
         return data["duration"]
 
     async def process(self):
-        self.audio_cursor = 0.0
-        extra_headers = {"Authorization": f"Token {self.api_key}"}
-
-        async with websockets.connect(
-            self.get_deepgram_url(), extra_headers=extra_headers
-        ) as ws:
+        ws = await self.connect()
+        try:
+            # the audio the last connection didn't get to transcribe is sent first, so
+            # there is no gap in the transcript
+            self.connection_start = self.replay_buffer.start / self.bytes_per_second
+            for chunk in self.replay_buffer.get_unacknowledged_chunks():
+                await ws.send(chunk)
 
             async def sender(ws: WebSocketClientProtocol):  # sends audio to websocket
                 while not self._ended:
                     try:
-                        data = await asyncio.wait_for(self.input_queue.get(), 5)
+                        data = await asyncio.wait_for(
+                            self.input_queue.get(), KEEPALIVE_INTERVAL_SECONDS
+                        )
                     except asyncio.exceptions.TimeoutError:
-                        break
-                    num_channels = 1
-                    sample_width = 2
-                    self.audio_cursor += len(data) / (
-                        self.transcriber_config.sampling_rate
-                        * num_channels
-                        * sample_width
-                    )
+                        await ws.send(KEEPALIVE_MESSAGE)
+                        continue
+                    if isinstance(data, bytes):
+                        # buffered before it's sent, in case the connection dies sending it
+                        self.replay_buffer.append(data)
+                        self.audio_cursor = (
+                            self.replay_buffer.end / self.bytes_per_second
+                        )
                     await ws.send(data)
                 self.logger.debug("Terminating Deepgram transcriber sender")
 
             async def receiver(ws: WebSocketClientProtocol):
-                buffer = ""
-                buffer_avg_confidence = 0
-                num_buffer_utterances = 1
-                time_silent = 0
-                transcript_cursor = 0.0
+                # the audio before the connection started was transcribed by earlier connections
+                transcript_cursor = self.connection_start
                 while not self._ended:
                     try:
                         msg = await ws.recv()
@@ -209,8 +326,9 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
                         not "is_final" in data
                     ):  # means we've finished receiving transcriptions
                         break
+                    start = self.connection_start + data["start"]
                     cur_max_latency = self.audio_cursor - transcript_cursor
-                    transcript_cursor = data["start"] + data["duration"]
+                    transcript_cursor = start + data["duration"]
                     cur_min_latency = self.audio_cursor - transcript_cursor
 
                     avg_latency_hist.record(
@@ -223,44 +341,62 @@ class DeepgramTranscriber(BaseAsyncTranscriber[DeepgramTranscriberConfig]):
                     min_latency_hist.record(max(cur_min_latency, 0))
 
                     is_final = data["is_final"]
-                    speech_final = self.is_speech_final(buffer, data, time_silent)
+                    if is_final:
+                        self.acknowledge_audio(transcript_cursor)
+                    if start < self.finalized_until:
+                        # already sent as final when the endpoint was detected locally, or
+                        # transcribed by the last connection and replayed
+                        continue
+                    speech_final = self.is_speech_final(
+                        self.buffer, data, self.time_silent
+                    )
                     top_choice = data["channel"]["alternatives"][0]
                     confidence = top_choice["confidence"]
 
                     if top_choice["transcript"] and confidence > 0.0 and is_final:
-                        buffer = f"{buffer} {top_choice['transcript']}"
-                        if buffer_avg_confidence == 0:
-                            buffer_avg_confidence = confidence
+                        self.buffer = f"{self.buffer} {top_choice['transcript']}"
+                        self.interim_transcript = ""
+                        if self.buffer_avg_confidence == 0:
+                            self.buffer_avg_confidence = confidence
                         else:
-                            buffer_avg_confidence = (
-                                buffer_avg_confidence
-                                + confidence / (num_buffer_utterances)
-                            ) * (num_buffer_utterances / (num_buffer_utterances + 1))
-                        num_buffer_utterances += 1
+                            self.buffer_avg_confidence = (
+                                self.buffer_avg_confidence
+                                + confidence / (self.num_buffer_utterances)
+                            ) * (
+                                self.num_buffer_utterances
+                                / (self.num_buffer_utterances + 1)
+                            )
+                        self.num_buffer_utterances += 1
 
                     if speech_final:
-                        self.output_queue.put_nowait(
-                            Transcription(
-                                message=buffer,
-                                confidence=buffer_avg_confidence,
-                                is_final=True,
-                            )
+                        self.send_final_transcription(
+                            self.buffer, self.buffer_avg_confidence
                         )
-                        buffer = ""
-                        buffer_avg_confidence = 0
-                        num_buffer_utterances = 1
-                        time_silent = 0
                     elif top_choice["transcript"] and confidence > 0.0:
+                        if not is_final:
+                            self.interim_transcript = top_choice["transcript"]
+                            self.interim_confidence = confidence
+                            self.interim_end = transcript_cursor
                         self.output_queue.put_nowait(
                             Transcription(
-                                message=buffer,
+                                message=self.buffer,
                                 confidence=confidence,
                                 is_final=False,
+                                speculative_message=f"{self.buffer} {self.interim_transcript}"
+                                if self.interim_transcript
+                                else None,
                             )
                         )
-                        time_silent = self.calculate_time_silent(data)
+                        self.time_silent = self.calculate_time_silent(data)
                     else:
-                        time_silent += data["duration"]
+                        self.time_silent += data["duration"]
                 self.logger.debug("Terminating Deepgram transcriber receiver")
 
-            await asyncio.gather(sender(ws), receiver(ws))
+            sender_task = asyncio.create_task(sender(ws))
+            try:
+                await receiver(ws)
+            finally:
+                # unsent audio stays queued for the next connection
+                sender_task.cancel()
+        finally:
+            await ws.close()
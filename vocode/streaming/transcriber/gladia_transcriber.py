@@ -48,6 +48,10 @@ class GladiaTranscriber(BaseAsyncTranscriber[GladiaTranscriberConfig]):
         await self.process()
 
     def send_audio(self, chunk):
+        for data in self.gate_audio(chunk):
+            self.buffer_audio(data)
+
+    def buffer_audio(self, chunk):
         if self.transcriber_config.audio_encoding == AudioEncoding.MULAW:
             sample_width = 1
             if isinstance(chunk, np.ndarray):
@@ -1,11 +1,11 @@
 import asyncio
-import audioop
 import secrets
-from typing import Any
+from typing import Any, List
 import wave
 from string import ascii_letters, digits
 
 from ..models.audio_encoding import AudioEncoding
+from .audio_codec import StreamingResampler, linear16_to_mulaw
 
 custom_alphabet = ascii_letters + digits + ".-_"
 
@@ -26,14 +26,14 @@ def convert_linear_audio(
 ):
     # downsample
     if input_sample_rate != output_sample_rate:
-        raw_wav, _ = audioop.ratecv(
-            raw_wav, 2, 1, input_sample_rate, output_sample_rate, None
+        raw_wav = StreamingResampler(input_sample_rate, output_sample_rate).resample(
+            raw_wav
         )
 
     if output_encoding == AudioEncoding.LINEAR16:
         return raw_wav
     elif output_encoding == AudioEncoding.MULAW:
-        return audioop.lin2ulaw(raw_wav, output_sample_width)
+        return linear16_to_mulaw(raw_wav)
 
 
 def convert_wav(
@@ -61,6 +61,18 @@ def get_chunk_size_per_second(audio_encoding: AudioEncoding, sampling_rate: int)
         raise Exception("Unsupported audio encoding")
 
 
+def get_frame_size(
+    audio_encoding: AudioEncoding, sampling_rate: int, frame_size_seconds: float
+) -> int:
+    sample_width = 2 if audio_encoding == AudioEncoding.LINEAR16 else 1
+    num_samples = max(int(sampling_rate * frame_size_seconds), 1)
+    return num_samples * sample_width
+
+
+def split_into_frames(chunk: bytes, frame_size: int) -> List[bytes]:
+    return [chunk[i : i + frame_size] for i in range(0, len(chunk), frame_size)]
+
+
 def create_conversation_id() -> str:
     return secrets.token_urlsafe(16)
 
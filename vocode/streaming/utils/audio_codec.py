@@ -0,0 +1,109 @@
+"""NumPy implementations of the audio conversions used on the streaming path.
+
+Mulaw is encoded and decoded through lookup tables that are bit-exact with G.711 (and with
+audioop.lin2ulaw / audioop.ulaw2lin). StreamingResampler keeps its interpolation state between
+chunks, so a stream can be resampled chunk by chunk without artifacts at the chunk boundaries.
+"""
+
+from math import gcd
+from typing import Optional
+
+import numpy as np
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+
+MULAW_BIAS = 0x84
+MULAW_CLIP = 8159
+
+
+def _create_mulaw_decode_table() -> np.ndarray:
+    ulaw = ~np.arange(256, dtype=np.int32) & 0xFF
+    magnitude = (((ulaw & 0x0F) << 3) + MULAW_BIAS) << ((ulaw & 0x70) >> 4)
+    return np.where(ulaw & 0x80, MULAW_BIAS - magnitude, magnitude - MULAW_BIAS).astype(
+        np.int16
+    )
+
+
+def _create_mulaw_encode_table() -> np.ndarray:
+    # indexed by the int16 sample reinterpreted as uint16
+    samples = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2
+    mask = np.where(samples < 0, 0x7F, 0xFF)
+    magnitude = np.minimum(np.abs(samples), MULAW_CLIP) + (MULAW_BIAS >> 2)
+    segment = np.searchsorted(
+        np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF]), magnitude
+    )
+    ulaw = np.where(
+        segment >= 8, 0x7F, (segment << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    )
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+MULAW_DECODE_TABLE = _create_mulaw_decode_table()
+MULAW_ENCODE_TABLE = _create_mulaw_encode_table()
+
+
+def mulaw_to_linear16(data: bytes) -> bytes:
+    return MULAW_DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)].tobytes()
+
+
+def linear16_to_mulaw(data: bytes) -> bytes:
+    return MULAW_ENCODE_TABLE[np.frombuffer(data, dtype=np.uint16)].tobytes()
+
+
+def decode_to_linear16_samples(
+    data: bytes, audio_encoding: AudioEncoding
+) -> np.ndarray:
+    if audio_encoding == AudioEncoding.MULAW:
+        return MULAW_DECODE_TABLE[np.frombuffer(data, dtype=np.uint8)]
+    return np.frombuffer(data, dtype=np.int16)
+
+
+class StreamingResampler:
+    """Linear interpolation resampler for a stream of 16-bit mono linear audio.
+
+    The position of the next output sample and the last input sample are carried over between
+    calls, so resampling a stream chunk by chunk gives the same audio as resampling it at once.
+    """
+
+    def __init__(self, input_sample_rate: int, output_sample_rate: int):
+        divisor = gcd(input_sample_rate, output_sample_rate)
+        self.input_step = input_sample_rate // divisor
+        self.output_step = output_sample_rate // divisor
+        # output sample k falls on input sample k * input_step / output_step
+        self.num_output_samples = 0
+        self.num_input_samples = 0
+        self.last_sample: Optional[np.ndarray] = None
+
+    def resample(self, data: bytes) -> bytes:
+        if self.input_step == self.output_step:
+            return data
+        samples = np.frombuffer(data, dtype=np.int16)
+        if not len(samples):
+            return b""
+        # index (in the whole stream) of the first sample we interpolate from: the previous
+        # chunk's last sample is needed to interpolate up to this chunk's first
+        start = self.num_input_samples
+        if self.last_sample is not None:
+            samples = np.concatenate([self.last_sample, samples])
+            start -= 1
+        self.num_input_samples = start + len(samples)
+        self.last_sample = samples[-1:]
+        # all output samples up to the last input sample we have
+        end = ((self.num_input_samples - 1) * self.output_step) // self.input_step + 1
+        indices = np.arange(self.num_output_samples, end)
+        self.num_output_samples = max(end, self.num_output_samples)
+        positions = indices * self.input_step / self.output_step - start
+        resampled = np.interp(positions, np.arange(len(samples)), samples)
+        return np.round(resampled).astype(np.int16).tobytes()
+
+
+def convert_linear16(
+    data: bytes,
+    output_encoding: AudioEncoding = AudioEncoding.LINEAR16,
+    resampler: Optional[StreamingResampler] = None,
+) -> bytes:
+    if resampler is not None:
+        data = resampler.resample(data)
+    if output_encoding == AudioEncoding.MULAW:
+        return linear16_to_mulaw(data)
+    return data
@@ -0,0 +1,131 @@
+import asyncio
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+from opentelemetry import metrics
+
+from vocode.streaming.models.queue import OverflowPolicy, QueueConfig
+
+meter = metrics.get_meter(__name__)
+
+queue_depth_hist = meter.create_histogram(
+    name="pipeline.queue.depth",
+    unit="items",
+    description="Queue depth right after an item is put",
+)
+queue_wait_time_hist = meter.create_histogram(
+    name="pipeline.queue.wait_time",
+    unit="seconds",
+    description="Time an item spent in the queue before it was taken",
+)
+queue_dropped_counter = meter.create_counter(
+    name="pipeline.queue.dropped",
+    description="Items dropped from a full DROP_OLDEST queue",
+)
+queue_coalesced_counter = meter.create_counter(
+    name="pipeline.queue.coalesced",
+    description="Items merged into the newest item of a full COALESCE queue",
+)
+queue_overflow_counter = meter.create_counter(
+    name="pipeline.queue.overflow",
+    description="Items queued over the bound of a full COALESCE queue, because they couldn't be merged",
+)
+
+T = TypeVar("T")
+
+
+def concatenate_chunks(older: T, newer: T) -> Optional[T]:
+    """Merges audio chunks; other items (e.g. control messages) can't be merged"""
+    if isinstance(older, bytes) and isinstance(newer, bytes):
+        return older + newer  # type: ignore
+    return None
+
+
+class BoundedQueue(asyncio.Queue, Generic[T]):
+    """asyncio.Queue with an optional bound, an overflow policy and depth/wait-time metrics.
+
+    With the default QueueConfig the queue is unbounded and behaves like asyncio.Queue.
+    When the queue is full:
+      - BLOCK: put() waits for room, and put_nowait() raises asyncio.QueueFull. Most queues in the
+        pipeline are fed with put_nowait(), so only queues created with `awaits_put=True` (every
+        producer awaits put()) can be bounded with BLOCK
+      - DROP_OLDEST: the oldest queued item is dropped to make room, and passed to `on_drop`
+      - COALESCE: the item is merged into the newest queued item with `coalesce`. Items it can't
+        merge (it returns None) are queued on their own, over the bound
+    """
+
+    def __init__(
+        self,
+        name: str,
+        queue_config: Optional[QueueConfig] = None,
+        coalesce: Optional[Callable[[T, T], Optional[T]]] = None,
+        awaits_put: bool = False,
+        on_drop: Optional[Callable[[T], None]] = None,
+    ):
+        self.name = name
+        self.queue_config = queue_config or QueueConfig()
+        policy = self.queue_config.overflow_policy
+        if policy == OverflowPolicy.COALESCE and coalesce is None:
+            raise ValueError(f"Items of the {name} queue can't be coalesced")
+        if (
+            self.queue_config.maxsize
+            and policy == OverflowPolicy.BLOCK
+            and not awaits_put
+        ):
+            raise ValueError(
+                f"The {name} queue is fed with put_nowait(), so it can't be bounded with BLOCK"
+            )
+        self.coalesce = coalesce
+        self.on_drop = on_drop
+        self.metric_attributes = {"queue": name}
+        # the bound is enforced here rather than by asyncio.Queue, so that items which can't be
+        # coalesced are still admitted
+        self.bound = self.queue_config.maxsize
+        self.has_room = asyncio.Event()
+        super().__init__()
+
+    def is_at_bound(self) -> bool:
+        return 0 < self.bound <= self.qsize()
+
+    # items are stored with the monotonic time they were enqueued at
+    def _put(self, item: T):
+        self._queue.append((time.monotonic(), item))  # type: ignore
+
+    def _get(self) -> T:
+        enqueued_at, item = self._queue.popleft()  # type: ignore
+        queue_wait_time_hist.record(
+            time.monotonic() - enqueued_at, self.metric_attributes
+        )
+        self.has_room.set()
+        return item
+
+    async def put(self, item: T):
+        while (
+            self.queue_config.overflow_policy == OverflowPolicy.BLOCK
+            and self.is_at_bound()
+        ):
+            self.has_room.clear()
+            await self.has_room.wait()
+        self.put_nowait(item)
+
+    def put_nowait(self, item: T):
+        if self.is_at_bound():
+            policy = self.queue_config.overflow_policy
+            if policy == OverflowPolicy.BLOCK:
+                raise asyncio.QueueFull
+            elif policy == OverflowPolicy.DROP_OLDEST:
+                _, dropped = self._queue.popleft()  # type: ignore
+                self.task_done()
+                queue_dropped_counter.add(1, self.metric_attributes)
+                if self.on_drop is not None:
+                    self.on_drop(dropped)
+            elif self.coalesce is not None:
+                enqueued_at, newest = self._queue[-1]  # type: ignore
+                coalesced = self.coalesce(newest, item)
+                if coalesced is not None:
+                    self._queue[-1] = (enqueued_at, coalesced)  # type: ignore
+                    queue_coalesced_counter.add(1, self.metric_attributes)
+                    return
+                queue_overflow_counter.add(1, self.metric_attributes)
+        super().put_nowait(item)
+        queue_depth_hist.record(self.qsize(), self.metric_attributes)
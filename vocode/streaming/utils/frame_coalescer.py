@@ -0,0 +1,65 @@
+import asyncio
+from typing import Callable, List, Optional
+
+from opentelemetry import metrics
+
+meter = metrics.get_meter(__name__)
+
+packet_frames_hist = meter.create_histogram(
+    name="pipeline.coalescer.frames_per_packet",
+    unit="frames",
+    description="Input audio frames batched into each packet sent to the transcriber",
+)
+
+
+class FrameCoalescer:
+    """Batches small input audio frames (e.g. Twilio's 20ms media events) into packets of at
+    least `packet_size` bytes, passed to `emit`. A packet that isn't full `max_latency_seconds`
+    after its first frame is flushed as is, so audio is never held back longer than that.
+
+    The flush timer is an event loop timer, not a task, so a steadily filling coalescer costs no
+    extra wakeups.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[[bytes], None],
+        packet_size: int,
+        max_latency_seconds: float,
+    ):
+        self.emit = emit
+        self.packet_size = packet_size
+        self.max_latency_seconds = max_latency_seconds
+        self.frames: List[bytes] = []
+        self.num_bytes = 0
+        self.flush_timer: Optional[asyncio.TimerHandle] = None
+
+    def add(self, frame: bytes):
+        self.frames.append(frame)
+        self.num_bytes += len(frame)
+        if self.num_bytes >= self.packet_size:
+            self.flush()
+        elif self.flush_timer is None:
+            self.flush_timer = asyncio.get_event_loop().call_later(
+                self.max_latency_seconds, self.flush
+            )
+
+    def flush(self):
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        if not self.frames:
+            return
+        packet_frames_hist.record(len(self.frames))
+        packet = b"".join(self.frames)
+        self.frames = []
+        self.num_bytes = 0
+        self.emit(packet)
+
+    def cancel(self):
+        """Drops the pending packet"""
+        if self.flush_timer is not None:
+            self.flush_timer.cancel()
+            self.flush_timer = None
+        self.frames = []
+        self.num_bytes = 0
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from typing import Optional
+
+from opentelemetry import metrics
+
+from vocode.streaming.constants import PER_CHUNK_ALLOWANCE_SECONDS
+
+meter = metrics.get_meter(__name__)
+
+scheduling_lag_hist = meter.create_histogram(
+    name="conversation.playout.scheduling_lag",
+    unit="seconds",
+    description="How late send_speech_to_output woke up relative to its playout deadline",
+)
+
+
+class PlayoutClock:
+    """Tracks, on the monotonic clock, when the audio handed to the output device will have
+    finished playing.
+
+    Each chunk is scheduled against an absolute deadline (the end of everything sent so far,
+    minus `lead_seconds` of audio we keep buffered on the output device), so a late wakeup on
+    one chunk is absorbed by the next sleep instead of piling up over the utterance.
+    """
+
+    def __init__(self, lead_seconds: float = PER_CHUNK_ALLOWANCE_SECONDS):
+        self.lead_seconds = lead_seconds
+        self.playout_end = time.monotonic()
+        self.last_scheduling_lag = 0.0
+
+    def seconds_buffered(self) -> float:
+        return max(self.playout_end - time.monotonic(), 0.0)
+
+    def schedule(
+        self, speech_length_seconds: float, lead_seconds: Optional[float] = None
+    ) -> float:
+        """Records that `speech_length_seconds` of audio was just sent to the output device.
+
+        Returns the deadline at which the next chunk should be sent, `lead_seconds` overrides
+        the clock's lead buffer for this chunk.
+        """
+        now = time.monotonic()
+        if now > self.playout_end:
+            # the output device is idle (or ran dry), playout of this chunk starts now
+            self.playout_end = now
+        self.playout_end += speech_length_seconds
+        if lead_seconds is None:
+            lead_seconds = self.lead_seconds
+        return self.playout_end - lead_seconds
+
+    async def wait_until(self, deadline: float) -> float:
+        """Sleeps until `deadline` and returns how late we woke up"""
+        delay = deadline - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        # a deadline that had already passed is a missed one, and counts as lag too
+        self.last_scheduling_lag = max(time.monotonic() - deadline, 0.0)
+        scheduling_lag_hist.record(self.last_scheduling_lag)
+        return self.last_scheduling_lag
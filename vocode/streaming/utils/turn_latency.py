@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from enum import Enum
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from opentelemetry import trace
+
+tracer = trace.get_tracer(__name__)
+
+TURN_TRACE_NAME = "conversation.turn"
+
+
+class TurnStage(str, Enum):
+    TRANSCRIBER_ENDPOINT = "transcriber_endpoint"
+    TRANSCRIPTION_PROCESSED = "transcription_processed"
+    AGENT_FIRST_TOKEN = "agent_first_token"
+    AGENT_FIRST_SENTENCE = "agent_first_sentence"
+    SYNTHESIS_STARTED = "synthesis_started"
+    SYNTHESIS_FIRST_CHUNK = "synthesis_first_chunk"
+    OUTPUT_FIRST_CHUNK = "output_first_chunk"
+
+
+# the order a turn moves through the pipeline
+TURN_STAGES = list(TurnStage)
+TOTAL_SEGMENT = "total"
+
+
+def to_ns(timestamp: float) -> int:
+    return int(timestamp * 1e9)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    index = min(int(round(fraction * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class TurnTimeline:
+    """Wall-clock time at which a single user turn first reached each TurnStage"""
+
+    def __init__(self, turn_index: int):
+        self.turn_index = turn_index
+        self.stage_times: Dict[TurnStage, float] = {}
+
+    def mark(self, stage: TurnStage, timestamp: Optional[float] = None):
+        if stage not in self.stage_times:
+            self.stage_times[stage] = timestamp or time.time()
+
+    def is_completed(self) -> bool:
+        return TurnStage.OUTPUT_FIRST_CHUNK in self.stage_times
+
+    def get_segments(self) -> List[Tuple[str, float, float]]:
+        """Returns (segment name, start, end) between consecutive stages the turn reached"""
+        reached = [stage for stage in TURN_STAGES if stage in self.stage_times]
+        segments = [
+            (
+                f"{start_stage.value}->{end_stage.value}",
+                self.stage_times[start_stage],
+                self.stage_times[end_stage],
+            )
+            for start_stage, end_stage in zip(reached, reached[1:])
+        ]
+        if len(reached) > 1:
+            segments.append(
+                (
+                    TOTAL_SEGMENT,
+                    self.stage_times[reached[0]],
+                    self.stage_times[reached[-1]],
+                )
+            )
+        return segments
+
+
+class TurnLatencyTracker:
+    """Follows each user turn from the transcriber endpoint to the first chunk of the bot's
+    response reaching the output device.
+
+    Every finished turn is emitted as an OpenTelemetry trace (one span per segment). Only the
+    segment durations of completed turns, the ones that reached OUTPUT_FIRST_CHUNK, are kept for
+    the conversation's latency summary: the others were cut short (e.g. by an interruption) and
+    are only counted.
+    """
+
+    def __init__(self, conversation_id: str, logger: Optional[logging.Logger] = None):
+        self.conversation_id = conversation_id
+        self.logger = logger or logging.getLogger(__name__)
+        self.current_turn: Optional[TurnTimeline] = None
+        self.num_turns = 0
+        self.segment_durations: Dict[str, List[float]] = {}
+        self.num_incomplete_turns = 0
+
+    def start_turn(self, endpoint_time: Optional[float] = None) -> TurnTimeline:
+        self.finish_turn()
+        self.current_turn = TurnTimeline(self.num_turns)
+        self.num_turns += 1
+        self.current_turn.mark(TurnStage.TRANSCRIBER_ENDPOINT, endpoint_time)
+        return self.current_turn
+
+    def mark(self, stage: TurnStage):
+        """Marks the stage on the current turn, only the first mark of each stage counts"""
+        if self.current_turn is None:
+            return
+        self.current_turn.mark(stage)
+        if stage == TurnStage.OUTPUT_FIRST_CHUNK:
+            self.finish_turn()
+
+    def finish_turn(self):
+        turn = self.current_turn
+        if turn is None:
+            return
+        self.current_turn = None
+        segments = turn.get_segments()
+        if not segments:
+            return
+        if turn.is_completed():
+            for name, start, end in segments:
+                self.segment_durations.setdefault(name, []).append(end - start)
+        else:
+            self.num_incomplete_turns += 1
+        self.emit_trace(turn, segments)
+
+    def emit_trace(self, turn: TurnTimeline, segments: List[Tuple[str, float, float]]):
+        _, turn_start, turn_end = segments[-1]
+        turn_span = tracer.start_span(
+            TURN_TRACE_NAME,
+            start_time=to_ns(turn_start),
+            attributes={
+                "conversation_id": self.conversation_id,
+                "turn_index": turn.turn_index,
+                "completed": turn.is_completed(),
+            },
+        )
+        turn_context = trace.set_span_in_context(turn_span)
+        for name, start, end in segments[:-1]:
+            segment_span = tracer.start_span(
+                f"{TURN_TRACE_NAME}.{name}",
+                context=turn_context,
+                start_time=to_ns(start),
+            )
+            segment_span.end(end_time=to_ns(end))
+        turn_span.end(end_time=to_ns(turn_end))
+
+    def get_latency_summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for name, durations in self.segment_durations.items():
+            sorted_durations = sorted(durations)
+            summary[name] = {
+                "count": len(sorted_durations),
+                "p50": percentile(sorted_durations, 0.5),
+                "p95": percentile(sorted_durations, 0.95),
+            }
+        return summary
+
+    def log_latency_summary(self):
+        for name, stats in self.get_latency_summary().items():
+            self.logger.info(
+                "Turn latency {}: p50={:.3f}s p95={:.3f}s (n={})".format(
+                    name, stats["p50"], stats["p95"], stats["count"]
+                )
+            )
+        if self.num_incomplete_turns:
+            self.logger.info(
+                "Turns cut short before any output: {}".format(
+                    self.num_incomplete_turns
+                )
+            )
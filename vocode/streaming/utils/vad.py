@@ -0,0 +1,131 @@
+import numpy as np
+
+from vocode.streaming.models.audio_encoding import AudioEncoding
+from vocode.streaming.models.transcriber import VADEndpointingConfig
+from vocode.streaming.utils.audio_codec import decode_to_linear16_samples
+
+# the noise floor is a low percentile of the levels of the last NOISE_FLOOR_WINDOW_SECONDS of
+# frames that weren't speech, so sustained speech never raises it
+NOISE_FLOOR_PERCENTILE = 10
+NOISE_FLOOR_WINDOW_SECONDS = 3.0
+# speech rises and falls from syllable to syllable, so when the levels of the last
+# NOISE_FLOOR_WINDOW_SECONDS of frames are all within this spread (between the low and high
+# percentiles), they are steady background noise, however loud, and the noise floor follows them
+STEADY_NOISE_SPREAD_DB = 6.0
+STEADY_NOISE_HIGH_PERCENTILE = 90
+INITIAL_NOISE_FLOOR_DBFS = -60.0
+MAX_INT16 = 32768.0
+
+
+class EnergyVAD:
+    """Energy based voice activity detector over raw input audio (mulaw or linear16).
+
+    Each chunk is decoded and split into fixed size frames whose level (dBFS) is computed in one
+    vectorized pass. A frame is speech if it's `speech_margin_db` above the noise floor;
+    process() returns True once at least `min_speech_seconds` of speech has been followed by
+    `time_cutoff_seconds` of silence.
+    """
+
+    def __init__(
+        self,
+        vad_endpointing_config: VADEndpointingConfig,
+        audio_encoding: AudioEncoding,
+        sampling_rate: int,
+    ):
+        self.vad_endpointing_config = vad_endpointing_config
+        self.audio_encoding = audio_encoding
+        frame_duration_seconds = vad_endpointing_config.frame_duration_seconds
+        self.frame_size = max(int(sampling_rate * frame_duration_seconds), 1)
+        self.min_speech_frames = round(
+            vad_endpointing_config.min_speech_seconds / frame_duration_seconds
+        )
+        self.cutoff_frames = max(
+            round(vad_endpointing_config.time_cutoff_seconds / frame_duration_seconds),
+            1,
+        )
+        self.remainder = np.zeros(0, dtype=np.int16)
+        # start out as windows of quiet frames, so speech right at the start is detected
+        self.recent_frame_levels = np.full(
+            max(round(NOISE_FLOOR_WINDOW_SECONDS / frame_duration_seconds), 1),
+            INITIAL_NOISE_FLOOR_DBFS,
+            dtype=np.float32,
+        )
+        self.recent_noise_levels = self.recent_frame_levels.copy()
+        self.noise_floor_dbfs = INITIAL_NOISE_FLOOR_DBFS
+        self.speech_frames = 0
+        self.silence_frames = 0
+
+    def decode(self, chunk: bytes) -> np.ndarray:
+        return decode_to_linear16_samples(chunk, self.audio_encoding)
+
+    def get_frame_levels(self, chunk: bytes) -> np.ndarray:
+        samples = np.concatenate([self.remainder, self.decode(chunk)])
+        num_frames = len(samples) // self.frame_size
+        self.remainder = samples[num_frames * self.frame_size :]
+        frames = (
+            samples[: num_frames * self.frame_size]
+            .reshape(num_frames, self.frame_size)
+            .astype(np.float32)
+        )
+        rms = np.sqrt(np.mean(np.square(frames), axis=1))
+        return 20 * np.log10(np.maximum(rms, 1.0) / MAX_INT16)
+
+    def classify_frames(self, chunk: bytes) -> np.ndarray:
+        """Returns which frames of the chunk are speech, and updates the noise floor with them"""
+        frame_levels = self.get_frame_levels(chunk)
+        is_speech = frame_levels > max(
+            self.vad_endpointing_config.min_speech_dbfs,
+            self.noise_floor_dbfs + self.vad_endpointing_config.speech_margin_db,
+        )
+        if len(frame_levels):
+            self.recent_frame_levels = np.concatenate(
+                [self.recent_frame_levels, frame_levels]
+            )[-len(self.recent_frame_levels) :]
+            self.recent_noise_levels = np.concatenate(
+                [self.recent_noise_levels, frame_levels[~is_speech]]
+            )[-len(self.recent_noise_levels) :]
+            low, high = np.percentile(
+                self.recent_frame_levels,
+                [NOISE_FLOOR_PERCENTILE, STEADY_NOISE_HIGH_PERCENTILE],
+            )
+            if high - low < STEADY_NOISE_SPREAD_DB:
+                # the frames taken for speech were the noise
+                self.recent_noise_levels = self.recent_frame_levels.copy()
+            self.noise_floor_dbfs = float(
+                np.percentile(self.recent_noise_levels, NOISE_FLOOR_PERCENTILE)
+            )
+        return is_speech
+
+    def has_speech(self, chunk: bytes) -> bool:
+        """Returns True if any frame of the chunk is speech, without tracking endpoints"""
+        return bool(self.classify_frames(chunk).any())
+
+    def process(self, chunk: bytes) -> bool:
+        """Returns True if the chunk completes an endpoint (speech followed by silence)"""
+        is_speech = self.classify_frames(chunk)
+        endpoint_detected = False
+        # walks the runs of speech and silence frames, rather than every frame
+        run_starts = np.flatnonzero(np.diff(is_speech.astype(np.int8))) + 1
+        run_bounds = zip(
+            [0] + run_starts.tolist(), run_starts.tolist() + [len(is_speech)]
+        )
+        for start, end in run_bounds:
+            if start == end:
+                continue
+            if is_speech[start]:
+                self.speech_frames += end - start
+                self.silence_frames = 0
+            elif self.speech_frames < self.min_speech_frames:
+                # too short to be speech (a click or a burst of noise)
+                self.speech_frames = 0
+            else:
+                self.silence_frames += end - start
+                if self.silence_frames >= self.cutoff_frames:
+                    endpoint_detected = True
+                    self.speech_frames = 0
+                    self.silence_frames = 0
+        return endpoint_detected
+
+    def reset(self):
+        self.speech_frames = 0
+        self.silence_frames = 0
@@ -1,9 +1,11 @@
 from __future__ import annotations
 
 import asyncio
+import contextvars
 import threading
+import weakref
 import janus
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from typing import TypeVar, Generic
 import logging
 
@@ -163,23 +165,100 @@ class InterruptibleEventFactory:
         )
 
 
+class InterruptibleEventRegistry:
+    """The live InterruptibleEvents of a conversation, so they can all be interrupted at once.
+
+    Events are held weakly: once the workers are done with an event nothing else references it
+    and it drops out of the registry, so interrupting only walks the events still in flight.
+    Everything runs on the event loop, so there's no locking.
+    """
+
+    def __init__(self):
+        self.events: weakref.WeakSet[InterruptibleEvent] = weakref.WeakSet()
+
+    def add(self, event: InterruptibleEvent):
+        self.events.add(event)
+
+    def __len__(self):
+        return len(self.events)
+
+    def interrupt_all(self) -> int:
+        """Interrupts every live event and starts a new turn, returns the number interrupted"""
+        events = list(self.events)
+        # interrupted and non-interruptible events can't be interrupted again
+        self.events.clear()
+        return sum(
+            1 for event in events if not event.is_interrupted() and event.interrupt()
+        )
+
+
 InterruptibleEventType = TypeVar("InterruptibleEventType", bound=InterruptibleEvent)
 
+# (worker, sequence number) of the item whose process() call is running in the current task
+_current_sequence_number: contextvars.ContextVar[
+    Optional[Tuple["InterruptibleWorker", int]]
+] = contextvars.ContextVar("interruptible_worker_sequence_number", default=None)
+
 
 class InterruptibleWorker(AsyncWorker[InterruptibleEventType]):
+    """Runs up to `max_concurrency` process() calls at once.
+
+    Outputs are released onto the output queue in the order the items were read off the
+    input queue: the oldest in-flight item publishes straight to the output queue, later
+    items have their outputs held back until every item before them has finished.
+    """
+
     def __init__(
         self,
         input_queue: asyncio.Queue[InterruptibleEventType],
         output_queue: asyncio.Queue = asyncio.Queue(),
         interruptible_event_factory: InterruptibleEventFactory = InterruptibleEventFactory(),
-        max_concurrency=2,
+        max_concurrency=1,
     ) -> None:
         super().__init__(input_queue, output_queue)
         self.input_queue = input_queue
+        assert max_concurrency >= 1, "max_concurrency must be at least 1"
         self.max_concurrency = max_concurrency
         self.interruptible_event_factory = interruptible_event_factory
-        self.current_task = None
-        self.interruptible_event = None
+        # the most recently started task / item
+        self.current_task: Optional[asyncio.Task] = None
+        self.interruptible_event: Optional[InterruptibleEvent] = None
+        self.in_flight_tasks: Dict[
+            int, Tuple[asyncio.Task, InterruptibleEventType]
+        ] = {}
+        self.concurrency_slots = asyncio.Semaphore(max_concurrency)
+        self.next_sequence_number = 0
+        self.next_output_sequence_number = 0
+        self.finished_items: Dict[int, InterruptibleEvent] = {}
+        self.held_outputs: Dict[int, List[Any]] = {}
+        self.outputs_released = asyncio.Event()
+
+    def produce_nonblocking(self, item):
+        current = _current_sequence_number.get()
+        if current is None or current[0] is not self:
+            return super().produce_nonblocking(item)
+        sequence_number = current[1]
+        if sequence_number <= self.next_output_sequence_number:
+            return super().produce_nonblocking(item)
+        self.held_outputs.setdefault(sequence_number, []).append(item)
+
+    async def wait_for_earlier_outputs(self):
+        """Waits until every item read before the current one has had its outputs released, for
+        items that have to take effect in order rather than just publish in order"""
+        current = _current_sequence_number.get()
+        if current is None or current[0] is not self:
+            return
+        while self.next_output_sequence_number < current[1]:
+            self.outputs_released.clear()
+            await self.outputs_released.wait()
+
+    def get_current_item(self) -> Optional[InterruptibleEventType]:
+        """The item whose process() call is running in the current task, if any"""
+        current = _current_sequence_number.get()
+        if current is None or current[0] is not self:
+            return None
+        in_flight = self.in_flight_tasks.get(current[1])
+        return in_flight[1] if in_flight else None
 
     def produce_interruptible_event_nonblocking(
         self, item: Any, is_interruptible: bool = True
@@ -189,7 +268,7 @@ class InterruptibleWorker(AsyncWorker[InterruptibleEventType]):
                 item, is_interruptible=is_interruptible
             )
         )
-        return super().produce_nonblocking(interruptible_event)
+        return self.produce_nonblocking(interruptible_event)
 
     def produce_interruptible_agent_response_event_nonblocking(
         self,
@@ -204,24 +283,65 @@ class InterruptibleWorker(AsyncWorker[InterruptibleEventType]):
                 agent_response_tracker=agent_response_tracker or asyncio.Event(),
             )
         )
-        return super().produce_nonblocking(interruptible_utterance_event)
+        return self.produce_nonblocking(interruptible_utterance_event)
 
     async def _run_loop(self):
-        # TODO Implement concurrency with max_nb_of_thread
-        while True:
-            item = await self.input_queue.get()
-            if item.is_interrupted():
-                continue
-            self.interruptible_event = item
-            self.current_task = asyncio.create_task(self.process(item))
-            try:
-                await self.current_task
-            except asyncio.CancelledError:
-                return
-            except Exception as e:
-                logger.exception("InterruptibleWorker", exc_info=True)
-            self.interruptible_event.is_interruptible = False
+        try:
+            while True:
+                await self.concurrency_slots.acquire()
+                try:
+                    item = await self.input_queue.get()
+                except BaseException:
+                    self.concurrency_slots.release()
+                    raise
+                if item.is_interrupted():
+                    self.concurrency_slots.release()
+                    continue
+                self.start_processing(item)
+        except asyncio.CancelledError:
+            for task, _ in list(self.in_flight_tasks.values()):
+                task.cancel()
+            return
+
+    def start_processing(self, item: InterruptibleEventType):
+        sequence_number = self.next_sequence_number
+        self.next_sequence_number += 1
+        task = asyncio.create_task(self._process_in_sequence(sequence_number, item))
+        self.in_flight_tasks[sequence_number] = (task, item)
+        self.interruptible_event = item
+        self.current_task = task
+        task.add_done_callback(
+            lambda task: self._on_process_done(sequence_number, item, task)
+        )
+
+    async def _process_in_sequence(
+        self, sequence_number: int, item: InterruptibleEventType
+    ):
+        _current_sequence_number.set((self, sequence_number))
+        await self.process(item)
+
+    def _on_process_done(
+        self, sequence_number: int, item: InterruptibleEventType, task: asyncio.Task
+    ):
+        self.in_flight_tasks.pop(sequence_number, None)
+        if self.current_task is task:
             self.current_task = None
+        self.concurrency_slots.release()
+        if not task.cancelled():
+            exception = task.exception()
+            if exception is not None:
+                logger.error("InterruptibleWorker", exc_info=exception)
+        self.finished_items[sequence_number] = item
+        self._release_outputs()
+
+    def _release_outputs(self):
+        while self.next_output_sequence_number in self.finished_items:
+            item = self.finished_items.pop(self.next_output_sequence_number)
+            for output in self.held_outputs.pop(self.next_output_sequence_number, []):
+                super().produce_nonblocking(output)
+            item.is_interruptible = False
+            self.next_output_sequence_number += 1
+            self.outputs_released.set()
 
     async def process(self, item: InterruptibleEventType):
         """
@@ -235,15 +355,22 @@ class InterruptibleWorker(AsyncWorker[InterruptibleEventType]):
         - threads tasks won't be able to be interrupted. Hopefully not too much of a big deal
             Threads will also get a reference to the interruptible event
         - asyncio tasks will still have to handle CancelledError and clean up resources
-        """
-        if (
-            self.current_task
-            and not self.current_task.done()
-            and self.interruptible_event.is_interruptible
-        ):
-            return self.current_task.cancel()
 
-        return False
+        Cancels every in-flight interruptible item and drops the held back outputs of
+        finished interruptible items that have not been released yet.
+        """
+        cancelled = False
+        for sequence_number, (task, item) in list(self.in_flight_tasks.items()):
+            if not item.is_interruptible:
+                continue
+            self.held_outputs.pop(sequence_number, None)
+            if not task.done():
+                task.cancel()
+                cancelled = True
+        for sequence_number, item in self.finished_items.items():
+            if item.is_interruptible and self.held_outputs.pop(sequence_number, None):
+                cancelled = True
+        return cancelled
 
 
 class InterruptibleAgentResponseWorker(